@@ -0,0 +1,93 @@
+"""Mide el tiempo de arranque de la aplicación hasta que la ventana está lista.
+
+Cada modo se lanza varias veces en un proceso nuevo, con la variable de
+entorno que hace que la ventana se cierre apenas se muestra; se toma el tiempo
+desde el lanzamiento hasta que avisa que está lista. También se mide cuánto
+tarda sólo la importación de la interfaz, que no necesita pantalla:
+
+    python benchmarks/bench_arranque.py --repeticiones 5
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from bench_pipeline import code_version  # noqa: E402
+from conversor_cuiles import STARTUP_PROBE_ENV, STARTUP_PROBE_MARKER  # noqa: E402
+
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "resultados_arranque.jsonl")
+
+# Comando de cada modo de arranque; 'importacion' no abre la ventana
+MODES = {
+    'importacion': [sys.executable, "-c", "import ventana_conversor"],
+    'en_proceso': [sys.executable, os.path.join(REPO_DIR, "main.py")],
+    'proceso_separado': [sys.executable, os.path.join(REPO_DIR, "main.py"), "--proceso-separado"],
+}
+
+
+def has_display():
+    return sys.platform in ('win32', 'darwin') or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def time_launch(command):
+    """Segundos desde el lanzamiento hasta que la ventana avisa que está lista (o hasta que termina el proceso)."""
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: "1"})
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=subprocess.PIPE, text=True)
+    elapsed = None
+    for line in process.stdout:
+        if line.strip() == STARTUP_PROBE_MARKER:
+            elapsed = time.perf_counter() - start
+            break
+    process.stdout.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"El proceso terminó con código {process.returncode}: {' '.join(command)}")
+    return elapsed if elapsed is not None else time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo hasta que la ventana del conversor está lista.")
+    parser.add_argument("--modos", nargs='+', choices=MODES, default=list(MODES), help="Modos de arranque a medir")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Lanzamientos por modo (se informa la mediana)")
+    parser.add_argument("--resultados", default=DEFAULT_RESULTS, help="Archivo JSON Lines donde se acumulan los resultados")
+    args = parser.parse_args(argv)
+
+    version = code_version()
+    for mode in args.modos:
+        if mode != 'importacion' and not has_display():
+            print(f"{mode:<17} omitido: no hay pantalla para abrir la ventana", flush=True)
+            continue
+
+        # El primer lanzamiento deja compilados los .pyc y la caché de dependencias; no se cuenta
+        time_launch(MODES[mode])
+        times = [time_launch(MODES[mode]) for _ in range(args.repeticiones)]
+
+        record = {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'version': version,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': mode,
+            'seconds': round(statistics.median(times), 3),
+            'min_seconds': round(min(times), 3),
+            'runs': len(times),
+        }
+        print(f"{mode:<17} mediana {record['seconds']:.3f}s, mínimo {record['min_seconds']:.3f}s "
+              f"({len(times)} lanzamientos)", flush=True)
+
+        with open(args.resultados, 'a', encoding='utf-8') as results:
+            results.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""Pruebas de rendimiento del pipeline de conversión.
+
+Mide las etapas de extracción, transformación y carga contra un destino SQLite
+local para cada tamaño de origen, informa filas/s, pico de memoria (RSS) y
+tiempo por etapa, y agrega los resultados a un archivo JSON Lines para comparar
+entre versiones:
+
+    python benchmarks/bench_pipeline.py --filas 10000 100000
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from generar_fuentes import generate  # noqa: E402
+from instrumentacion import peak_rss_mb  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000)
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "resultados.jsonl")
+
+# Caída de filas/s respecto de la corrida anterior que se considera regresión
+DEFAULT_THRESHOLD = 0.10
+
+CASES = ('cuiles', 'periodos', 'periodos_sql', 'pipeline')
+
+
+class StageTimer:
+    """Acumula el tiempo y las filas de cada etapa a lo largo de los lotes."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.rows = {}
+
+    def add(self, stage, seconds, rows):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.rows[stage] = self.rows.get(stage, 0) + rows
+
+    def report(self):
+        return {
+            stage: {
+                'seconds': round(seconds, 3),
+                'rows': self.rows[stage],
+                'rows_per_second': round(self.rows[stage] / seconds, 1) if seconds > 0 else None,
+            }
+            for stage, seconds in self.seconds.items()
+        }
+
+
+def _timed_batches(source, timer):
+    batches = source.iter_batches()
+    while True:
+        start = time.perf_counter()
+        batch = next(batches, None)
+        if batch is None:
+            return
+        timer.add('extract', time.perf_counter() - start, len(batch))
+        yield batch
+
+
+def bench_cuiles(source_file, dest_file, batch_size):
+    from destinos import SQLiteDestination
+    from fuentes import open_source, CUILES_SOURCE_TABLE
+    from transformacion import CUILES_DEST_COLUMNS, compile_cuiles_transformer
+
+    timer = StageTimer()
+    destination = SQLiteDestination(dest_file)
+    destination.create()
+    destination.connect()
+    try:
+        destination.create_cuiles_table()
+        inserter = destination.bulk_inserter('cuiles', CUILES_DEST_COLUMNS, batch_size)
+        with open_source(source_file, CUILES_SOURCE_TABLE) as source:
+            transform = compile_cuiles_transformer(source.columns)
+            for batch in _timed_batches(source, timer):
+                start = time.perf_counter()
+                rows = [transform(row) for row in batch]
+                timer.add('transform', time.perf_counter() - start, len(rows))
+
+                start = time.perf_counter()
+                inserter.add_many(rows)
+                timer.add('load', time.perf_counter() - start, len(rows))
+
+        start = time.perf_counter()
+        inserter.close()
+        destination.commit()
+        timer.add('load', time.perf_counter() - start, 0)
+
+        start = time.perf_counter()
+        destination.create_modicuiles_table()
+        destination.populate_modicuiles()
+        destination.commit()
+        timer.add('modicuiles', time.perf_counter() - start, inserter.rows)
+    finally:
+        destination.close()
+    return timer.report(), inserter.rows
+
+
+def bench_periodos(source_file, dest_file, batch_size, staging=False):
+    from destinos import SQLiteDestination, PERIODOS_STAGING_TABLE
+    from fuentes import open_source
+    from transformacion import PERIODOS_COLUMNS, PERIODOS_WIDE_COLUMNS, compile_periodos_wide_transformer, unpivot_periodos
+
+    timer = StageTimer()
+    destination = SQLiteDestination(dest_file)
+    destination.create()
+    destination.connect()
+    try:
+        destination.create_periodos_table()
+        if staging:
+            destination.create_periodos_staging_table()
+            inserter = destination.bulk_inserter(PERIODOS_STAGING_TABLE, PERIODOS_WIDE_COLUMNS, batch_size)
+        else:
+            inserter = destination.bulk_inserter('periodos', PERIODOS_COLUMNS, batch_size)
+
+        with open_source(source_file) as source:
+            transform = compile_periodos_wide_transformer(source.columns)
+            for batch in _timed_batches(source, timer):
+                start = time.perf_counter()
+                wide_rows = [transform(row) for row in batch]
+                wide_rows = [(wide[0], int(wide[1])) + wide[2:] for wide in wide_rows if wide[0] and wide[1]]
+                rows = wide_rows if staging else [row for wide in wide_rows for row in unpivot_periodos(wide)]
+                timer.add('transform', time.perf_counter() - start, len(rows))
+
+                start = time.perf_counter()
+                inserter.add_many(rows)
+                timer.add('load', time.perf_counter() - start, len(rows))
+
+        start = time.perf_counter()
+        inserter.close()
+        destination.commit()
+        timer.add('load', time.perf_counter() - start, 0)
+
+        loaded = inserter.rows
+        if staging:
+            start = time.perf_counter()
+            destination.unpivot_periodos_from_staging()
+            destination.commit()
+            loaded = inserter.rows * 12
+            timer.add('unpivot', time.perf_counter() - start, loaded)
+    finally:
+        destination.close()
+    return timer.report(), loaded
+
+
+def bench_pipeline(cuiles_file, periodos_file, dest_file, batch_size):
+    from motor_conversion import ConversionEngine
+
+    engine = ConversionEngine(dest_file, cuiles_file, periodos_file, batch_size=batch_size)
+    start = time.perf_counter()
+    stats = engine.run()
+    elapsed = time.perf_counter() - start
+    rows = sum(table['rows'] for table in stats.values())
+
+    # Las etapas del motor salen de su propio informe de ejecución
+    stages = {}
+    for stage in engine.run_report['stages']:
+        name = f"{stage['stage']}:{stage['table']}" if stage['table'] else stage['stage']
+        stages[name] = {key: stage[key] for key in ('seconds', 'rows', 'rows_per_second')}
+    stages['total'] = {'seconds': round(elapsed, 3), 'rows': rows, 'rows_per_second': round(rows / elapsed, 1)}
+    return stages, rows
+
+
+def _run_case(case, cuiles_file, periodos_file, batch_size):
+    """Se ejecuta en un proceso aparte para que el pico de RSS corresponda sólo a este caso."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        dest_file = os.path.join(temp_dir, "bench.sqlite")
+        start = time.perf_counter()
+        if case == 'cuiles':
+            stages, rows = bench_cuiles(cuiles_file, dest_file, batch_size)
+        elif case == 'periodos':
+            stages, rows = bench_periodos(periodos_file, dest_file, batch_size)
+        elif case == 'periodos_sql':
+            stages, rows = bench_periodos(periodos_file, dest_file, batch_size, staging=True)
+        else:
+            stages, rows = bench_pipeline(cuiles_file, periodos_file, dest_file, batch_size)
+        elapsed = time.perf_counter() - start
+
+    return {
+        'stages': stages,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def code_version():
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty'], cwd=REPO_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocida'
+
+
+def load_previous(results_file):
+    previous = {}
+    if os.path.exists(results_file):
+        with open(results_file, encoding='utf-8') as results:
+            for line in results:
+                if line.strip():
+                    record = json.loads(line)
+                    previous[(record['case'], record['source_rows'])] = record
+    return previous
+
+
+def check_regression(record, previous, threshold):
+    before = previous.get((record['case'], record['source_rows']))
+    if not before or not before.get('rows_per_second') or not record.get('rows_per_second'):
+        return None
+    change = record['rows_per_second'] / before['rows_per_second'] - 1
+    return change if change < -threshold else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento del pipeline de conversión contra SQLite.")
+    parser.add_argument("--filas", type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Tamaños de origen a medir (por defecto 10000 100000; agregar 1000000 para la prueba completa)")
+    parser.add_argument("--casos", nargs='+', choices=CASES, default=list(CASES), help="Casos a medir")
+    parser.add_argument("--datos", default=os.path.join(BENCH_DIR, "datos"), help="Directorio de los orígenes generados")
+    parser.add_argument("--resultados", default=DEFAULT_RESULTS, help="Archivo JSON Lines donde se acumulan los resultados")
+    parser.add_argument("--batch-size", type=int, default=None, help="Tamaño de lote de las inserciones")
+    parser.add_argument("--umbral", type=float, default=DEFAULT_THRESHOLD,
+                        help="Caída de filas/s que se informa como regresión (por defecto 0.10)")
+    args = parser.parse_args(argv)
+
+    from carga_masiva import DEFAULT_BATCH_SIZE
+    batch_size = args.batch_size or DEFAULT_BATCH_SIZE
+
+    previous = load_previous(args.resultados)
+    version = code_version()
+    regressions = 0
+
+    # spawn: cada caso arranca con un proceso limpio y su propio pico de memoria
+    context = multiprocessing.get_context('spawn')
+
+    for rows in args.filas:
+        cuiles_file = os.path.join(args.datos, f"cuiles_{rows}.odb")
+        periodos_file = os.path.join(args.datos, f"periodos_{rows}.odb")
+        if not (os.path.exists(cuiles_file) and os.path.exists(periodos_file)):
+            print(f"Generando orígenes de {rows} filas...", flush=True)
+            generate(rows, args.datos)
+
+        for case in args.casos:
+            with context.Pool(1) as pool:
+                result = pool.apply(_run_case, (case, cuiles_file, periodos_file, batch_size))
+
+            record = {
+                'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                'version': version,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'case': case,
+                'source_rows': rows,
+                'batch_size': batch_size,
+                **result,
+            }
+
+            stages = ', '.join(
+                f"{stage} {data['seconds']:.2f}s" for stage, data in result['stages'].items()
+            )
+            print(f"{case:<13} {rows:>9} filas origen: {result['rows']:>10} filas en {result['seconds']:.2f}s "
+                  f"({result['rows_per_second']:,.0f} filas/s, RSS {result['peak_rss_mb']} MB) [{stages}]", flush=True)
+
+            change = check_regression(record, previous, args.umbral)
+            if change is not None:
+                regressions += 1
+                print(f"  REGRESIÓN: {change:.0%} filas/s respecto de {previous[(case, rows)]['version']}", flush=True)
+
+            with open(args.resultados, 'a', encoding='utf-8') as results:
+                results.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Generador de archivos de origen sintéticos para las pruebas de rendimiento.
+
+Escribe archivos .odb con la base HSQLDB embebida (tablas MEMORY, datos en
+database/script) con las mismas columnas que los archivos reales:
+
+    python benchmarks/generar_fuentes.py --filas 100000 --dir benchmarks/datos
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuentes import CUILES_SOURCE_TABLE  # noqa: E402
+from transformacion import CUILES_FIELD_MAPPING, MONTHS, PERIODOS_MONTH_FIELDS  # noqa: E402
+
+PERIODOS_SOURCE_TABLE = "PERIODOS"
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+# Empleados promedio por empleador en los datos generados
+EMPLOYEES_PER_EMPLOYER = 20
+
+CUIT_PREFIXES = ('30', '33', '34')
+CUIL_PREFIXES = ('20', '23', '27')
+TIPOS_BENEFICIARIO = ('1', '2', '3')
+
+# Tipos HSQLDB de las columnas de origen que no son de texto
+_PERIODOS_SOURCE_TYPES = {
+    'FECHAPAGO_PAG': 'DATE',
+    'BENEF_CANTPER': 'INTEGER',
+}
+
+_CUIT_WEIGHTS = (5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+
+
+def with_check_digit(prefix, number):
+    """Arma un CUIT/CUIL de 11 dígitos con dígito verificador módulo 11 válido."""
+    base = f"{prefix}{number:08d}"
+    remainder = 11 - sum(int(digit) * weight for digit, weight in zip(base, _CUIT_WEIGHTS)) % 11
+    if remainder == 11:
+        remainder = 0
+    if remainder == 10:
+        # Sin dígito válido para este número: se usa el siguiente
+        return with_check_digit(prefix, number + 1)
+    return f"{base}{remainder}"
+
+
+def _literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, datetime.date):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, float):
+        return f"{value!r}E0"
+    return str(value)
+
+
+def _write_odb(path, table, columns, types, rows):
+    """Escribe un .odb con una tabla MEMORY y sus filas como sentencias INSERT del script."""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as odb:
+        odb.writestr('mimetype', 'application/vnd.oasis.opendocument.base', compress_type=zipfile.ZIP_STORED)
+        odb.writestr('database/properties', '#HSQL Database Engine 1.8.0.10\nversion=1.8.0\nhsqldb.script_format=0\n')
+        with odb.open('database/script', 'w') as script:
+            header = [
+                'SET DATABASE COLLATION "Spanish"',
+                'CREATE SCHEMA PUBLIC AUTHORIZATION DBA',
+                f'CREATE MEMORY TABLE "{table}"(' + ','.join(f'"{c}" {t}' for c, t in zip(columns, types)) + ')',
+                'CREATE USER SA PASSWORD ""',
+                'GRANT DBA TO SA',
+                'SET WRITE_DELAY 60',
+                'SET SCHEMA PUBLIC',
+            ]
+            script.write(('\n'.join(header) + '\n').encode('ascii'))
+
+            prefix = f'INSERT INTO "{table}" VALUES('
+            lines = []
+            for row in rows:
+                lines.append(prefix + ','.join(_literal(value) for value in row) + ')\n')
+                if len(lines) >= 10_000:
+                    script.write(''.join(lines).encode('ascii'))
+                    lines = []
+            script.write(''.join(lines).encode('ascii'))
+
+
+def cuiles_rows(count, seed=0, anio=2015):
+    rng = random.Random(seed)
+    for i in range(count):
+        employer = i // EMPLOYEES_PER_EMPLOYER
+        cuit = with_check_digit(CUIT_PREFIXES[employer % len(CUIT_PREFIXES)], 10_000_000 + employer)
+        cuil = with_check_digit(CUIL_PREFIXES[i % len(CUIL_PREFIXES)], 20_000_000 + i)
+        row = [cuit, anio, cuil]
+        base = rng.uniform(80_000, 900_000)
+        for _ in MONTHS:
+            remuneracion = round(base * rng.uniform(0.95, 1.10), 2) if rng.random() > 0.05 else 0.0
+            row.append(remuneracion)
+            row.append(round(remuneracion * 0.03, 2))
+        row.append(rng.choice(TIPOS_BENEFICIARIO))
+        yield row
+
+
+def periodos_rows(count, seed=0, first_year=2010, years=15):
+    rng = random.Random(seed + 1)
+    for i in range(count):
+        employer = i // years
+        anio = first_year + i % years
+        cuit = with_check_digit(CUIT_PREFIXES[employer % len(CUIT_PREFIXES)], 10_000_000 + employer)
+        row = [cuit, anio]
+        employees = rng.randint(1, 200)
+        for month in MONTHS:
+            remuneracion = round(employees * rng.uniform(80_000, 900_000), 2)
+            aporte = round(remuneracion * 0.03, 2)
+            contribucion = round(remuneracion * 0.06, 2)
+            pago = datetime.date(anio, month, min(28, rng.randint(5, 20)))
+            row += [aporte, contribucion, round(aporte + contribucion, 2), pago,
+                    round(aporte * 0.1, 2), employees, remuneracion]
+        yield row
+
+
+def cuiles_columns():
+    columns = ['CUIT', 'ANIO', 'CUIL'] + list(CUILES_FIELD_MAPPING)
+    types = ['VARCHAR(11)', 'INTEGER', 'VARCHAR(11)'] + ['DOUBLE'] * (len(CUILES_FIELD_MAPPING) - 1) + ['VARCHAR(10)']
+    return columns, types
+
+
+def periodos_columns():
+    columns = ['CUIT', 'ANIO']
+    types = ['VARCHAR(11)', 'INTEGER']
+    for month in MONTHS:
+        for _, source in PERIODOS_MONTH_FIELDS:
+            column = source.format(month=month)
+            columns.append(column)
+            types.append(_PERIODOS_SOURCE_TYPES.get(column.rsplit('_', 1)[0], 'DOUBLE'))
+    return columns, types
+
+
+def generate(rows, directory, seed=0):
+    """Genera el par CUILES/PERIODOS de `rows` filas y devuelve sus rutas."""
+    os.makedirs(directory, exist_ok=True)
+    cuiles_path = os.path.join(directory, f"cuiles_{rows}.odb")
+    periodos_path = os.path.join(directory, f"periodos_{rows}.odb")
+
+    columns, types = cuiles_columns()
+    _write_odb(cuiles_path, CUILES_SOURCE_TABLE, columns, types, cuiles_rows(rows, seed))
+    columns, types = periodos_columns()
+    _write_odb(periodos_path, PERIODOS_SOURCE_TABLE, columns, types, periodos_rows(rows, seed))
+    return cuiles_path, periodos_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera archivos CUILES y PERIODOS sintéticos (.odb).")
+    parser.add_argument("--filas", type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Cantidad de filas de cada archivo (por defecto 10000 100000 1000000)")
+    parser.add_argument("--dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos"),
+                        help="Directorio de salida")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador aleatorio")
+    args = parser.parse_args(argv)
+
+    for rows in args.filas:
+        for path in generate(rows, args.dir, args.semilla):
+            print(f"{path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
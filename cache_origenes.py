@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager, nullcontext
+
+from fuentes import open_source, CUILES_SOURCE_TABLE, FETCH_SIZE
+from lectura_particionada import DEFAULT_PARTITION_BY
+from transformacion import (
+    CUILES_DEST_COLUMNS, PERIODOS_WIDE_COLUMNS, compile_cuiles_transformer, compile_periodos_wide_transformer,
+)
+
+# Versión del formato y del mapeo guardados: al cambiarla, lo anterior deja de usarse
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'conversor_cuiles', 'origenes'
+)
+DEFAULT_CACHE_MB = 4096
+
+# Índice ruta+tamaño+fecha -> hash del contenido, para no volver a leer un archivo que no cambió
+HASH_INDEX = 'hashes.json'
+HASH_CHUNK = 4 * 2**20
+
+DATA_FILE = 'filas.bin'
+META_FILE = 'meta.json'
+COMPRESSION_LEVEL = 1
+_FRAME = struct.Struct('<I')
+
+# Entradas a medio escribir que quedaron de una ejecución interrumpida
+STALE_SECONDS = 24 * 3600
+
+# Por tipo de origen: tabla preferida, columnas de las filas mapeadas y compilador del mapeo
+SOURCE_KINDS = {
+    'cuiles': (CUILES_SOURCE_TABLE, CUILES_DEST_COLUMNS, compile_cuiles_transformer),
+    'periodos': (None, PERIODOS_WIDE_COLUMNS, compile_periodos_wide_transformer),
+}
+
+
+class MappedSource:
+    """Origen abierto cuyos lotes ya vienen mapeados: una fila por cada fila del origen, en el orden de columns."""
+
+    def __init__(self, name, source_columns, columns, batches, total=None, cached=False, partitioning=None,
+                 progress=None):
+        self.name = name
+        self.source_columns = list(source_columns)
+        self.columns = list(columns)
+        self.batches = batches
+        self.total = total
+        self.cached = cached
+        self.partitioning = partitioning
+        self.progress = progress
+
+    def iter_batches(self):
+        return self.batches
+
+
+class SourceCache:
+    """Caché en disco de los orígenes ya leídos y mapeados, compartida entre ejecuciones.
+
+    Cada entrada se identifica por el hash del contenido del archivo, su tamaño,
+    el tipo de origen y el mapeo; el hash se recalcula sólo si cambió la fecha o
+    el tamaño del archivo. Guarda la tabla encontrada, sus columnas y los lotes
+    mapeados, comprimidos, en una carpeta por entrada. Si entre todas superan
+    max_bytes, se borran las usadas hace más tiempo.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MB * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def content_hash(self, source_file):
+        stat = os.stat(source_file)
+        path = os.path.abspath(source_file)
+        signature = f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+        index = self._read_json(os.path.join(self.directory, HASH_INDEX)) or {}
+        if signature in index:
+            return index[signature]
+
+        digest = hashlib.sha256()
+        with open(source_file, 'rb') as source:
+            for chunk in iter(lambda: source.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+
+        # Las firmas viejas del mismo archivo ya no sirven
+        index = {key: value for key, value in index.items() if not key.startswith(path + '|')}
+        index[signature] = digest.hexdigest()
+        try:
+            self._write_json(os.path.join(self.directory, HASH_INDEX), index)
+        except OSError:
+            pass
+        return index[signature]
+
+    def entry_key(self, source_file, kind):
+        preferred_table, columns, _ = SOURCE_KINDS[kind]
+        identity = '|'.join([
+            str(CACHE_VERSION), kind, preferred_table or '', ','.join(columns),
+            str(os.path.getsize(source_file)), self.content_hash(source_file),
+        ])
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:40]
+
+    def lookup(self, key):
+        """Datos de una entrada completa (tabla, columnas, filas), o None si no está."""
+        meta = self._read_json(os.path.join(self.entry_path(key), META_FILE))
+        if meta is None or meta.get('version') != CACHE_VERSION:
+            return None
+        try:
+            if os.path.getsize(os.path.join(self.entry_path(key), DATA_FILE)) != meta['bytes']:
+                return None
+        except OSError:
+            return None
+        return meta
+
+    def touch(self, key, meta):
+        meta['last_used'] = time.time()
+        try:
+            self._write_json(os.path.join(self.entry_path(key), META_FILE), meta)
+        except OSError:
+            pass
+
+    def read_batches(self, key):
+        with open(os.path.join(self.entry_path(key), DATA_FILE), 'rb') as data:
+            while True:
+                header = data.read(_FRAME.size)
+                if not header:
+                    return
+                yield pickle.loads(zlib.decompress(data.read(_FRAME.unpack(header)[0])))
+
+    def writer(self, key, meta):
+        return CacheWriter(self, key, meta)
+
+    def evict(self):
+        """Borra las entradas usadas hace más tiempo hasta que la caché entre en max_bytes."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path):
+                continue
+            meta = self._read_json(os.path.join(path, META_FILE))
+            if meta is None:
+                if '.' in name and now - os.path.getmtime(path) > STALE_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            entries.append((meta.get('last_used', 0), meta.get('bytes', 0), path))
+
+        removed = []
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # Otro proceso puede tener abierta la entrada (en Windows no se deja borrar): se intenta la próxima vez
+            shutil.rmtree(path, ignore_errors=True)
+            if not os.path.exists(path):
+                total -= size
+                removed.append(os.path.basename(path))
+        return removed
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, encoding='utf-8') as json_file:
+                return json.load(json_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path, value):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as json_file:
+            json.dump(value, json_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+class CacheWriter:
+    """Escribe una entrada nueva en una carpeta temporal y la publica sólo cuando el origen se leyó completo."""
+
+    def __init__(self, cache, key, meta):
+        self.cache = cache
+        self.key = key
+        self.meta = meta
+        os.makedirs(cache.directory, exist_ok=True)
+        self.temp_dir = tempfile.mkdtemp(prefix=f"{key}.", dir=cache.directory)
+        self.data = open(os.path.join(self.temp_dir, DATA_FILE), 'wb')
+        self.rows = 0
+        self.bytes = 0
+
+    def write(self, rows):
+        payload = zlib.compress(pickle.dumps(rows, pickle.HIGHEST_PROTOCOL), COMPRESSION_LEVEL)
+        self.data.write(_FRAME.pack(len(payload)))
+        self.data.write(payload)
+        self.rows += len(rows)
+        self.bytes += _FRAME.size + len(payload)
+
+    def too_big(self):
+        return self.bytes > self.cache.max_bytes
+
+    def commit(self):
+        self.data.close()
+        now = time.time()
+        self.meta.update({'version': CACHE_VERSION, 'rows': self.rows, 'bytes': self.bytes,
+                          'created': now, 'last_used': now})
+        SourceCache._write_json(os.path.join(self.temp_dir, META_FILE), self.meta)
+        try:
+            os.replace(self.temp_dir, self.cache.entry_path(self.key))
+        except OSError:
+            # Otro proceso guardó el mismo origen mientras tanto
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+        self.cache.evict()
+
+    def abort(self):
+        self.data.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def _map_batches(batches, transform, writer, timing, on_status):
+    """Mapea los lotes del origen y los va guardando en la caché; la entrada se publica al terminar."""
+    try:
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            read_seconds = time.perf_counter() - start
+            if batch is None:
+                break
+
+            start = time.perf_counter()
+            rows = [transform(row) for row in batch]
+            if timing:
+                timing('read', read_seconds, len(batch))
+                timing('transform', time.perf_counter() - start, len(rows))
+
+            if writer is not None:
+                start = time.perf_counter()
+                try:
+                    writer.write(rows)
+                except OSError as e:
+                    writer.abort()
+                    writer = None
+                    if on_status:
+                        on_status(f"No se pudo guardar el origen en la caché: {e}")
+                else:
+                    if writer.too_big():
+                        writer.abort()
+                        writer = None
+                if timing:
+                    timing('cache_write', time.perf_counter() - start, len(rows))
+            yield rows
+
+        if writer is not None:
+            writer.commit()
+            writer = None
+    finally:
+        # Una lectura que no llegó al final (error, cancelación) no deja nada en la caché
+        if writer is not None:
+            writer.abort()
+        # Los lectores del origen (hilos de las particiones) se detienen antes de cerrarlo
+        batches.close()
+
+
+def _timed_batches(batches, timing):
+    while True:
+        start = time.perf_counter()
+        rows = next(batches, None)
+        if rows is None:
+            return
+        if timing:
+            timing('read', time.perf_counter() - start, len(rows))
+        yield rows
+
+
+@contextmanager
+def open_mapped_source(source_file, kind, cache=None, on_status=None, fetch_size=FETCH_SIZE, stage=None, timing=None,
+                       partitions=1, partition_by=DEFAULT_PARTITION_BY):
+    """Abre un origen de CUILES o PERIODOS y entrega sus filas ya mapeadas (un MappedSource).
+
+    Con una caché, si el archivo ya se leyó antes se entregan las filas guardadas,
+    sin extraer el .odb ni conectarse al origen; si no, se leen, se mapean y se
+    guardan para la próxima vez. timing(etapa, segundos, filas), si se indica,
+    recibe el tiempo de lectura, de mapeo y de escritura en la caché de cada lote.
+    partitions y partition_by se pasan a open_source para leer la tabla en rangos.
+    """
+    preferred_table, columns, compile_transform = SOURCE_KINDS[kind]
+    key = None
+    if cache is not None:
+        with stage('source_hash') if stage else nullcontext():
+            key = cache.entry_key(source_file, kind)
+        meta = cache.lookup(key)
+        if meta is not None:
+            if on_status:
+                on_status(f"Leyendo {os.path.basename(source_file)} desde la caché ({meta['rows']} filas)...")
+            cache.touch(key, meta)
+            batches = _timed_batches(cache.read_batches(key), timing)
+            try:
+                yield MappedSource(meta['table'], meta['source_columns'], columns, batches, meta['rows'], cached=True)
+            finally:
+                batches.close()
+            return
+
+    with open_source(source_file, preferred_table, on_status, fetch_size, stage, partitions, partition_by) as source:
+        writer = None
+        if key is not None:
+            try:
+                writer = cache.writer(key, {'source': os.path.abspath(source_file), 'kind': kind, 'table': source.name,
+                                            'source_columns': source.columns, 'columns': columns})
+            except OSError as e:
+                if on_status:
+                    on_status(f"No se pudo guardar el origen en la caché: {e}")
+        batches = _map_batches(source.iter_batches(), compile_transform(source.columns), writer, timing, on_status)
+        try:
+            yield MappedSource(source.name, source.columns, columns, batches, source.total,
+                               partitioning=source.partitioning, progress=source.progress)
+        finally:
+            batches.close()
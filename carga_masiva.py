@@ -0,0 +1,121 @@
+import time
+
+# Cantidad de filas que se acumulan antes de enviarlas al controlador
+DEFAULT_BATCH_SIZE = 1000
+
+# Errores con los que fast_executemany no sirve para este controlador: no admite arrays de
+# parámetros (función opcional no implementada, atributo inválido) o se queda sin memoria
+FAST_EXECUTEMANY_SQLSTATES = ('HYC00', 'HY092', 'HY001')
+FAST_EXECUTEMANY_MESSAGES = ('parameter array', 'optional feature not implemented', 'memory allocation')
+
+
+def fast_executemany_unsupported(error):
+    """Indica si el error de executemany se debe a fast_executemany y no a los datos del lote."""
+    if isinstance(error, MemoryError):
+        return True
+    # pyodbc informa (SQLSTATE, mensaje)
+    args = getattr(error, 'args', ())
+    sqlstate = args[0] if args and isinstance(args[0], str) else ''
+    message = ' '.join(str(arg) for arg in args).lower()
+    return sqlstate in FAST_EXECUTEMANY_SQLSTATES or any(text in message for text in FAST_EXECUTEMANY_MESSAGES)
+
+
+class BatchExecutor:
+    """Acumula tuplas de parámetros en lotes de tamaño fijo y ejecuta una sentencia con executemany."""
+
+    verb = "procesadas"
+
+    def __init__(self, cursor, table, sql, batch_size=DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError("El tamaño de lote debe ser mayor que cero")
+
+        self.cursor = cursor
+        self.table = table
+        self.batch_size = batch_size
+        self.sql = sql
+
+        self.buffer = []
+        self.rows = 0
+        self.batches = 0
+        self.elapsed = 0.0
+
+        # pyodbc expone fast_executemany; sqlite3 y otros controladores no
+        self.fast = hasattr(cursor, 'fast_executemany')
+        if self.fast:
+            cursor.fast_executemany = True
+
+    def add(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        start = time.perf_counter()
+        try:
+            self.cursor.executemany(self.sql, self.buffer)
+        except Exception as e:
+            if not (self.fast and fast_executemany_unsupported(e)):
+                # Un error de los datos (clave repetida, integridad): lo ya enviado del lote no se confirma
+                self.rollback()
+                raise
+            # Algunos controladores (p. ej. el de Access) no admiten arrays de parámetros:
+            # se desactiva fast_executemany y se reintenta el lote completo.
+            self.fast = False
+            self.cursor.fast_executemany = False
+            self.cursor.executemany(self.sql, self.buffer)
+
+        self.elapsed += time.perf_counter() - start
+        self.rows += len(self.buffer)
+        self.batches += 1
+        self.buffer = []
+
+    def rollback(self):
+        connection = getattr(self.cursor, 'connection', None)
+        if connection is None:
+            return
+        try:
+            connection.rollback()
+        except Exception:
+            # Se informa el error original, no el de deshacer
+            pass
+
+    def close(self):
+        self.flush()
+        return self.stats()
+
+    @property
+    def rows_per_second(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.rows / self.elapsed
+
+    def stats(self):
+        return {
+            'table': self.table,
+            'rows': self.rows,
+            'batches': self.batches,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'fast_executemany': self.fast,
+        }
+
+    def summary(self):
+        return f"{self.table}: {self.rows} filas {self.verb} ({self.rows_per_second:,.0f} filas/s)"
+
+
+class BulkInserter(BatchExecutor):
+    """Acumula filas en lotes de tamaño fijo y las inserta con executemany."""
+
+    verb = "insertadas"
+
+    def __init__(self, cursor, table, columns, batch_size=DEFAULT_BATCH_SIZE):
+        self.columns = list(columns)
+        sql = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES ({', '.join(['?' for _ in self.columns])})"
+        super().__init__(cursor, table, sql, batch_size)
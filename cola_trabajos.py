@@ -0,0 +1,151 @@
+import gc
+import itertools
+import queue
+import threading
+import time
+
+from progreso import ProgressChannel
+
+# Estados de un trabajo, tal como se muestran en la cola
+JOB_WAITING = "En espera"
+JOB_RUNNING = "En curso"
+JOB_CANCELLING = "Cancelando..."
+JOB_DONE = "Completado"
+JOB_CANCELLED = "Cancelado"
+JOB_FAILED = "Error"
+
+FINISHED_STATES = (JOB_DONE, JOB_CANCELLED, JOB_FAILED)
+
+
+class ConversionJob:
+    """Una conversión encolada: sus opciones, su estado y su canal de progreso.
+
+    Las opciones se toman al encolar, desde el hilo de Tk; el hilo de trabajo
+    sólo las lee. El avance y el final llegan a la ventana por channel.
+    """
+
+    def __init__(self, number, dest_file, options):
+        self.number = number
+        self.dest_file = dest_file
+        self.options = options
+        self.state = JOB_WAITING
+        self.channel = ProgressChannel()
+        self.cancel_event = threading.Event()
+        self.started = None
+        self.finished = None
+        self.rows = 0
+        self.result = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if self.rows and elapsed > 0 else None
+
+    @property
+    def is_finished(self):
+        return self.state in FINISHED_STATES
+
+
+class JobQueue:
+    """Ejecuta las conversiones encoladas de a una, en un único hilo de trabajo que vive mientras haya trabajos.
+
+    run_job(job) hace la conversión y devuelve las estadísticas de carga por
+    tabla; debe atender job.cancel_event entre lotes. Un trabajo cancelado
+    antes de empezar simplemente se saltea. Todos los cambios de estado se
+    hacen con lock tomado, para que cancel y el hilo de trabajo no se pisen.
+    """
+
+    def __init__(self, run_job):
+        self.run_job = run_job
+        self.jobs = []
+        self.pending = queue.Queue()
+        self.numbers = itertools.count(1)
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, dest_file, options):
+        job = ConversionJob(next(self.numbers), dest_file, options)
+        with self.lock:
+            self.jobs.append(job)
+            self.pending.put(job)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._work, name="cola-conversiones", daemon=True)
+                self.thread.start()
+        return job
+
+    def cancel(self, job):
+        with self.lock:
+            if job.is_finished:
+                return
+            job.cancel_event.set()
+            if job.state == JOB_WAITING:
+                job.state = JOB_CANCELLED
+                job.channel.error(None)
+            else:
+                # El último avance retenido se muestra mientras la conversión termina de cortar
+                job.channel.flush()
+                job.state = JOB_CANCELLING
+
+    def cancel_all(self):
+        with self.lock:
+            jobs = list(self.jobs)
+        for job in jobs:
+            self.cancel(job)
+
+    @property
+    def running(self):
+        return next((job for job in self.jobs if job.state in (JOB_RUNNING, JOB_CANCELLING)), None)
+
+    @property
+    def busy(self):
+        return any(not job.is_finished for job in self.jobs)
+
+    def _work(self):
+        while True:
+            with self.lock:
+                try:
+                    job = self.pending.get_nowait()
+                except queue.Empty:
+                    # Sin trabajos el hilo termina; el próximo submit arranca otro
+                    self.thread = None
+                    return
+                if job.state != JOB_WAITING:
+                    # cancel() ya lo dio por cancelado
+                    continue
+                job.state = JOB_RUNNING
+                job.started = time.monotonic()
+
+            try:
+                # Una cancelación que llegó justo al pasar a En curso no llega a abrir el destino
+                if job.cancel_event.is_set():
+                    with self.lock:
+                        job.finished = time.monotonic()
+                        job.state = JOB_CANCELLED
+                        job.channel.error(None)
+                    continue
+                result = self.run_job(job)
+            except Exception as e:
+                with self.lock:
+                    job.finished = time.monotonic()
+                    # Sin el traceback, el trabajo no retiene los marcos de la conversión (y con ellos el destino)
+                    job.error = e.with_traceback(None)
+                    job.state = JOB_CANCELLED if job.cancel_event.is_set() else JOB_FAILED
+                    job.channel.error(e)
+            else:
+                with self.lock:
+                    job.finished = time.monotonic()
+                    job.result = result
+                    job.rows = sum(stats.get('rows', 0) for stats in (result or {}).values())
+                    job.state = JOB_DONE
+                    job.channel.done(result)
+            finally:
+                # Una conversión cortada deja ciclos que retienen cursores: hasta recolectarlos, sqlite3 no
+                # cierra de verdad el destino. Se liberan antes de empezar el próximo trabajo
+                gc.collect()
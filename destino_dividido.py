@@ -0,0 +1,480 @@
+import json
+import os
+
+from carga_masiva import DEFAULT_BATCH_SIZE
+from destinos import (
+    Destination, PERIODOS_STAGING_TABLE, SECONDARY_INDEXES, TABLE_SCHEMAS, create_destination, table_columns, table_key,
+)
+
+# Formas de repartir las filas: un archivo por año, o llenar un archivo y pasar al siguiente
+SHARD_BY_YEAR = 'anio'
+SHARD_BY_SIZE = 'tamano'
+SHARD_MODES = (SHARD_BY_YEAR, SHARD_BY_SIZE)
+
+# Un .mdb no puede pasar de 2 GB; el tope por defecto deja margen para lo que la estimación no ve
+ACCESS_MAX_MB = 2048
+DEFAULT_MAX_FILE_MB = 1800
+
+# Índice, junto al destino, de qué archivo tiene qué años de cada tabla
+MANIFEST_SUFFIX = ".manifiesto.json"
+MANIFEST_VERSION = 1
+
+# Columna que indica el año de cada fila (en periodos, los cuatro primeros caracteres de Mes)
+SHARD_COLUMNS = {'cuiles': 'ANIO', 'modicuiles': 'ANIO', 'periodos': 'Mes', PERIODOS_STAGING_TABLE: 'ANIO'}
+NO_YEAR = 'sin_anio'
+
+# Filas que el destino arma después con SQL a partir de cada fila cargada, en el mismo archivo
+DERIVED_ROWS = {'cuiles': {'modicuiles': 1}, PERIODOS_STAGING_TABLE: {'periodos': 12}}
+
+# Estimación del espacio en un .mdb: bytes por valor, por fila y por entrada de índice, y cuánto
+# de cada página se llena en promedio
+COLUMN_BYTES = {'DOUBLE': 8, 'LONG': 4, 'DATETIME': 8}
+TEXT_BYTES = 24
+ROW_OVERHEAD = 16
+INDEX_ENTRY_OVERHEAD = 8
+PAGE_FILL = 0.75
+
+
+def manifest_path(dest_file):
+    return os.path.splitext(dest_file)[0] + MANIFEST_SUFFIX
+
+
+def remove_previous_shards(dest_file, kind=None):
+    """Borra los archivos de una división anterior del destino y su manifiesto; devuelve si había alguna."""
+    previous = ShardedDestination(dest_file, kind)
+    if not previous.exists():
+        return False
+    previous.remove_existing()
+    return True
+
+
+def shard_year(value):
+    """Año de una fila como texto de cuatro dígitos, o NO_YEAR si no lo tiene."""
+    text = '' if value is None else str(value)[:4]
+    return text if len(text) == 4 and text.isascii() and text.isdigit() else NO_YEAR
+
+
+def _column_bytes(column_type):
+    if column_type.startswith('TEXT'):
+        # Texto Unicode sin comprimir: dos bytes por carácter
+        return 2 * int(column_type[5:-1]) if '(' in column_type else TEXT_BYTES
+    return COLUMN_BYTES[column_type]
+
+
+def table_row_bytes(table):
+    """Bytes estimados de una fila de la tabla, con sus entradas en la clave primaria y los índices."""
+    columns = dict(TABLE_SCHEMAS[table][0])
+    size = ROW_OVERHEAD + sum(map(_column_bytes, columns.values()))
+    indexes = [table_key(table)] + [list(index_columns) for _, index_columns in SECONDARY_INDEXES.get(table, [])]
+    for index_columns in indexes:
+        if index_columns:
+            size += INDEX_ENTRY_OVERHEAD + sum(_column_bytes(columns[column]) for column in index_columns)
+    return size / PAGE_FILL
+
+
+def projected_bytes(rows):
+    """Tamaño estimado de un archivo con estas filas por tabla, contando las que se derivarán de ellas."""
+    size = sum(count * table_row_bytes(table) for table, count in rows.items())
+    for table, derived in DERIVED_ROWS.items():
+        for derived_table, factor in derived.items():
+            pending = rows.get(table, 0) * factor - rows.get(derived_table, 0)
+            if pending > 0:
+                size += pending * table_row_bytes(derived_table)
+    return size
+
+
+def estimated_row_bytes(table):
+    """Lo que suma al archivo cada fila cargada en la tabla, incluidas las derivadas."""
+    return projected_bytes({table: 1})
+
+
+class Shard:
+    """Un archivo del destino dividido, con las filas y los años que tiene de cada tabla."""
+
+    def __init__(self, path, kind):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.destination = create_destination(path, kind)
+        self.rows = {}
+        self.years = {}
+
+    def capacity(self, table, max_bytes):
+        """Cuántas filas más de la tabla entran sin que el archivo supere max_bytes."""
+        # El tamaño real en disco sólo cuenta si ya superó a la estimación
+        used = max(projected_bytes(self.rows), self.destination.file_size())
+        return max(0, int((max_bytes - used) // estimated_row_bytes(table)))
+
+    def add(self, table, year, count):
+        """Anota filas nuevas; devuelve True si el año no estaba en el archivo."""
+        self.rows[table] = self.rows.get(table, 0) + count
+        years = self.years.setdefault(table, set())
+        if year in years:
+            return False
+        years.add(year)
+        return True
+
+    def derive(self, table, derived_table, factor):
+        self.rows[derived_table] = self.rows.get(table, 0) * factor
+        self.years[derived_table] = set(self.years.get(table, ()))
+
+    def entry(self):
+        return {
+            'file': self.name,
+            'tables': {table: {'rows': rows, 'years': sorted(self.years.get(table, ()))}
+                       for table, rows in self.rows.items()},
+            'estimated_bytes': int(projected_bytes(self.rows)),
+            'bytes': self.destination.file_size(),
+        }
+
+
+class ShardedInserter:
+    """Inserción masiva que reparte las filas entre los archivos del destino según su año."""
+
+    verb = "insertadas"
+
+    def __init__(self, sharded, table, columns, batch_size=DEFAULT_BATCH_SIZE):
+        self.sharded = sharded
+        self.table = table
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.year_index = self.columns.index(SHARD_COLUMNS[table])
+        # Un BulkInserter por archivo, creado con la primera fila que le toca
+        self.inserters = {}
+
+    def inserter(self, shard):
+        if shard.name not in self.inserters:
+            self.inserters[shard.name] = shard.destination.bulk_inserter(self.table, self.columns, self.batch_size)
+        return self.inserters[shard.name]
+
+    def add(self, row):
+        self.add_many([row])
+
+    def add_many(self, rows):
+        groups = {}
+        index = self.year_index
+        for row in rows:
+            groups.setdefault(shard_year(row[index]), []).append(row)
+        for year, group in groups.items():
+            for shard, chunk in self.sharded.place(self.table, year, group):
+                self.inserter(shard).add_many(chunk)
+
+    def flush(self):
+        for inserter in self.inserters.values():
+            inserter.flush()
+
+    @property
+    def rows(self):
+        return sum(inserter.rows for inserter in self.inserters.values())
+
+    @property
+    def elapsed(self):
+        return sum(inserter.elapsed for inserter in self.inserters.values())
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        for inserter in self.inserters.values():
+            inserter.close()
+        return self.stats()
+
+    def stats(self):
+        return {
+            'table': self.table,
+            'rows': self.rows,
+            'batches': sum(inserter.batches for inserter in self.inserters.values()),
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'fast_executemany': all(inserter.fast for inserter in self.inserters.values()),
+            'files': len(self.inserters),
+        }
+
+    def summary(self):
+        return (f"{self.table}: {self.rows} filas {self.verb} en {len(self.inserters)} archivos "
+                f"({self.rows_per_second:,.0f} filas/s)")
+
+
+class ShardedDestination(Destination):
+    """Destino repartido en varios archivos para no superar el límite de 2 GB de Access.
+
+    Por año, cada ANIO (o el año de Mes, en periodos) va a su propio archivo,
+    cordobaAux_2015.mdb; por tamaño, las filas llenan cordobaAux_1.mdb,
+    cordobaAux_2.mdb y así. En los dos casos, antes de escribir un lote se
+    estima cuánto ocupará el archivo, contando modicuiles, el despliegue de
+    periodos y los índices que se agregarán después, y si se pasaría de
+    max_bytes se abre otro (cordobaAux_2015_2.mdb, si es por año).
+
+    Cada archivo tiene todas las tablas del esquema, y el manifiesto indica
+    qué archivos tienen cada año. La clave primaria se controla dentro de cada
+    archivo: una misma clave sólo podría repetirse entre dos archivos de un año
+    que no entró en uno, y eso lo evita el control de duplicados.
+
+    Con read_only, connect no borra archivos vacíos y close no reescribe el
+    manifiesto: es para leer un destino ya convertido sin tocarlo.
+    """
+
+    def __init__(self, dest_file, kind=None, shard_by=SHARD_BY_YEAR, max_bytes=DEFAULT_MAX_FILE_MB * 2**20,
+                 on_status=None, read_only=False):
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"Forma de dividir el destino desconocida: {shard_by}")
+        if max_bytes > ACCESS_MAX_MB * 2**20:
+            raise ValueError(f"El tamaño máximo por archivo no puede superar {ACCESS_MAX_MB} MB.")
+        super().__init__(dest_file)
+        self.kind = kind
+        self.shard_by = shard_by
+        self.max_bytes = max_bytes
+        self.on_status = on_status
+        self.read_only = read_only
+        self.manifest_file = manifest_path(dest_file)
+        self.shards = []
+        # Archivo en el que se escribe cada año; si se divide por tamaño, uno solo bajo la clave None
+        self.current = {}
+        # Tablas creadas (con o sin clave primaria) y tablas ya indexadas, para repetirlas en cada archivo nuevo
+        self.tables = {}
+        self.indexed = []
+        self.key_indexes = {}
+        self.dirty = False
+
+    def report_status(self, message):
+        if self.on_status:
+            self.on_status(message)
+
+    def exists(self):
+        return os.path.exists(self.manifest_file)
+
+    def remove_existing(self):
+        # Se borran los archivos de la división anterior, según su manifiesto
+        if not self.exists():
+            return
+        with open(self.manifest_file, encoding='utf-8') as manifest:
+            files = [entry['file'] for entry in json.load(manifest).get('files', [])]
+        folder = os.path.dirname(self.dest_file)
+        for name in files:
+            create_destination(os.path.join(folder, name), self.kind).remove_existing()
+        os.remove(self.manifest_file)
+
+    def create(self):
+        self.remove_existing()
+        self.shards = []
+        self.current = {}
+        self.tables = {}
+        self.indexed = []
+        self.save_manifest()
+
+    def connect(self):
+        """Abre los archivos que ya figuran en el manifiesto (al reanudar una carga)."""
+        if not self.exists():
+            return
+        with open(self.manifest_file, encoding='utf-8') as manifest:
+            state = json.load(manifest)
+        if state.get('version') != MANIFEST_VERSION:
+            raise ValueError("El manifiesto del destino fue escrito por otra versión del programa y no se puede usar.")
+        # La carga sigue dividiéndose como empezó
+        self.shard_by = state['shard_by']
+        self.max_bytes = state['max_bytes']
+        self.tables = state['tables']
+        self.indexed = state['indexed']
+        folder = os.path.dirname(self.dest_file)
+        for entry in state['files']:
+            shard = Shard(os.path.join(folder, entry['file']), self.kind)
+            shard.destination.connect()
+            for table, info in entry['tables'].items():
+                if shard.destination.table_exists(table):
+                    # Lo que no llegó a confirmarse se descartó: se cuentan las filas que quedaron
+                    shard.rows[table] = shard.destination.count_rows(table)
+                    shard.years[table] = set(info['years'])
+            if not any(shard.rows.values()):
+                # Se abrió justo antes de la interrupción y no llegó a confirmar filas
+                shard.destination.close()
+                if not self.read_only:
+                    shard.destination.remove_existing()
+                continue
+            self.shards.append(shard)
+            for year in self.slots(shard):
+                self.current[year] = shard
+
+    def slots(self, shard):
+        """Claves de self.current que puede seguir llenando un archivo abierto al reanudar."""
+        if self.shard_by == SHARD_BY_SIZE:
+            return [None]
+        return sorted(set().union(*shard.years.values())) if shard.years else []
+
+    def save_manifest(self):
+        by_year = {}
+        for shard in self.shards:
+            for year in sorted(set().union(*shard.years.values()) if shard.years else ()):
+                by_year.setdefault(year, []).append(shard.name)
+        state = {
+            'version': MANIFEST_VERSION,
+            'destination': os.path.basename(self.dest_file),
+            'shard_by': self.shard_by,
+            'max_bytes': self.max_bytes,
+            'tables': self.tables,
+            'indexed': self.indexed,
+            'files': [shard.entry() for shard in self.shards],
+            'years': dict(sorted(by_year.items())),
+        }
+        # Se escribe en un temporal y se reemplaza, para no dejar nunca un manifiesto a medias
+        temp_path = self.manifest_file + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as manifest:
+            json.dump(state, manifest, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_file)
+        self.dirty = False
+
+    def open_shard(self, label):
+        base, extension = os.path.splitext(self.dest_file)
+        names = {shard.name for shard in self.shards}
+        path = f"{base}_{label}{extension}"
+        number = 1
+        while os.path.basename(path) in names:
+            number += 1
+            path = f"{base}_{label}_{number}{extension}"
+
+        shard = Shard(path, self.kind)
+        shard.destination.create()
+        shard.destination.connect()
+        for table, with_key in self.tables.items():
+            shard.destination.create_table(table, with_key=with_key)
+        for table in self.indexed:
+            shard.destination.build_keys(table)
+        for table, key_columns in self.key_indexes.items():
+            shard.destination.ensure_key_index(table, key_columns)
+        shard.destination.commit()
+        self.shards.append(shard)
+        # Un archivo nuevo queda en el manifiesto antes de recibir filas, para poder reanudar
+        self.save_manifest()
+        self.report_status(f"Nuevo archivo de destino: {shard.name}")
+        return shard
+
+    def place(self, table, year, rows):
+        """Reparte filas de un mismo año entre los archivos; devuelve pares (archivo, filas)."""
+        slot = year if self.shard_by == SHARD_BY_YEAR else None
+        placed = []
+        while rows:
+            shard = self.current.get(slot)
+            fits = shard.capacity(table, self.max_bytes) if shard is not None else 0
+            if not fits:
+                if shard is not None and not shard.rows:
+                    raise ValueError("El tamaño máximo por archivo es demasiado chico para una sola fila.")
+                label = year if self.shard_by == SHARD_BY_YEAR else len(self.shards) + 1
+                shard = self.current[slot] = self.open_shard(label)
+                continue
+            chunk, rows = rows[:fits], rows[fits:]
+            if shard.add(table, year, len(chunk)):
+                self.dirty = True
+            placed.append((shard, chunk))
+        return placed
+
+    def shards_for(self, table, key_columns, key):
+        """Archivos que pueden tener la fila con esta clave: los del año de la clave, si la clave lo incluye."""
+        column = SHARD_COLUMNS.get(table)
+        if column not in key_columns:
+            return self.shards
+        year = shard_year(key[list(key_columns).index(column)])
+        return [shard for shard in self.shards if year in shard.years.get(table, ())]
+
+    def table_exists(self, table):
+        return table in self.tables
+
+    def create_table(self, table, if_not_exists=False, with_key=True):
+        if if_not_exists and self.table_exists(table):
+            return
+        for shard in self.shards:
+            shard.destination.create_table(table, with_key=with_key)
+        self.tables[table] = with_key
+        self.dirty = True
+
+    def drop_table(self, table):
+        for shard in self.shards:
+            if shard.destination.table_exists(table):
+                shard.destination.drop_table(table)
+            shard.rows.pop(table, None)
+            shard.years.pop(table, None)
+        self.tables.pop(table, None)
+        if table in self.indexed:
+            self.indexed.remove(table)
+        self.key_indexes.pop(table, None)
+        self.dirty = True
+        self.commit()
+
+    def clear_table(self, table):
+        for shard in self.shards:
+            shard.destination.clear_table(table)
+            shard.rows.pop(table, None)
+            shard.years.pop(table, None)
+        self.dirty = True
+        self.commit()
+
+    def count_rows(self, table):
+        return sum(shard.destination.count_rows(table) for shard in self.shards)
+
+    def iter_column_values(self, table, columns, fetch_size=10000, order_by=()):
+        # El orden vale dentro de cada archivo, no entre archivos
+        for shard in self.shards:
+            yield from shard.destination.iter_column_values(table, columns, fetch_size, order_by)
+
+    def select_by_key(self, table, key_columns, key):
+        for shard in self.shards_for(table, key_columns, key):
+            row = shard.destination.select_by_key(table, key_columns, key)
+            if row is not None:
+                return row
+        return None
+
+    def update_by_key(self, table, key_columns, row):
+        columns = table_columns(table)
+        key = [row[columns.index(column)] for column in key_columns]
+        for shard in self.shards_for(table, key_columns, key):
+            if shard.destination.select_by_key(table, key_columns, key) is not None:
+                shard.destination.update_by_key(table, key_columns, row)
+                return
+
+    def bulk_inserter(self, table, columns, batch_size=DEFAULT_BATCH_SIZE):
+        return ShardedInserter(self, table, columns, batch_size)
+
+    def ensure_key_index(self, table, key_columns):
+        for shard in self.shards:
+            shard.destination.ensure_key_index(table, key_columns)
+        self.key_indexes[table] = list(key_columns)
+
+    def build_keys(self, table):
+        created = []
+        for shard in self.shards:
+            for name in shard.destination.build_keys(table):
+                if name not in created:
+                    created.append(name)
+        if table not in self.indexed:
+            self.indexed.append(table)
+            self.dirty = True
+        return created
+
+    def populate_modicuiles(self):
+        for shard in self.shards:
+            if shard.rows.get('cuiles'):
+                shard.destination.populate_modicuiles()
+                shard.derive('cuiles', 'modicuiles', DERIVED_ROWS['cuiles']['modicuiles'])
+        self.dirty = True
+
+    def unpivot_periodos_from_staging(self):
+        for shard in self.shards:
+            if shard.rows.get(PERIODOS_STAGING_TABLE):
+                shard.destination.unpivot_periodos_from_staging()
+                shard.derive(PERIODOS_STAGING_TABLE, 'periodos', DERIVED_ROWS[PERIODOS_STAGING_TABLE]['periodos'])
+        self.dirty = True
+
+    def commit(self):
+        for shard in self.shards:
+            shard.destination.commit()
+        # El manifiesto se reescribe sólo si cambió qué años tiene cada archivo
+        if self.dirty:
+            self.save_manifest()
+
+    def close(self):
+        try:
+            if self.shards and not self.read_only:
+                self.save_manifest()
+        except OSError as e:
+            self.report_status(f"No se pudo escribir el manifiesto del destino: {e}")
+        for shard in self.shards:
+            shard.destination.close()
@@ -0,0 +1,392 @@
+import os
+
+from carga_masiva import BulkInserter, DEFAULT_BATCH_SIZE
+
+
+class DatabaseEngineError(Exception):
+    """Excepción personalizada para cuando falta el motor de base de datos de Access."""
+    pass
+
+
+MONTHS = range(1, 13)
+
+# Esquema de las tablas de destino: columnas con su tipo Access y clave primaria
+TABLE_SCHEMAS = {
+    'cuiles': (
+        [('CUIT', 'TEXT'), ('ANIO', 'TEXT'), ('CUIL', 'TEXT')]
+        + [(f'{prefix}{month}', 'DOUBLE') for month in MONTHS for prefix in ('REMUNERACION', 'APORTE')]
+        + [('tipo', 'TEXT')],
+        ('CUIT', 'ANIO', 'CUIL'),
+    ),
+    'modicuiles': (
+        [('CUIT', 'TEXT'), ('ANIO', 'TEXT'), ('CUIL', 'TEXT')]
+        + [(f'RemuMinima{month}', 'DOUBLE') for month in MONTHS],
+        ('CUIT', 'ANIO', 'CUIL'),
+    ),
+    'periodos': (
+        [('CUIT', 'TEXT(11)'), ('Mes', 'TEXT(7)'), ('Afiliados', 'LONG'), ('Remuneracion', 'DOUBLE'),
+         ('Aporte', 'DOUBLE'), ('Contribucion', 'DOUBLE'), ('Depo1', 'DOUBLE'), ('FeDepo1', 'DATETIME'),
+         ('Retencion', 'DOUBLE'), ('CantMenor', 'LONG'), ('RemuMenor', 'DOUBLE'), ('CantMayor', 'LONG'),
+         ('RemuMayor', 'DOUBLE'), ('intepago', 'DOUBLE')],
+        ('CUIT', 'Mes'),
+    ),
+    # Tabla intermedia con una fila ancha por CUIT y año; se despliega en periodos con SQL
+    'periodos_carga': (
+        [('CUIT', 'TEXT(11)'), ('ANIO', 'LONG')]
+        + [(f'{name}_{month}', column_type) for month in MONTHS for name, column_type in (
+            ('Aporte', 'DOUBLE'), ('Contribucion', 'DOUBLE'), ('Depo1', 'DOUBLE'), ('FeDepo1', 'DATETIME'),
+            ('Retencion', 'DOUBLE'), ('Afiliados', 'LONG'), ('Remuneracion', 'DOUBLE'))],
+        (),
+    ),
+}
+
+PERIODOS_STAGING_TABLE = 'periodos_carga'
+
+# Índices secundarios para las consultas habituales sobre el destino; CUIT+Mes ya lo
+# cubre la clave primaria de periodos
+SECONDARY_INDEXES = {
+    'cuiles': [('idx_cuiles_cuil', ('CUIL',))],
+    'modicuiles': [('idx_modicuiles_cuil', ('CUIL',))],
+}
+
+
+def table_columns(table):
+    return [name for name, _ in TABLE_SCHEMAS[table][0]]
+
+
+def table_key(table):
+    return list(TABLE_SCHEMAS[table][1])
+
+
+def primary_key_name(table):
+    return f"pk_{table}"
+
+
+def table_ddl(table, with_key=True):
+    """CREATE TABLE de una tabla del esquema; sin with_key la clave primaria se agrega después de cargar."""
+    columns, key = TABLE_SCHEMAS[table]
+    definitions = [f"{name} {column_type}" for name, column_type in columns]
+    if key and with_key:
+        definitions.append(f"CONSTRAINT {primary_key_name(table)} PRIMARY KEY ({', '.join(key)})")
+    return f"CREATE TABLE {table} (\n    " + ",\n    ".join(definitions) + "\n)"
+
+
+class Destination:
+    """Base común de los destinos de la conversión.
+
+    Cada implementación crea el archivo y abre la conexión; el esquema de las
+    tablas cuiles, modicuiles y periodos es el mismo para todas.
+    """
+
+    def __init__(self, dest_file):
+        self.dest_file = dest_file
+        self.conn = None
+        self.cursor = None
+
+    def create(self):
+        raise NotImplementedError
+
+    def connect(self):
+        raise NotImplementedError
+
+    def table_exists(self, table):
+        raise NotImplementedError
+
+    def exists(self):
+        return os.path.exists(self.dest_file)
+
+    def open_existing(self):
+        """Abre el destino conservando su contenido; si no existe, lo crea vacío."""
+        if not self.exists():
+            self.create()
+        self.connect()
+
+    def remove_existing(self):
+        if os.path.exists(self.dest_file):
+            os.remove(self.dest_file)
+
+    def file_size(self):
+        """Bytes que ocupa hoy el destino en disco."""
+        return os.path.getsize(self.dest_file) if os.path.exists(self.dest_file) else 0
+
+    def execute(self, sql, params=()):
+        return self.cursor.execute(sql, params)
+
+    def count_rows(self, table):
+        self.cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return self.cursor.fetchone()[0]
+
+    def iter_column_values(self, table, columns, fetch_size=10000, order_by=()):
+        """Recorre los valores de algunas columnas de una tabla, por bloques (ordenados por order_by, si se indica)."""
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if order_by:
+            sql += f" ORDER BY {', '.join(order_by)}"
+        self.cursor.execute(sql)
+        while True:
+            rows = self.cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def select_by_key(self, table, key_columns, key):
+        where = ' AND '.join(f"{column} = ?" for column in key_columns)
+        self.cursor.execute(f"SELECT {', '.join(table_columns(table))} FROM {table} WHERE {where}", tuple(key))
+        return self.cursor.fetchone()
+
+    def update_by_key(self, table, key_columns, row):
+        """Reemplaza los valores de la fila con la misma clave que row (en el orden de las columnas de la tabla)."""
+        columns = table_columns(table)
+        values = [(column, value) for column, value in zip(columns, row) if column not in key_columns]
+        key = [row[columns.index(column)] for column in key_columns]
+        assignments = ', '.join(f"{column} = ?" for column, _ in values)
+        where = ' AND '.join(f"{column} = ?" for column in key_columns)
+        self.cursor.execute(f"UPDATE {table} SET {assignments} WHERE {where}", tuple(value for _, value in values) + tuple(key))
+
+    def clear_table(self, table):
+        self.cursor.execute(f"DELETE FROM {table}")
+        self.commit()
+
+    def bulk_inserter(self, table, columns, batch_size=DEFAULT_BATCH_SIZE):
+        return BulkInserter(self.cursor, table, columns, batch_size)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            # Lo no confirmado se descarta antes de cerrar: con sentencias todavía abiertas, sqlite3
+            # difiere el cierre real y la transacción seguiría bloqueando el archivo
+            self.conn.rollback()
+            self.conn.close()
+            self.conn = None
+            self.cursor = None
+
+    def create_table(self, table, if_not_exists=False, with_key=True):
+        if if_not_exists and self.table_exists(table):
+            return
+        self.cursor.execute(table_ddl(table, with_key))
+
+    def create_cuiles_table(self, if_not_exists=False, with_key=True):
+        # Crear la tabla con la estructura requerida
+        self.create_table('cuiles', if_not_exists, with_key)
+
+    def create_modicuiles_table(self, if_not_exists=False, with_key=True):
+        # Crear la tabla con la estructura requerida
+        self.create_table('modicuiles', if_not_exists, with_key)
+
+    def index_names(self, table):
+        raise NotImplementedError
+
+    def unique_indexes(self, table):
+        """Columnas de cada índice único de la tabla, clave primaria incluida, por nombre del índice."""
+        raise NotImplementedError
+
+    def has_primary_key(self, table):
+        # Se reconoce por las columnas y no por el nombre: los destinos de versiones anteriores
+        # declaran la clave sin nombre (PRIMARY KEY (...)) y el motor le pone uno propio
+        key = {column.upper() for column in table_key(table)}
+        return any({column.upper() for column in columns} == key for columns in self.unique_indexes(table).values())
+
+    def add_primary_key(self, table):
+        self.cursor.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {primary_key_name(table)} PRIMARY KEY ({', '.join(table_key(table))})"
+        )
+
+    def create_index(self, name, table, columns):
+        self.cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+    def ensure_key_index(self, table, key_columns):
+        """Asegura un índice sobre la clave para buscar filas por clave en plena carga."""
+        if table_key(table):
+            if not self.has_primary_key(table):
+                self.add_primary_key(table)
+            return
+        name = f"idx_{table}_clave"
+        if name not in self.index_names(table):
+            self.create_index(name, table, key_columns)
+
+    def build_keys(self, table):
+        """Agrega la clave primaria y los índices secundarios que le falten a una tabla ya cargada.
+
+        Armar cada índice en una sola pasada sobre los datos es mucho más rápido
+        que mantenerlo fila a fila durante la inserción masiva. Devuelve los
+        nombres de los índices creados.
+        """
+        created = []
+        if table_key(table) and not self.has_primary_key(table):
+            self.add_primary_key(table)
+            created.append(primary_key_name(table))
+        existing = self.index_names(table)
+        for name, columns in SECONDARY_INDEXES.get(table, []):
+            if name not in existing:
+                self.create_index(name, table, columns)
+                created.append(name)
+        return created
+
+    def populate_modicuiles(self):
+        # Utilizar INSERT INTO ... SELECT para una operación masiva y eficiente
+        sql = """
+        INSERT INTO modicuiles ( 
+            CUIT, ANIO, CUIL, 
+            RemuMinima1, RemuMinima2, RemuMinima3, RemuMinima4, 
+            RemuMinima5, RemuMinima6, RemuMinima7, RemuMinima8, 
+            RemuMinima9, RemuMinima10, RemuMinima11, RemuMinima12 
+        )
+        SELECT 
+            CUIT, ANIO, CUIL, 
+            REMUNERACION1, REMUNERACION2, REMUNERACION3, REMUNERACION4, 
+            REMUNERACION5, REMUNERACION6, REMUNERACION7, REMUNERACION8, 
+            REMUNERACION9, REMUNERACION10, REMUNERACION11, REMUNERACION12
+        FROM cuiles
+        """
+        self.cursor.execute(sql)
+
+    # Operador de concatenación de texto en el SQL del destino
+    concat_operator = ' & '
+
+    def create_periodos_staging_table(self):
+        if self.table_exists(PERIODOS_STAGING_TABLE):
+            self.drop_table(PERIODOS_STAGING_TABLE)
+        self.create_table(PERIODOS_STAGING_TABLE)
+        self.commit()
+
+    def drop_table(self, table):
+        self.cursor.execute(f"DROP TABLE {table}")
+        self.commit()
+
+    def unpivot_periodos_from_staging(self):
+        """Despliega la tabla intermedia en periodos con un INSERT ... SELECT por mes."""
+        for month in MONTHS:
+            mes = f"ANIO{self.concat_operator}'-{month:02d}'"
+            sql = f"""
+            INSERT INTO periodos (
+                CUIT, Mes, Afiliados, Remuneracion, Aporte, Contribucion, Depo1, FeDepo1,
+                Retencion, CantMenor, RemuMenor, CantMayor, RemuMayor, intepago
+            )
+            SELECT
+                CUIT, {mes}, Afiliados_{month}, Remuneracion_{month}, Aporte_{month}, Contribucion_{month},
+                Depo1_{month}, FeDepo1_{month}, Retencion_{month}, 0, 0, Afiliados_{month}, Remuneracion_{month}, 0
+            FROM {PERIODOS_STAGING_TABLE}
+            """
+            self.cursor.execute(sql)
+
+    def create_periodos_table(self, with_key=True):
+        """Crea la tabla 'periodos' en la base de datos de destino."""
+        if not self.table_exists('periodos'):
+            self.create_table('periodos', with_key=with_key)
+            self.commit()
+
+class AccessDestination(Destination):
+    """Destino Access (.mdb) creado con msaccessdb y escrito con pyodbc."""
+
+    def create(self):
+        import msaccessdb
+
+        # Crear una nueva base de datos Access
+        self.remove_existing()
+
+        try:
+            msaccessdb.create(self.dest_file)
+        except Exception as e:
+            # Comprobación específica para el error de 'motor de base de datos no encontrado'
+            if "No se pudo encontrar el archivo" in str(e) or "-1028" in str(e) or "no reconoce este tipo de base de datos" in str(e):
+                raise DatabaseEngineError from e
+
+            # Para cualquier otro error, simplemente relanzar.
+            raise e
+
+    def connect(self):
+        import pyodbc
+
+        try:
+            self.conn = pyodbc.connect(f'DRIVER={{Microsoft Access Driver (*.mdb)}};DBQ={self.dest_file};')
+        except pyodbc.Error:
+            self.conn = pyodbc.connect(f'DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={self.dest_file};')
+        self.cursor = self.conn.cursor()
+
+    def table_exists(self, table):
+        return self.cursor.tables(table=table, tableType='TABLE').fetchone() is not None
+
+    def index_names(self, table):
+        return {row.index_name for row in self.cursor.statistics(table) if row.index_name}
+
+    def unique_indexes(self, table):
+        indexes = {}
+        for row in self.cursor.statistics(table, unique=True):
+            if row.index_name and not row.non_unique:
+                indexes.setdefault(row.index_name, []).append((row.ordinal_position, row.column_name))
+        return {name: [column for _, column in sorted(columns)] for name, columns in indexes.items()}
+
+
+class SQLiteDestination(Destination):
+    """Destino SQLite con el mismo esquema que el .mdb, pensado para Linux y pruebas.
+
+    Usa WAL, una sola transacción grande por etapa y executemany sobre una
+    sentencia preparada; SQLite acepta los nombres de tipo de Access (TEXT,
+    DOUBLE, LONG, DATETIME) con la afinidad equivalente.
+    """
+
+    concat_operator = ' || '
+
+    def create(self):
+        self.remove_existing()
+        for suffix in ('-wal', '-shm', '-journal'):
+            if os.path.exists(self.dest_file + suffix):
+                os.remove(self.dest_file + suffix)
+
+    def connect(self):
+        import sqlite3
+
+        self.conn = sqlite3.connect(self.dest_file)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA cache_size=-65536")
+
+    def file_size(self):
+        # Con WAL lo confirmado puede estar todavía en el archivo -wal
+        wal = self.dest_file + '-wal'
+        return super().file_size() + (os.path.getsize(wal) if os.path.exists(wal) else 0)
+
+    def table_exists(self, table):
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        return self.cursor.fetchone() is not None
+
+    def index_names(self, table):
+        self.cursor.execute(f"PRAGMA index_list({table})")
+        return {row[1] for row in self.cursor.fetchall()}
+
+    def unique_indexes(self, table):
+        # La clave declarada en CREATE TABLE queda como un índice automático único
+        self.cursor.execute(f"PRAGMA index_list({table})")
+        names = [row[1] for row in self.cursor.fetchall() if row[2]]
+        indexes = {}
+        for name in names:
+            self.cursor.execute(f'PRAGMA index_info("{name}")')
+            indexes[name] = [row[2] for row in sorted(self.cursor.fetchall())]
+        return indexes
+
+    def add_primary_key(self, table):
+        # SQLite no admite ALTER TABLE ... ADD CONSTRAINT: un índice único cumple la misma función
+        self.cursor.execute(
+            f"CREATE UNIQUE INDEX {primary_key_name(table)} ON {table} ({', '.join(table_key(table))})"
+        )
+
+
+# Extensiones reconocidas para cada tipo de destino
+DESTINATION_TYPES = {
+    'access': AccessDestination,
+    'sqlite': SQLiteDestination,
+}
+
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+
+def create_destination(dest_file, kind=None):
+    """Devuelve el destino adecuado según el tipo pedido o la extensión del archivo."""
+    if kind is None:
+        kind = 'sqlite' if dest_file.lower().endswith(SQLITE_EXTENSIONS) else 'access'
+    if kind not in DESTINATION_TYPES:
+        raise ValueError(f"Tipo de destino desconocido: {kind}")
+    return DESTINATION_TYPES[kind](dest_file)
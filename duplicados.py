@@ -0,0 +1,334 @@
+import sys
+from array import array
+from operator import itemgetter
+
+from destinos import PERIODOS_STAGING_TABLE, TABLE_SCHEMAS, table_columns
+from transformacion import pivot_periodos, unpivot_periodos
+from validacion import to_amount
+
+# Políticas ante filas con la clave repetida
+FIRST_WINS = 'first'
+LAST_WINS = 'last'
+SUM_AMOUNTS = 'sum'
+DUPLICATE_POLICIES = (FIRST_WINS, LAST_WINS, SUM_AMOUNTS)
+
+# Memoria máxima del conjunto de claves de cada tabla, en MB
+DEFAULT_MEMORY_MB = 256
+
+REJECT_REASONS = {
+    FIRST_WINS: "duplicada: se conservó la primera",
+    LAST_WINS: "duplicada: reemplazada por una posterior",
+    SUM_AMOUNTS: "duplicada: importes sumados a la primera",
+}
+NOT_SUMMED_REASON = "duplicada: importes no numéricos, no se sumaron"
+
+INITIAL_SLOTS = 1 << 16
+MAX_LOAD = 0.7
+MASK64 = (1 << 64) - 1
+# Multiplicador de Fibonacci para repartir claves consecutivas por toda la tabla
+GOLDEN = 0x9E3779B97F4A7C15
+# Lo que ocupa cada entrada del set de claves no empaquetables, aparte de la tupla y sus textos
+SET_ENTRY_BYTES = 40
+
+
+class DuplicateBudgetError(Exception):
+    """El conjunto de claves de una tabla no entra en la memoria asignada."""
+    pass
+
+
+def _number(value, digits):
+    text = str(value)
+    if len(text) == digits and text.isascii() and text.isdigit():
+        return int(text)
+    return None
+
+
+def _month(value):
+    # 'AAAA-MM' -> AAAAMM
+    text = str(value)
+    if len(text) == 7 and text[4] == '-':
+        return _number(text[:4] + text[5:], 6)
+    return None
+
+
+def _digits(digits):
+    return lambda value: _number(value, digits)
+
+
+# Clave de cada tabla: columna, cómo se lleva a entero y cuántos dígitos ocupa en la clave empaquetada
+DEDUP_KEYS = {
+    'cuiles': [('CUIT', _digits(11), 11), ('ANIO', _digits(4), 4), ('CUIL', _digits(11), 11)],
+    'periodos': [('CUIT', _digits(11), 11), ('Mes', _month, 6)],
+    PERIODOS_STAGING_TABLE: [('CUIT', _digits(11), 11), ('ANIO', _digits(4), 4)],
+}
+
+
+def _amount_indexes(table, key_columns):
+    # Columnas que se suman con la política SUM_AMOUNTS: los importes (DOUBLE) fuera de la clave
+    return [
+        i for i, (name, column_type) in enumerate(TABLE_SCHEMAS[table][0])
+        if column_type == 'DOUBLE' and name not in key_columns
+    ]
+
+
+class ExpandedStorage:
+    """Cómo se guardan en el destino las filas de una tabla que se controla de otra forma.
+
+    Las filas anchas de PERIODOS (una por CUIT y año, como en el origen) se
+    controlan con su clave, pero en el destino están desplegadas en las doce
+    filas mensuales de periodos: expand las despliega, collapse vuelve a armar
+    la fila ancha con lo que hay en el destino y stored_key lleva la clave de
+    una fila guardada a la de la fila ancha.
+    """
+
+    def __init__(self, table, key_columns, expand, collapse, stored_key):
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.key_positions = [table_columns(table).index(column) for column in key_columns]
+        self.expand = expand
+        self.collapse = collapse
+        self.stored_key = stored_key
+        self.amount_indexes = _amount_indexes(table, key_columns)
+
+    def key_of(self, row):
+        return [row[i] for i in self.key_positions]
+
+
+EXPANDED_STORAGE = {
+    PERIODOS_STAGING_TABLE: ExpandedStorage(
+        'periodos', ('CUIT', 'Mes'), unpivot_periodos, pivot_periodos, lambda key: (key[0], str(key[1])[:4])
+    ),
+}
+
+
+class PackedKeySet:
+    """Conjunto de claves enteras en arreglos de 64 bits (más 32 si la clave es más ancha).
+
+    Es una tabla hash de direccionamiento abierto: cada clave ocupa 8 o 12
+    bytes, contra unos 70 de un set de Python, y la tabla crece duplicándose
+    hasta el presupuesto de memoria, nunca más allá. extra_bytes es lo que
+    otros ocupan del mismo presupuesto.
+    """
+
+    def __init__(self, wide, max_bytes):
+        self.slot_bytes = 12 if wide else 8
+        self.wide = wide
+        self.max_bytes = max_bytes
+        self.extra_bytes = 0
+        self.count = 0
+        self._allocate(INITIAL_SLOTS)
+
+    def _allocate(self, slots):
+        self.slots = slots
+        self.shift = 64 - (slots.bit_length() - 1)
+        self.limit = int(slots * MAX_LOAD)
+        self.low = array('Q', bytes(8 * slots))
+        self.high = array('I', bytes(4 * slots)) if self.wide else None
+
+    @property
+    def nbytes(self):
+        return self.slots * self.slot_bytes
+
+    def add(self, key):
+        """Agrega una clave no negativa; devuelve False si ya estaba."""
+        # Se guarda key + 1 para que una casilla en cero signifique vacía
+        key += 1
+        low = key & MASK64
+        high = key >> 64
+        mask = self.slots - 1
+        i = ((key * GOLDEN) & MASK64) >> self.shift
+        lows = self.low
+        highs = self.high
+        while True:
+            current = lows[i]
+            if highs is None:
+                if current == low:
+                    return False
+                if current == 0:
+                    break
+            else:
+                current_high = highs[i]
+                if current == low and current_high == high:
+                    return False
+                if current == 0 and current_high == 0:
+                    break
+            i = (i + 1) & mask
+
+        lows[i] = low
+        if highs is not None:
+            highs[i] = high
+        self.count += 1
+        if self.count > self.limit:
+            self._grow()
+        return True
+
+    def _grow(self):
+        # Mientras se rehace la tabla conviven la anterior y la nueva, del doble
+        if self.nbytes * 3 + self.extra_bytes > self.max_bytes:
+            raise DuplicateBudgetError(
+                f"El control de duplicados superó {self.max_bytes // 2**20} MB con {self.count} claves. "
+                "Aumente la memoria asignada al control de duplicados."
+            )
+        lows, highs = self.low, self.high
+        self._allocate(self.slots * 2)
+        self.count = 0
+        for i, low in enumerate(lows):
+            high = highs[i] if highs is not None else 0
+            if low or high:
+                self.add(((high << 64) | low) - 1)
+
+
+class DuplicateFilter:
+    """Detecta, lote a lote, las filas cuya clave ya apareció antes en la carga de una tabla.
+
+    Las claves se empaquetan en un entero (CUIT y CUIL de 11 dígitos, año y mes
+    como números) y se guardan en un PackedKeySet, así el control es O(1) por
+    fila y su memoria tiene un tope. Las claves que no tienen la forma esperada
+    van a un set aparte, que en los archivos reales queda casi vacío y que
+    cuenta para el mismo tope de memoria.
+
+    Con expanded, las filas son las anchas de PERIODOS pero el destino las
+    tiene desplegadas en periodos (ver ExpandedStorage): la política se aplica
+    a las doce filas mensuales de cada fila repetida.
+    """
+
+    def __init__(self, table, policy, max_bytes=DEFAULT_MEMORY_MB * 2**20, expanded=False):
+        if policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"Política de duplicados desconocida: {policy}")
+        self.table = table
+        self.policy = policy
+        self.columns = table_columns(table)
+        spec = DEDUP_KEYS[table]
+        self.key_columns = [column for column, _, _ in spec]
+        self.key_of = itemgetter(*[self.columns.index(column) for column in self.key_columns])
+        self.parsers = [(parse, 10 ** digits) for _, parse, digits in spec]
+        self.keys = PackedKeySet(sum(digits for _, _, digits in spec) > 19, max_bytes)
+        self.unpacked = set()
+        self.amount_indexes = _amount_indexes(table, self.key_columns)
+        self.storage = EXPANDED_STORAGE[table] if expanded else None
+        self.duplicates = 0
+        self.indexed = False
+
+    def pack(self, key):
+        packed = 0
+        for value, (parse, scale) in zip(key, self.parsers):
+            number = parse(value)
+            if number is None:
+                return None
+            packed = packed * scale + number
+        return packed
+
+    def is_new(self, key):
+        packed = self.pack(key)
+        if packed is not None:
+            return self.keys.add(packed)
+        key = tuple(str(value) for value in key)
+        if key in self.unpacked:
+            return False
+        self.unpacked.add(key)
+        # Estas claves comparten el presupuesto con las empaquetadas
+        keys = self.keys
+        keys.extra_bytes += sys.getsizeof(key) + sum(map(sys.getsizeof, key)) + SET_ENTRY_BYTES
+        if keys.nbytes + keys.extra_bytes > keys.max_bytes:
+            raise DuplicateBudgetError(
+                f"El control de duplicados superó {keys.max_bytes // 2**20} MB con {keys.count + len(self.unpacked)} "
+                f"claves, {len(self.unpacked)} de ellas sin la forma esperada. "
+                "Aumente la memoria asignada al control de duplicados."
+            )
+        return True
+
+    def seed(self, keys):
+        """Registra claves que ya están en el destino (al reanudar una carga)."""
+        for key in keys:
+            self.is_new(key)
+
+    def seed_from(self, destination):
+        """Registra las claves de las filas ya cargadas en el destino."""
+        if self.storage is None:
+            self.seed(destination.iter_column_values(self.table, self.key_columns))
+            return
+        storage = self.storage
+        self.seed(storage.stored_key(key) for key in destination.iter_column_values(storage.table, storage.key_columns))
+
+    def split(self, rows):
+        """Separa un lote en filas nuevas y filas con la clave repetida."""
+        new_rows = []
+        duplicates = []
+        key_of = self.key_of
+        for row in rows:
+            if self.is_new(key_of(row)):
+                new_rows.append(row)
+            else:
+                duplicates.append(row)
+        self.duplicates += len(duplicates)
+        return new_rows, duplicates
+
+    def merge(self, current, row, amount_indexes=None):
+        """Suma los importes de row a los de current; ValueError si alguno no es un número."""
+        merged = list(current)
+        for i in self.amount_indexes if amount_indexes is None else amount_indexes:
+            if row[i] is not None:
+                # Sin validación, un importe puede llegar como texto: se suma como número, no se concatena
+                amount = to_amount(row[i])
+                merged[i] = amount if merged[i] is None else to_amount(merged[i]) + amount
+        return merged
+
+    def resolve(self, destination, duplicates):
+        """Aplica la política a las filas repetidas, ya confirmadas las nuevas del lote.
+
+        Devuelve los pares (motivo, fila) a rechazar: la fila repetida si se
+        conserva la primera o se suman los importes, y la fila anterior si la
+        reemplaza la última.
+        """
+        reason = REJECT_REASONS[self.policy]
+        if self.policy == FIRST_WINS:
+            return [(reason, row) for row in duplicates]
+
+        if not self.indexed:
+            # Sin índice, cada búsqueda por clave recorrería la tabla entera
+            if self.storage is None:
+                destination.ensure_key_index(self.table, self.key_columns)
+            else:
+                destination.ensure_key_index(self.storage.table, self.storage.key_columns)
+            self.indexed = True
+
+        if self.storage is not None:
+            return [self.resolve_expanded(destination, row, reason) for row in duplicates]
+
+        rejected = []
+        for row in duplicates:
+            key = self.key_of(row)
+            current = destination.select_by_key(self.table, self.key_columns, key)
+            if self.policy == LAST_WINS:
+                destination.update_by_key(self.table, self.key_columns, row)
+                rejected.append((reason, current))
+                continue
+            try:
+                merged = self.merge(current, row)
+            except (ValueError, TypeError):
+                rejected.append((NOT_SUMMED_REASON, row))
+                continue
+            destination.update_by_key(self.table, self.key_columns, merged)
+            rejected.append((reason, row))
+        return rejected
+
+    def resolve_expanded(self, destination, row, reason):
+        """Aplica la política a una fila ancha repetida sobre sus doce filas mensuales; devuelve el par a rechazar."""
+        storage = self.storage
+        rows = storage.expand(row)
+        current = [destination.select_by_key(storage.table, storage.key_columns, storage.key_of(stored))
+                   for stored in rows]
+        if self.policy == LAST_WINS:
+            for stored in rows:
+                destination.update_by_key(storage.table, storage.key_columns, stored)
+            return reason, storage.collapse(row[0], row[1], current)
+
+        try:
+            # Se suman todos los meses o ninguno
+            merged = [stored if previous is None else self.merge(previous, stored, storage.amount_indexes)
+                      for previous, stored in zip(current, rows)]
+        except (ValueError, TypeError):
+            return NOT_SUMMED_REASON, row
+        for stored in merged:
+            destination.update_by_key(storage.table, storage.key_columns, stored)
+        return reason, row
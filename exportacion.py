@@ -0,0 +1,223 @@
+import csv
+import datetime
+import os
+import shutil
+
+from destinos import TABLE_SCHEMAS, table_columns
+from validacion import to_date
+
+# Carpeta, junto al destino, con una subcarpeta por tabla exportada y dentro una por formato,
+# para que cada formato quede como un dataset particionado propio (<tabla>/csv, <tabla>/parquet)
+EXPORT_SUFFIX = "_exportacion"
+EXPORT_FORMATS = ('csv', 'parquet')
+
+# Columna por la que se particiona cada tabla (una carpeta COLUMNA=valor por partición)
+PARTITION_COLUMNS = {'cuiles': 'ANIO', 'modicuiles': 'ANIO', 'periodos': 'Mes'}
+
+# Filas por archivo de una partición antes de pasar al siguiente part-NNNNN
+CHUNK_ROWS = 1_000_000
+
+# Filas por row group de Parquet, y tope de filas en memoria entre todas las particiones
+ROW_GROUP_ROWS = 65_536
+MAX_BUFFERED_ROWS = 262_144
+
+
+def export_dir(dest_file):
+    return os.path.splitext(dest_file)[0] + EXPORT_SUFFIX
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _partition_name(column, value):
+    # Valores de partición como carpetas COLUMNA=valor, sin caracteres que no admite el sistema de archivos
+    text = '' if value is None else str(value)
+    return f"{column}={''.join(c if c.isalnum() or c in '-_.' else '_' for c in text) or '__vacio__'}"
+
+
+class _PartitionedWriter:
+    """Base de los escritores de una tabla: reparte las filas por partición y numera los archivos."""
+
+    extension = None
+
+    def __init__(self, directory, table):
+        self.directory = directory
+        self.table = table
+        self.columns = table_columns(table)
+        self.partition_column = PARTITION_COLUMNS[table]
+        self.partition_index = self.columns.index(self.partition_column)
+        # Por partición: archivo abierto, filas escritas en él y número de parte
+        self.parts = {}
+        self.rows = 0
+        self.files = 0
+
+    def write(self, rows):
+        groups = {}
+        index = self.partition_index
+        for row in rows:
+            groups.setdefault(row[index], []).append(row)
+        for value, group in groups.items():
+            self.write_partition(_partition_name(self.partition_column, value), group)
+        self.rows += len(rows)
+
+    def part_path(self, partition, number):
+        folder = os.path.join(self.directory, partition)
+        os.makedirs(folder, exist_ok=True)
+        self.files += 1
+        return os.path.join(folder, f"part-{number:05d}.{self.extension}")
+
+    def write_partition(self, partition, rows):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class CsvTableWriter(_PartitionedWriter):
+    """CSV con encabezado, un archivo por partición y parte de hasta CHUNK_ROWS filas."""
+
+    extension = 'csv'
+
+    def write_partition(self, partition, rows):
+        while rows:
+            part = self.parts.get(partition)
+            if part is None or part['rows'] >= CHUNK_ROWS:
+                number = 0 if part is None else part['number'] + 1
+                if part is not None:
+                    part['file'].close()
+                part_file = open(self.part_path(partition, number), 'w', encoding='utf-8', newline='')
+                writer = csv.writer(part_file)
+                writer.writerow(self.columns)
+                part = self.parts[partition] = {'file': part_file, 'writer': writer, 'rows': 0, 'number': number}
+            chunk = rows[:CHUNK_ROWS - part['rows']]
+            part['writer'].writerows(chunk)
+            part['rows'] += len(chunk)
+            rows = rows[len(chunk):]
+
+    def close(self):
+        for part in self.parts.values():
+            part['file'].close()
+        self.parts = {}
+
+
+_ARROW_TYPES = {
+    'TEXT': 'string',
+    'DOUBLE': 'float64',
+    'LONG': 'int64',
+    'DATETIME': 'date32',
+}
+
+
+def _arrow_values(column_type):
+    """Cómo llevar los valores de una columna al tipo de Parquet."""
+    if column_type.startswith('TEXT'):
+        return lambda value: None if value is None else str(value)
+    if column_type == 'DATETIME':
+        # pyarrow guarda date32: los datetime se truncan y el texto se interpreta como fecha
+        return lambda value: value.date() if isinstance(value, datetime.datetime) else to_date(value)
+    return None
+
+
+class ParquetTableWriter(_PartitionedWriter):
+    """Parquet por partición, con row groups de ROW_GROUP_ROWS filas.
+
+    Las filas se acumulan por partición hasta completar un row group; si entre
+    todas las particiones se supera MAX_BUFFERED_ROWS, se escribe la más grande.
+    """
+
+    extension = 'parquet'
+
+    def __init__(self, directory, table):
+        super().__init__(directory, table)
+        import pyarrow
+
+        self.pa = pyarrow
+        schema = TABLE_SCHEMAS[table][0]
+        self.schema = pyarrow.schema([
+            (name, getattr(pyarrow, _ARROW_TYPES[column_type.split('(')[0]])()) for name, column_type in schema
+        ])
+        self.converters = [_arrow_values(column_type) for _, column_type in schema]
+        self.buffers = {}
+        self.buffered = 0
+
+    def write_partition(self, partition, rows):
+        buffer = self.buffers.setdefault(partition, [])
+        buffer.extend(rows)
+        self.buffered += len(rows)
+        if len(buffer) >= ROW_GROUP_ROWS:
+            self.flush_partition(partition)
+        while self.buffered > MAX_BUFFERED_ROWS:
+            self.flush_partition(max(self.buffers, key=lambda name: len(self.buffers[name])))
+
+    def flush_partition(self, partition):
+        import pyarrow.parquet as pq
+
+        rows = self.buffers.pop(partition, [])
+        self.buffered -= len(rows)
+        while rows:
+            part = self.parts.get(partition)
+            if part is None or part['rows'] >= CHUNK_ROWS:
+                number = 0 if part is None else part['number'] + 1
+                if part is not None:
+                    part['writer'].close()
+                writer = pq.ParquetWriter(self.part_path(partition, number), self.schema)
+                part = self.parts[partition] = {'writer': writer, 'rows': 0, 'number': number}
+            chunk = rows[:CHUNK_ROWS - part['rows']]
+            part['writer'].write_table(self.to_table(chunk), row_group_size=ROW_GROUP_ROWS)
+            part['rows'] += len(chunk)
+            rows = rows[len(chunk):]
+
+    def to_table(self, rows):
+        arrays = []
+        for values, convert, field in zip(zip(*rows), self.converters, self.schema):
+            if convert is not None:
+                values = list(map(convert, values))
+            arrays.append(self.pa.array(values, type=field.type))
+        return self.pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def close(self):
+        for partition in list(self.buffers):
+            self.flush_partition(partition)
+        for part in self.parts.values():
+            part['writer'].close()
+        self.parts = {}
+
+
+EXPORT_WRITERS = {
+    'csv': CsvTableWriter,
+    'parquet': ParquetTableWriter,
+}
+
+
+class TableExport:
+    """Exportación de una tabla a todos los formatos pedidos."""
+
+    def __init__(self, base_dir, table, formats):
+        self.table = table
+        self.directory = os.path.join(base_dir, table)
+        # Cada exportación reemplaza entera la de una ejecución anterior
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        self.writers = [
+            EXPORT_WRITERS[export_format](os.path.join(self.directory, export_format), table)
+            for export_format in formats
+        ]
+
+    def write(self, rows):
+        for writer in self.writers:
+            writer.write(rows)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+        return {
+            'directory': self.directory,
+            'rows': self.writers[0].rows if self.writers else 0,
+            'files': sum(writer.files for writer in self.writers),
+        }
@@ -0,0 +1,212 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import contextmanager, nullcontext
+
+from lectura_particionada import PartitionedRead, SOURCE_PARTITION_COLUMNS, DEFAULT_PARTITION_BY
+from odb_hsqldb import HsqldbScriptReader, has_hsqldb_script
+
+# Cantidad de filas que se piden al controlador en cada fetchmany
+FETCH_SIZE = 5000
+
+# Tabla esperada en los archivos de CUILES
+CUILES_SOURCE_TABLE = "VW_DIBENEF_ANNIO_AP_ADIC_DEL - CUILES 2015"
+
+
+class SourceConnectionError(Exception):
+    """No se pudo conectar a la base de datos de origen."""
+    pass
+
+
+class SourceTable:
+    """Tabla de origen abierta que se entrega por lotes de filas.
+
+    partitioning es el PartitionedRead con el que se lee, si se lee en particiones.
+    Sin total, progress (si se indica) es una función que devuelve la parte del
+    origen ya leída, de 0 a 1.
+    """
+
+    def __init__(self, name, columns, batches, total=None, partitioning=None, progress=None):
+        self.name = name
+        self.columns = list(columns)
+        self.batches = batches
+        self.total = total
+        self.partitioning = partitioning
+        self.progress = progress
+
+    @classmethod
+    def from_cursor(cls, name, cursor, total=None, fetch_size=FETCH_SIZE):
+        columns = [column[0] for column in cursor.description]
+        return cls(name, columns, _fetch_batches(cursor, fetch_size), total)
+
+    def iter_batches(self):
+        return self.batches
+
+    def __iter__(self):
+        for rows in self.iter_batches():
+            yield from rows
+
+    def records(self):
+        """Genera cada fila como un dict columna -> valor, sin materializar la tabla."""
+        columns = self.columns
+        for row in self:
+            yield dict(zip(columns, row))
+
+
+def _fetch_batches(cursor, fetch_size):
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def _notify(on_status, message):
+    if on_status:
+        on_status(message)
+
+
+def _stage(stage, name):
+    return stage(name) if stage else nullcontext()
+
+
+def _partitioned_source(cursor, connect, table_name, quote, partition_by, partitions, fetch_size, on_status):
+    """SourceTable que lee la tabla en rangos de la columna elegida, o None si no se puede repartir."""
+    column = SOURCE_PARTITION_COLUMNS[partition_by]
+    cursor.execute(f"SELECT * FROM {quote(table_name)} WHERE 1 = 0")
+    columns = [description[0] for description in cursor.description]
+    if column not in columns:
+        _notify(on_status, f"La tabla no tiene la columna {column}: se lee sin particiones.")
+        return None
+
+    read = PartitionedRead.plan(cursor, connect, table_name, column, partitions, quote, fetch_size)
+    if len(read.ranges) < 2:
+        return None
+    _notify(on_status, f"Leyendo la tabla en {len(read.ranges)} particiones por {column}...")
+    return SourceTable(table_name, columns, read.iter_batches(), read.total, partitioning=read)
+
+
+@contextmanager
+def open_source(source_file, preferred_table=None, on_status=None, fetch_size=FETCH_SIZE, stage=None,
+                partitions=1, partition_by=DEFAULT_PARTITION_BY):
+    """Abre el archivo de origen (.odb o .accdb) y entrega un SourceTable listo para iterar.
+
+    stage, si se indica, es una función nombre -> context manager con la que se
+    miden la extracción del archivo y la conexión al origen. Con partitions > 1,
+    la tabla de un .accdb o de un .odb con base SQLite se lee en esa cantidad de
+    rangos de partition_by ('cuit' o 'anio') a la vez, cada uno con su conexión.
+    """
+    if source_file.endswith('.odb'):
+        with zipfile.ZipFile(source_file, 'r') as zip_ref:
+            if has_hsqldb_script(zip_ref):
+                # Base HSQLDB embebida: se lee el script directamente del zip
+                _notify(on_status, "Leyendo script HSQLDB del archivo ODB...")
+                if partitions > 1:
+                    _notify(on_status, "El script HSQLDB es un único flujo comprimido: se lee sin particiones.")
+                with _stage(stage, 'source_connect'):
+                    reader = HsqldbScriptReader(zip_ref, preferred_table)
+                try:
+                    _notify(on_status, "Leyendo datos de la tabla...")
+                    yield SourceTable(reader.table.name, reader.columns, reader.iter_batches(fetch_size),
+                                      progress=reader.fraction_read)
+                finally:
+                    reader.close()
+                return
+
+        with _open_legacy_odb(source_file, preferred_table, on_status, fetch_size, stage, partitions, partition_by) as source:
+            yield source
+
+    elif source_file.endswith('.accdb'):
+        import pyodbc
+
+        _notify(on_status, "Conectando a la base de datos Access...")
+        conn_str = f'DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={source_file};'
+        with _stage(stage, 'source_connect'):
+            try:
+                source_conn = pyodbc.connect(conn_str)
+            except pyodbc.Error as e:
+                raise SourceConnectionError(str(e)) from e
+
+        try:
+            source_cursor = source_conn.cursor()
+
+            tables = [row[2] for row in source_cursor.tables(tableType='TABLE').fetchall()]
+            if not tables:
+                raise Exception("No se encontraron tablas en la base de datos Access")
+            # Si no está la tabla esperada, se asume que la de interés es la primera
+            table_name = preferred_table if preferred_table in tables else tables[0]
+
+            _notify(on_status, "Leyendo datos de la tabla...")
+            if partitions > 1:
+                with _stage(stage, 'source_partition'):
+                    source = _partitioned_source(
+                        source_cursor, lambda: pyodbc.connect(conn_str), table_name, lambda name: f"[{name}]",
+                        partition_by, partitions, fetch_size, on_status
+                    )
+                if source is not None:
+                    yield source
+                    return
+
+            with _stage(stage, 'source_connect'):
+                source_cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
+                total = source_cursor.fetchone()[0]
+                source_cursor.execute(f"SELECT * FROM [{table_name}]")
+
+            yield SourceTable.from_cursor(table_name, source_cursor, total, fetch_size)
+        finally:
+            source_conn.close()
+
+    else:
+        raise Exception(f"Formato de archivo no soportado: {source_file}")
+
+
+@contextmanager
+def _open_legacy_odb(source_file, preferred_table, on_status, fetch_size, stage=None, partitions=1,
+                     partition_by=DEFAULT_PARTITION_BY):
+    """Archivos .odb sin script HSQLDB que traen una base SQLite en database/data/script."""
+    temp_dir = tempfile.mkdtemp()
+    sqlite_conn = None
+    try:
+        _notify(on_status, "Extrayendo archivo ODB...")
+        with _stage(stage, 'archive_extraction'), zipfile.ZipFile(source_file, 'r') as zip_ref:
+            zip_ref.extractall(temp_dir)
+
+        db_path = os.path.join(temp_dir, "database", "data")
+        if not os.path.exists(db_path):
+            raise Exception("No se pudo encontrar la base de datos en el archivo ODB")
+
+        _notify(on_status, "Conectando a la base de datos...")
+        script_path = os.path.join(db_path, "script")
+        with _stage(stage, 'source_connect'):
+            sqlite_conn = sqlite3.connect(script_path)
+            sqlite_cursor = sqlite_conn.cursor()
+
+            sqlite_cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+            tables = [row[0] for row in sqlite_cursor.fetchall()]
+            if not tables:
+                raise Exception("No se encontraron tablas en la base de datos ODB")
+            table_name = preferred_table if preferred_table in tables else tables[0]
+
+        _notify(on_status, "Leyendo datos de la tabla...")
+        if partitions > 1:
+            with _stage(stage, 'source_partition'):
+                source = _partitioned_source(
+                    sqlite_cursor, lambda: sqlite3.connect(script_path), table_name,
+                    lambda name: f'"{name}"', partition_by, partitions, fetch_size, on_status
+                )
+            if source is not None:
+                yield source
+                return
+
+        with _stage(stage, 'source_connect'):
+            sqlite_cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"')
+            total = sqlite_cursor.fetchone()[0]
+            sqlite_cursor.execute(f'SELECT * FROM "{table_name}"')
+
+        yield SourceTable.from_cursor(table_name, sqlite_cursor, total, fetch_size)
+    finally:
+        if sqlite_conn is not None:
+            sqlite_conn.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,397 @@
+import argparse
+import bisect
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+from destinos import MONTHS, create_destination, table_columns, DESTINATION_TYPES
+from instrumentacion import report_path
+
+# Índice del historial de cada CUIL, junto al destino
+HISTORY_SUFFIX = ".historial_cuil"
+
+HISTORY_MAGIC = b'HISTCUIL'
+HISTORY_VERSION = 1
+
+# Columnas de cuiles que guarda el índice, en el orden de la tabla
+HISTORY_COLUMNS = table_columns('cuiles')
+# Orden de lectura del destino: las filas de un mismo CUIL llegan juntas, por año y CUIT
+HISTORY_ORDER = ('CUIL', 'ANIO', 'CUIT')
+
+# Cabecera: marca, versión, ancho de las claves, CUIL distintos, filas y dónde empiezan las filas
+_HEADER = struct.Struct('<8sIIQQQ')
+# Importes de una fila: REMUNERACION y APORTE de cada mes, intercalados como en la tabla
+_AMOUNTS = struct.Struct(f'<{len(HISTORY_COLUMNS) - 4}d')
+_TEXT_LENGTH = struct.Struct('<H')
+NULL_TEXT = 0xFFFF
+
+# Tramos de las claves que se escriben de una vez
+WRITE_KEYS = 1 << 16
+
+
+class HistoryIndexError(Exception):
+    """El índice del historial no existe, está incompleto o lo escribió otra versión del programa."""
+    pass
+
+
+def history_path(dest_file):
+    return os.path.splitext(dest_file)[0] + HISTORY_SUFFIX
+
+
+def _key(value):
+    return str(value).strip().encode('utf-8')
+
+
+def _text(value):
+    if value is None:
+        return _TEXT_LENGTH.pack(NULL_TEXT)
+    data = str(value).encode('utf-8')[:NULL_TEXT - 1]
+    return _TEXT_LENGTH.pack(len(data)) + data
+
+
+def _amount(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # Un nulo (o un importe que no es número, sin validación) se guarda como NaN
+        return math.nan
+
+
+def encode_row(row):
+    """Una fila de cuiles como registro del índice: CUIT, ANIO y tipo con su largo, y los 24 importes."""
+    return b''.join((_text(row[0]), _text(row[1]), _text(row[-1]),
+                     _AMOUNTS.pack(*(_amount(value) for value in row[3:-1]))))
+
+
+class HistoryIndexWriter:
+    """Arma el índice a partir de las filas de cuiles, idealmente ordenadas por CUIL.
+
+    Las filas se escriben una tras otra en un archivo temporal; por cada tramo
+    de filas seguidas del mismo CUIL se guarda sólo la clave, dónde empieza y
+    cuántas son. Si las filas no llegaron ordenadas (un destino dividido, otra
+    intercalación), al cerrar se ordenan esos tramos, no las filas: un CUIL
+    puede quedar en varios tramos contiguos del índice, y la consulta los une.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+        self.keys = []
+        self.offsets = array('Q')
+        self.counts = array('I')
+        self.size = 0
+        self.rows = 0
+        self.skipped = 0
+
+    def add(self, row):
+        if row[2] is None:
+            self.skipped += 1
+            return
+        key = _key(row[2])
+        if self.keys and self.keys[-1] == key:
+            self.counts[-1] += 1
+        else:
+            self.keys.append(key)
+            self.offsets.append(self.size)
+            self.counts.append(1)
+        record = encode_row(row)
+        self.records.write(record)
+        self.size += len(record)
+        self.rows += 1
+
+    def close(self):
+        """Escribe el índice completo y lo publica en lugar del anterior; devuelve el resumen."""
+        keys, offsets, counts = self.keys, self.offsets, self.counts
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            keys = [keys[i] for i in order]
+            offsets = array('Q', (offsets[i] for i in order))
+            counts = array('I', (counts[i] for i in order))
+        width = max(map(len, keys), default=0)
+        records_start = _HEADER.size + len(keys) * (offsets.itemsize + counts.itemsize + width)
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as index_file:
+                index_file.write(_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, width, len(keys), self.rows,
+                                              records_start))
+                offsets.tofile(index_file)
+                counts.tofile(index_file)
+                for start in range(0, len(keys), WRITE_KEYS):
+                    index_file.write(b''.join(key.ljust(width, b'\0') for key in keys[start:start + WRITE_KEYS]))
+                self.records.seek(0)
+                shutil.copyfileobj(self.records, index_file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            self.records.close()
+
+        return {
+            'file': self.path,
+            'cuils': sum(1 for i, key in enumerate(keys) if not i or key != keys[i - 1]),
+            'rows': self.rows,
+            'skipped': self.skipped,
+            'bytes': os.path.getsize(self.path),
+        }
+
+    def abort(self):
+        self.records.close()
+
+
+def write_history_index(destination, path, fetch_size=10000):
+    """Lee la tabla cuiles del destino, ordenada por CUIL, y escribe el índice del historial en path."""
+    writer = HistoryIndexWriter(path)
+    try:
+        for row in destination.iter_column_values('cuiles', HISTORY_COLUMNS, fetch_size, order_by=HISTORY_ORDER):
+            writer.add(row)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+class _FixedKeys:
+    """Las claves del índice, de ancho fijo, leídas directamente del archivo mapeado para buscarlas con bisect."""
+
+    def __init__(self, buffer, start, width, count):
+        self.buffer = buffer
+        self.start = start
+        self.width = width
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        start = self.start + i * self.width
+        return self.buffer[start:start + self.width]
+
+
+class CuilHistory:
+    """Consulta el historial de un CUIL sobre el índice mapeado en memoria, sin abrir el destino.
+
+    La búsqueda es binaria sobre las claves ordenadas, y las filas de un CUIL
+    están juntas en el archivo: una consulta lee sólo esas filas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self.file = open(path, 'rb')
+        except FileNotFoundError:
+            raise HistoryIndexError(f"No existe el índice del historial {path}") from None
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise HistoryIndexError(f"El índice del historial {path} está vacío") from None
+        self.views = []
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        if len(self.map) < _HEADER.size:
+            raise HistoryIndexError(f"El índice del historial {self.path} está incompleto")
+        magic, version, width, cuils, rows, records_start = _HEADER.unpack_from(self.map)
+        if magic != HISTORY_MAGIC or version != HISTORY_VERSION:
+            raise HistoryIndexError(
+                f"El índice {self.path} fue escrito por otra versión del programa: vuelva a generarlo"
+            )
+        view = memoryview(self.map)
+        self.views.append(view)
+        offsets_end = _HEADER.size + cuils * 8
+        self.offsets = view[_HEADER.size:offsets_end].cast('Q')
+        self.counts = view[offsets_end:offsets_end + cuils * 4].cast('I')
+        self.views.extend([self.offsets, self.counts])
+        self.keys = _FixedKeys(self.map, offsets_end + cuils * 4, width, cuils)
+        self.records_start = records_start
+        self.total_rows = rows
+        self.cuils = cuils
+
+    def close(self):
+        # Las vistas sobre el mapeo se liberan antes: con alguna abierta, mmap no se deja cerrar
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_text(self, position):
+        (length,) = _TEXT_LENGTH.unpack_from(self.map, position)
+        position += _TEXT_LENGTH.size
+        if length == NULL_TEXT:
+            return None, position
+        return self.map[position:position + length].decode('utf-8'), position + length
+
+    def _read_record(self, position, cuil):
+        cuit, position = self._read_text(position)
+        anio, position = self._read_text(position)
+        tipo, position = self._read_text(position)
+        amounts = [None if math.isnan(value) else value for value in _AMOUNTS.unpack_from(self.map, position)]
+        return (cuit, anio, cuil, *amounts, tipo), position + _AMOUNTS.size
+
+    def rows(self, cuil):
+        """Filas de cuiles del CUIL (en el orden de sus columnas), por año y CUIT; una lista vacía si no está."""
+        key = _key(cuil)
+        width = self.keys.width
+        if not key or len(key) > width:
+            return []
+        probe = key.ljust(width, b'\0')
+        first = bisect.bisect_left(self.keys, probe)
+        last = bisect.bisect_right(self.keys, probe, first)
+        cuil = key.decode('utf-8')
+
+        rows = []
+        for i in range(first, last):
+            position = self.records_start + self.offsets[i]
+            for _ in range(self.counts[i]):
+                row, position = self._read_record(position, cuil)
+                rows.append(row)
+        rows.sort(key=lambda row: (str(row[1]), str(row[0])))
+        return rows
+
+    def timeline(self, cuil):
+        """Historial mes a mes del CUIL: un dict por mes y empleador (CUIT) con su remuneración y su aporte.
+
+        Los meses sin remuneración ni aporte (nulos en la tabla) no se incluyen.
+        """
+        timeline = []
+        for row in self.rows(cuil):
+            amounts = row[3:-1]
+            for month in MONTHS:
+                remuneracion, aporte = amounts[2 * month - 2], amounts[2 * month - 1]
+                if remuneracion is None and aporte is None:
+                    continue
+                timeline.append({
+                    'Mes': f"{str(row[1])[:4]}-{month:02d}",
+                    'CUIT': row[0],
+                    'Remuneracion': remuneracion,
+                    'Aporte': aporte,
+                    'tipo': row[-1],
+                })
+        timeline.sort(key=lambda entry: (entry['Mes'], str(entry['CUIT'])))
+        return timeline
+
+
+def last_conversion_was_split(dest_file):
+    """Si la última conversión a dest_file lo dividió en varios archivos.
+
+    Un manifiesto solo no alcanza: puede haber quedado de una conversión
+    anterior. Decide el informe de la última ejecución; sin informe, lo más
+    reciente entre el manifiesto y el archivo único.
+    """
+    from destino_dividido import manifest_path
+
+    manifest = manifest_path(dest_file)
+    if not os.path.exists(manifest):
+        return False
+    try:
+        with open(report_path(dest_file), encoding='utf-8') as report_file:
+            return bool(json.load(report_file).get('shard_by'))
+    except (OSError, ValueError):
+        pass
+    return not os.path.exists(dest_file) or os.path.getmtime(manifest) >= os.path.getmtime(dest_file)
+
+
+def open_destination_for_index(dest_file, kind=None):
+    """Abre un destino ya convertido (un archivo o, si se dividió, todos sus archivos) para leer cuiles.
+
+    Sólo se lee: no se borran archivos ni se reescribe el manifiesto.
+    """
+    from destino_dividido import ShardedDestination
+
+    if last_conversion_was_split(dest_file):
+        destination = ShardedDestination(dest_file, kind, read_only=True)
+    else:
+        destination = create_destination(dest_file, kind)
+        if not destination.exists():
+            raise HistoryIndexError(f"No se encontró el archivo de destino {dest_file}")
+    destination.connect()
+    return destination
+
+
+def rebuild_history_index(dest_file, kind=None):
+    destination = open_destination_for_index(dest_file, kind)
+    try:
+        return write_history_index(destination, history_path(dest_file))
+    finally:
+        destination.close()
+
+
+def _format_amount(value):
+    return "" if value is None else f"{value:.2f}"
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="conversor_cuiles consulta",
+        description="Muestra el historial mes a mes de uno o más CUIL (remuneración y aporte por empleador) "
+                    "a partir del índice generado junto al destino, sin abrir la base."
+    )
+    parser.add_argument("cuil", nargs='+', help="CUIL a consultar")
+    parser.add_argument("--out", required=True, help="Archivo destino de la conversión (.mdb, .sqlite/.db)")
+    parser.add_argument("--destino", choices=sorted(DESTINATION_TYPES),
+                        help="Con --reconstruir, tipo de destino; por defecto se deduce de la extensión de --out")
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="Vuelve a generar el índice leyendo la tabla cuiles del destino antes de consultar")
+    parser.add_argument("--json", action="store_true", help="Escribe el resultado en JSON")
+    return parser
+
+
+def cli_main(argv=None):
+    """Subcomando consulta: historial de cada CUIL pedido."""
+    args = build_arg_parser().parse_args(argv)
+    dest_file = os.path.abspath(args.out)
+
+    try:
+        if args.reconstruir:
+            summary = rebuild_history_index(dest_file, args.destino)
+            print(f"Índice del historial: {summary['cuils']} CUIL, {summary['rows']} filas en {summary['file']}",
+                  file=sys.stderr, flush=True)
+        history = CuilHistory(history_path(dest_file))
+    except HistoryIndexError as e:
+        hint = "" if args.reconstruir else ". Genérelo con --indice-historial al convertir o con --reconstruir"
+        print(f"Error: {e}{hint}.", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: no se pudo generar el índice del historial: {e}", file=sys.stderr)
+        return 1
+
+    with history:
+        results = {cuil: history.timeline(cuil) for cuil in args.cuil}
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for cuil, timeline in results.items():
+            if not timeline:
+                print(f"CUIL {cuil}: sin datos")
+                continue
+            print(f"CUIL {cuil}: {len(timeline)} meses")
+            print(f"{'Mes':<8} {'CUIT':<13} {'Remuneracion':>14} {'Aporte':>12}  tipo")
+            for entry in timeline:
+                print(f"{entry['Mes']:<8} {str(entry['CUIT']):<13} {_format_amount(entry['Remuneracion']):>14} "
+                      f"{_format_amount(entry['Aporte']):>12}  {entry['tipo'] if entry['tipo'] is not None else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli_main())
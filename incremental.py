@@ -0,0 +1,223 @@
+import datetime
+import hashlib
+
+from carga_masiva import BatchExecutor, BulkInserter, DEFAULT_BATCH_SIZE
+from destinos import TABLE_SCHEMAS, table_columns, table_key
+
+# Tabla auxiliar del destino con la huella de contenido de cada fila cargada
+FINGERPRINT_TABLE = 'huellas'
+FINGERPRINT_DDL = f"""
+CREATE TABLE {FINGERPRINT_TABLE} (
+    tabla TEXT(20),
+    clave TEXT(80),
+    huella TEXT(16),
+    PRIMARY KEY (tabla, clave)
+)
+"""
+
+KEY_SEPARATOR = '|'
+
+
+def _canonical_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _canonical_double(value):
+    if value is None:
+        return ''
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _canonical_long(value):
+    if value is None:
+        return ''
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _canonical_datetime(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        if value.time() == datetime.time(0, 0):
+            return value.date().isoformat()
+        return value.isoformat(' ')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+def _canonicalizer_for(column_type):
+    if column_type.startswith('TEXT'):
+        return _canonical_text
+    if column_type == 'DOUBLE':
+        return _canonical_double
+    if column_type == 'LONG':
+        return _canonical_long
+    if column_type == 'DATETIME':
+        return _canonical_datetime
+    return _canonical_text
+
+
+class RowFingerprinter:
+    """Calcula la clave y la huella de contenido de las filas de una tabla.
+
+    Los valores se normalizan según el tipo de la columna de destino, de modo que
+    una fila leída del origen y la misma fila leída del .mdb tengan la misma huella.
+    """
+
+    def __init__(self, table):
+        columns, key = TABLE_SCHEMAS[table]
+        names = [name for name, _ in columns]
+        self.canonicalizers = [_canonicalizer_for(column_type) for _, column_type in columns]
+        self.key_indexes = [names.index(name) for name in key]
+
+    def key(self, row):
+        return KEY_SEPARATOR.join(_canonical_text(row[i]) for i in self.key_indexes)
+
+    def fingerprint(self, row):
+        canonical = '\x1f'.join(canonicalize(value) for canonicalize, value in zip(self.canonicalizers, row))
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def ensure_fingerprint_table(destination):
+    if not destination.table_exists(FINGERPRINT_TABLE):
+        destination.execute(FINGERPRINT_DDL)
+        destination.commit()
+
+
+class IncrementalLoader:
+    """Sustituto de BulkInserter para el modo "actualiza".
+
+    Compara la huella de cada fila entrante con la guardada para su clave primaria:
+    inserta las filas nuevas, actualiza sólo las que cambiaron y, si se pide,
+    borra al cerrar las filas que ya no vienen en el origen.
+    """
+
+    def __init__(self, destination, table, batch_size=DEFAULT_BATCH_SIZE, delete_missing=False):
+        self.destination = destination
+        self.table = table
+        self.delete_missing = delete_missing
+        self.fingerprinter = RowFingerprinter(table)
+
+        columns = table_columns(table)
+        key = table_key(table)
+        value_columns = [column for column in columns if column not in key]
+        self.value_indexes = [columns.index(column) for column in value_columns]
+        self.key_indexes = self.fingerprinter.key_indexes
+        where = ' AND '.join(f"{column} = ?" for column in key)
+
+        cursor = destination.cursor
+        self.inserter = BulkInserter(cursor, table, columns, batch_size)
+        self.updater = BatchExecutor(
+            cursor, table, f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in value_columns)} WHERE {where}", batch_size
+        )
+        self.deleter = BatchExecutor(cursor, table, f"DELETE FROM {table} WHERE {where}", batch_size)
+        self.fingerprint_inserter = BulkInserter(cursor, FINGERPRINT_TABLE, ['tabla', 'clave', 'huella'], batch_size)
+        self.fingerprint_updater = BatchExecutor(
+            cursor, FINGERPRINT_TABLE, f"UPDATE {FINGERPRINT_TABLE} SET huella = ? WHERE tabla = ? AND clave = ?", batch_size
+        )
+        self.fingerprint_deleter = BatchExecutor(
+            cursor, FINGERPRINT_TABLE, f"DELETE FROM {FINGERPRINT_TABLE} WHERE tabla = ? AND clave = ?", batch_size
+        )
+
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.known = self._load_fingerprints()
+
+    def _load_fingerprints(self):
+        cursor = self.destination.conn.cursor()
+        try:
+            cursor.execute(f"SELECT clave, huella FROM {FINGERPRINT_TABLE} WHERE tabla = ?", (self.table,))
+            known = dict(cursor.fetchall())
+            if known:
+                return known
+
+            # Primera ejecución incremental sobre un destino ya cargado: se calculan las huellas de lo existente
+            cursor.execute(f"SELECT {', '.join(table_columns(self.table))} FROM {self.table}")
+            while True:
+                rows = cursor.fetchmany(DEFAULT_BATCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    key = self.fingerprinter.key(row)
+                    fingerprint = self.fingerprinter.fingerprint(row)
+                    known[key] = fingerprint
+                    self.fingerprint_inserter.add((self.table, key, fingerprint))
+            # Las huellas nuevas deben estar escritas antes de que alguna se actualice
+            self.fingerprint_inserter.flush()
+            return known
+        finally:
+            cursor.close()
+
+    def _key_params(self, row):
+        # Todas las columnas de clave son de texto en el destino
+        return tuple(_canonical_text(row[i]) for i in self.key_indexes)
+
+    def add(self, row):
+        key = self.fingerprinter.key(row)
+        fingerprint = self.fingerprinter.fingerprint(row)
+        previous = self.known.pop(key, None)
+
+        if previous is None:
+            self.inserter.add(row)
+            self.fingerprint_inserter.add((self.table, key, fingerprint))
+            self.inserted += 1
+        elif previous != fingerprint:
+            self.updater.add(tuple(row[i] for i in self.value_indexes) + self._key_params(row))
+            self.fingerprint_updater.add((fingerprint, self.table, key))
+            self.updated += 1
+        else:
+            self.unchanged += 1
+
+    def add_many(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        for executor in (self.inserter, self.updater, self.fingerprint_inserter, self.fingerprint_updater):
+            executor.flush()
+
+    def close(self):
+        if self.delete_missing:
+            # Lo que quedó en known no apareció en el origen de esta ejecución
+            for key in self.known:
+                self.deleter.add(tuple(key.split(KEY_SEPARATOR)))
+                self.fingerprint_deleter.add((self.table, key))
+                self.deleted += 1
+            self.known = {}
+
+        self.flush()
+        self.deleter.flush()
+        self.fingerprint_deleter.flush()
+        return self.stats()
+
+    def stats(self):
+        executors = (self.inserter, self.updater, self.deleter)
+        seconds = sum(executor.elapsed for executor in executors)
+        written = self.inserted + self.updated + self.deleted
+        return {
+            'table': self.table,
+            'rows': written,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'deleted': self.deleted,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(written / seconds, 1) if seconds > 0 else 0.0,
+        }
+
+    def summary(self):
+        return (f"{self.table}: {self.inserted} nuevas, {self.updated} actualizadas, "
+                f"{self.unchanged} sin cambios, {self.deleted} borradas")
@@ -0,0 +1,150 @@
+import datetime
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+REPORT_SUFFIX = ".informe.json"
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso actual, en MB (None si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss_mb()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return round(peak / 1e6 if sys.platform == 'darwin' else peak / 1e3, 1)
+
+
+def _windows_peak_rss_mb():
+    try:
+        import ctypes
+        from ctypes import wintypes
+    except ImportError:
+        return None
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    try:
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return round(counters.PeakWorkingSetSize / 1e6, 1)
+
+
+class StageStats:
+    """Tiempo y filas acumulados de una etapa (opcionalmente por tabla)."""
+
+    def __init__(self, name, table=None):
+        self.name = name
+        self.table = table
+        self.seconds = 0.0
+        self.rows = 0
+        self.calls = 0
+        self.peak_rss_mb = None
+
+    def add(self, seconds, rows=0):
+        self.seconds += seconds
+        self.rows += rows
+        self.calls += 1
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'table': self.table,
+            'seconds': round(self.seconds, 3),
+            'rows': self.rows,
+            'rows_per_second': round(self.rows / self.seconds, 1) if self.seconds > 0 and self.rows else None,
+            'calls': self.calls,
+            'peak_rss_mb': self.peak_rss_mb,
+        }
+
+
+class RunInstrumentation:
+    """Registra cada etapa de una ejecución y arma el informe JSON final.
+
+    Las etapas que ocurren una vez (DDL, modicuiles, commit final) se miden con
+    stage(); las que se repiten lote a lote (lectura, transformación, inserción)
+    acumulan su tiempo con add().
+    """
+
+    def __init__(self):
+        self.started_at = datetime.datetime.now()
+        self.start = time.perf_counter()
+        self.stages = {}
+
+    def _stats(self, name, table):
+        key = (name, table)
+        if key not in self.stages:
+            self.stages[key] = StageStats(name, table)
+        return self.stages[key]
+
+    def add(self, name, table, seconds, rows=0):
+        self._stats(name, table).add(seconds, rows)
+
+    @contextmanager
+    def stage(self, name, table=None, rows=0):
+        stats = self._stats(name, table)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.add(time.perf_counter() - start, rows)
+            stats.peak_rss_mb = peak_rss_mb()
+
+    def timed(self, name, table, iterable):
+        """Recorre un iterable de lotes midiendo el tiempo que se tarda en obtener cada uno."""
+        iterator = iter(iterable)
+        stats = self._stats(name, table)
+        while True:
+            start = time.perf_counter()
+            batch = next(iterator, None)
+            if batch is None:
+                return
+            stats.add(time.perf_counter() - start, len(batch))
+            yield batch
+
+    def report(self, **extra):
+        elapsed = time.perf_counter() - self.start
+        stages = [stats.as_dict() for stats in self.stages.values()]
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(elapsed, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'commits': sum(stats.calls for stats in self.stages.values() if stats.name == 'commit'),
+            'stages': stages,
+            **extra,
+        }
+
+
+def report_path(dest_file):
+    return os.path.splitext(dest_file)[0] + REPORT_SUFFIX
+
+
+def write_report(report, dest_file):
+    """Escribe el informe junto al archivo de destino y devuelve su ruta."""
+    path = report_path(dest_file)
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2, default=str)
+    return path
@@ -0,0 +1,81 @@
+import queue
+import threading
+
+# Lotes que los hilos lectores pueden adelantar al escritor
+QUEUE_BATCHES = 4
+
+# Cada cuánto un lector bloqueado revisa si la carga se canceló (segundos)
+POLL_SECONDS = 0.5
+
+
+class ConcurrentBatchReader:
+    """Recorre varias fuentes de lotes a la vez, cada una en su hilo, y las entrega a un único consumidor.
+
+    Cada fuente es un iterable de lotes (por ejemplo, un generador que lee un
+    origen y transforma sus filas). Los hilos lectores publican en una cola
+    acotada y el consumidor, que es el único que escribe en el destino, recibe
+    los lotes de todas las fuentes intercalados en el orden en que llegan.
+    """
+
+    def __init__(self, sources, queue_batches=QUEUE_BATCHES):
+        self.sources = sources
+        self.queue = queue.Queue(queue_batches)
+        self.cancelled = threading.Event()
+        self.threads = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        for name, batches in self.sources.items():
+            thread = threading.Thread(target=self._read, args=(name, batches), name=f"lector-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _put(self, message):
+        # La cola está acotada: se espera al escritor, salvo que la carga se haya cancelado
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(message, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, name, batches):
+        iterator = iter(batches)
+        try:
+            for batch in iterator:
+                if not self._put(('batch', name, batch)):
+                    return
+        except Exception as e:
+            self._put(('error', name, e))
+            return
+        finally:
+            # El generador se cierra en su propio hilo, que es el dueño de la conexión al origen
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+        self._put(('done', name, None))
+
+    def __iter__(self):
+        """Genera (fuente, lote) a medida que llegan, y (fuente, None) cuando una fuente termina."""
+        pending = len(self.threads)
+        while pending:
+            event, name, payload = self.queue.get()
+            if event == 'batch':
+                yield name, payload
+            elif event == 'done':
+                pending -= 1
+                yield name, None
+            else:
+                raise payload
+
+    def close(self):
+        self.cancelled.set()
+        for thread in self.threads:
+            thread.join()
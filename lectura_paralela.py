@@ -0,0 +1,225 @@
+import glob
+import multiprocessing
+import os
+import pickle
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_origenes import open_mapped_source
+from fuentes import FETCH_SIZE
+from transformacion import periodos_wide_rows, unpivot_periodos
+
+SOURCE_EXTENSIONS = ('.odb', '.accdb')
+
+# Lotes transformados que cada tipo de origen puede tener en espera del escritor
+QUEUE_BATCHES = 8
+
+# Cada cuánto el escritor revisa si algún proceso lector terminó con error (segundos)
+POLL_SECONDS = 0.5
+
+
+def classify_source_file(source_file):
+    """Tipo de origen según el nombre del archivo: 'cuiles', 'periodos' o None."""
+    name = os.path.basename(source_file).lower()
+    if 'periodo' in name:
+        return 'periodos'
+    if 'cuil' in name:
+        return 'cuiles'
+    return None
+
+
+def find_source_files(patterns):
+    """Reúne los orígenes de una lista de carpetas o patrones glob, agrupados por tipo."""
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found.extend(
+                os.path.join(pattern, name) for name in sorted(os.listdir(pattern))
+                if name.lower().endswith(SOURCE_EXTENSIONS)
+            )
+        else:
+            found.extend(sorted(path for path in glob.glob(pattern) if path.lower().endswith(SOURCE_EXTENSIONS)))
+
+    sources = {'cuiles': [], 'periodos': []}
+    unknown = []
+    for source_file in dict.fromkeys(os.path.abspath(path) for path in found):
+        kind = classify_source_file(source_file)
+        if kind is None:
+            unknown.append(os.path.basename(source_file))
+        else:
+            sources[kind].append(source_file)
+
+    if unknown:
+        raise ValueError(
+            "No se pudo determinar si estos archivos son de CUILES o de PERIODOS (el nombre debe contener "
+            f"'cuil' o 'periodo'): {', '.join(unknown)}"
+        )
+    if not sources['cuiles'] and not sources['periodos']:
+        raise ValueError(f"No se encontraron archivos .odb o .accdb en: {', '.join(patterns)}")
+    return sources
+
+
+# Colas y aviso de cancelación del proceso lector, recibidos al arrancar el proceso
+_worker_queues = None
+_worker_cancelled = None
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _init_worker(queues, cancelled):
+    global _worker_queues, _worker_cancelled
+    _worker_queues = queues
+    _worker_cancelled = cancelled
+    # Al salir, el proceso no espera a que alguien vacíe la cola. Si la carga terminó bien, el
+    # escritor ya recibió todo (el aviso 'done' de cada archivo llega después de sus filas);
+    # si se canceló, lo pendiente ya no interesa.
+    for worker_queue in queues.values():
+        worker_queue.cancel_join_thread()
+
+
+def _send(out, message):
+    # La cola está acotada: se espera al escritor, salvo que la lectura se haya cancelado
+    while True:
+        if _worker_cancelled.is_set():
+            raise _Cancelled()
+        try:
+            out.put(message, timeout=POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _compile_batch_transform(kind, periodos_wide, strict):
+    # Los lotes ya llegan mapeados: a cuiles no les falta nada, a periodos se les filtra y despliega
+    if kind == 'cuiles':
+        return None
+    if periodos_wide:
+        return lambda batch: periodos_wide_rows(batch, strict=strict)
+    return lambda batch: [row for wide in periodos_wide_rows(batch, strict=strict) for row in unpivot_periodos(wide)]
+
+
+def _picklable(exc):
+    try:
+        pickle.dumps(exc)
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def read_source_file(kind, source_file, fetch_size=FETCH_SIZE, periodos_wide=False, strict=True, cache=None):
+    """Se ejecuta en un proceso lector: lee y transforma un origen y envía los lotes al escritor."""
+    out = _worker_queues[kind]
+    stats = {'file': source_file, 'source_rows': 0, 'rows': 0, 'read_seconds': 0.0, 'transform_seconds': 0.0,
+             'cached': False}
+
+    def timing(name, seconds, rows):
+        stats['read_seconds' if name == 'read' else 'transform_seconds'] += seconds
+
+    try:
+        with open_mapped_source(source_file, kind, cache, fetch_size=fetch_size, timing=timing) as source:
+            stats['cached'] = source.cached
+            transform = _compile_batch_transform(kind, periodos_wide, strict)
+            for batch in source.iter_batches():
+                start = time.perf_counter()
+                rows = transform(batch) if transform else batch
+                stats['transform_seconds'] += time.perf_counter() - start
+                stats['source_rows'] += len(batch)
+                stats['rows'] += len(rows)
+                _send(out, ('rows', source_file, rows))
+        _send(out, ('done', source_file, stats))
+    except _Cancelled:
+        return
+    except Exception as e:
+        try:
+            _send(out, ('error', source_file, _picklable(e)))
+        except _Cancelled:
+            pass
+
+
+class ParallelSourceReader:
+    """Lee y transforma varios orígenes en paralelo y entrega los lotes a un único escritor.
+
+    Cada archivo se procesa en un proceso del pool; los lotes ya transformados
+    llegan por una cola por tipo de origen (acotada, para que los lectores no se
+    adelanten demasiado al escritor). Los CUILES se encolan antes que los
+    PERIODOS, así el escritor puede cargar una tabla después de la otra. Con
+    strict=False los ANIO no numéricos llegan tal cual, para que los valide el escritor. Con una
+    caché de orígenes, cada proceso toma de ella los archivos que ya se leyeron antes.
+    """
+
+    def __init__(self, sources, workers=None, fetch_size=FETCH_SIZE, periodos_wide=False, strict=True, cache=None):
+        self.sources = sources
+        files = sum(len(source_files) for source_files in sources.values())
+        self.workers = max(1, min(workers or os.cpu_count() or 1, files))
+        self.fetch_size = fetch_size
+        self.periodos_wide = periodos_wide
+        self.strict = strict
+        self.cache = cache
+        self.file_stats = {kind: [] for kind in sources}
+        self.executor = None
+        self.queues = {}
+        self.cancelled = None
+        self.futures = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        # spawn en todas las plataformas: igual comportamiento que en Windows
+        context = multiprocessing.get_context('spawn')
+        self.queues = {kind: context.Queue(QUEUE_BATCHES) for kind in self.sources}
+        self.cancelled = context.Event()
+        self.executor = ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=_init_worker, initargs=(self.queues, self.cancelled)
+        )
+        for kind in ('cuiles', 'periodos'):
+            self.futures[kind] = [
+                self.executor.submit(read_source_file, kind, source_file, self.fetch_size, self.periodos_wide, self.strict,
+                                     self.cache)
+                for source_file in self.sources.get(kind, [])
+            ]
+
+    def batches(self, kind, on_file_done=None):
+        """Genera los lotes transformados de un tipo de origen a medida que llegan, de cualquier archivo."""
+        pending = len(self.sources.get(kind, []))
+        source_queue = self.queues.get(kind)
+        while pending:
+            try:
+                message = source_queue.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                self._check_workers(kind)
+                continue
+
+            event, source_file, payload = message
+            if event == 'rows':
+                yield payload
+            elif event == 'done':
+                pending -= 1
+                self.file_stats[kind].append(payload)
+                if on_file_done:
+                    on_file_done(payload)
+            else:
+                raise payload
+
+    def _check_workers(self, kind):
+        # Un proceso que murió sin poder avisar por la cola deja su futuro con la excepción
+        for future in self.futures[kind]:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def close(self):
+        """Detiene los lectores; si el escritor no consumió todo (por un error), se cancelan."""
+        if self.executor is not None:
+            self.cancelled.set()
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        for source_queue in self.queues.values():
+            source_queue.cancel_join_thread()
+            source_queue.close()
@@ -0,0 +1,165 @@
+import queue
+import threading
+import time
+
+# Valores de --particionar-por: columna del origen por la que se reparten los rangos
+SOURCE_PARTITION_COLUMNS = {'cuit': 'CUIT', 'anio': 'ANIO'}
+DEFAULT_PARTITION_BY = 'cuit'
+
+# Lecturas simultáneas cuando se activan desde la ventana
+DEFAULT_READ_PARTITIONS = 4
+
+# Lotes que cada partición puede adelantar al consumidor
+QUEUE_BATCHES = 4
+
+# Cada cuánto un lector bloqueado revisa si la lectura se canceló (segundos)
+POLL_SECONDS = 0.5
+
+
+class PartitionReadError(Exception):
+    """Una partición no devolvió las filas que el conteo previo indicaba."""
+    pass
+
+
+def _sort_key(value):
+    # Mismo orden que SQLite entre tipos: números, luego texto, luego binarios
+    if isinstance(value, str):
+        return (1, value)
+    if isinstance(value, (bytes, bytearray)):
+        return (2, bytes(value))
+    return (0, value)
+
+
+def partition_ranges(counts, partitions):
+    """Corta los valores de la columna, ordenados, en hasta `partitions` rangos contiguos de cantidad de filas pareja.
+
+    counts es una lista de (valor, filas) sin los nulos; devuelve (desde, hasta, filas) con los extremos incluidos.
+    """
+    counts = sorted(counts, key=lambda item: _sort_key(item[0]))
+    total = sum(rows for _, rows in counts)
+    ranges = []
+    low = None
+    accumulated = 0
+    in_range = 0
+    for i, (value, rows) in enumerate(counts):
+        if low is None:
+            low = value
+        accumulated += rows
+        in_range += rows
+        remaining = len(counts) - i - 1
+        # Se corta al llegar a la parte proporcional, siempre que queden valores para las particiones que faltan
+        if (accumulated >= total * (len(ranges) + 1) / partitions and len(ranges) < partitions - 1) or not remaining:
+            ranges.append((low, value, in_range))
+            low = None
+            in_range = 0
+    return ranges
+
+
+class PartitionedRead:
+    """Lee una tabla del origen por rangos de una columna, cada rango en su propia conexión y su hilo.
+
+    Los lotes se entregan por turnos, uno de cada partición en orden, así la
+    secuencia es la misma en cada ejecución (la reanudación cuenta posiciones)
+    y las filas de una misma clave, que caen siempre en el mismo rango,
+    conservan el orden en que están en el origen.
+    """
+
+    def __init__(self, connect, table, column, ranges, nulls, quote, fetch_size):
+        self.connect = connect
+        self.table = table
+        self.column = column
+        self.ranges = ranges
+        self.nulls = nulls
+        self.quote = quote
+        self.fetch_size = fetch_size
+        self.total = sum(rows for _, _, rows in ranges) + nulls
+        self.partitions = [
+            {'low': str(low), 'high': str(high), 'expected_rows': rows + (nulls if i == 0 else 0),
+             'rows': 0, 'seconds': 0.0}
+            for i, (low, high, rows) in enumerate(ranges)
+        ]
+        self.cancelled = threading.Event()
+
+    @classmethod
+    def plan(cls, cursor, connect, table, column, partitions, quote, fetch_size):
+        """Cuenta las filas por valor de la columna con la conexión principal y arma los rangos."""
+        cursor.execute(f"SELECT {quote(column)}, COUNT(*) FROM {quote(table)} GROUP BY {quote(column)}")
+        counts = cursor.fetchall()
+        nulls = sum(rows for value, rows in counts if value is None)
+        ranges = partition_ranges([(value, rows) for value, rows in counts if value is not None], partitions)
+        return cls(connect, table, column, ranges, nulls, quote, fetch_size)
+
+    def query(self, index):
+        table, column = self.quote(self.table), self.quote(self.column)
+        sql = f"SELECT * FROM {table} WHERE ({column} >= ? AND {column} <= ?)"
+        if index == 0 and self.nulls:
+            sql += f" OR {column} IS NULL"
+        low, high, _ = self.ranges[index]
+        return sql, (low, high)
+
+    def _put(self, out, message):
+        while not self.cancelled.is_set():
+            try:
+                out.put(message, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, index, out):
+        stats = self.partitions[index]
+        start = time.perf_counter()
+        try:
+            # Cada hilo abre y cierra su conexión: ni pyodbc ni sqlite3 la comparten entre hilos
+            conn = self.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(*self.query(index))
+                while True:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    stats['rows'] += len(rows)
+                    if not self._put(out, ('batch', rows)):
+                        return
+            finally:
+                conn.close()
+        except Exception as e:
+            self._put(out, ('error', e))
+            return
+        finally:
+            stats['seconds'] = round(time.perf_counter() - start, 3)
+        self._put(out, ('done', None))
+
+    def iter_batches(self):
+        queues = [queue.Queue(QUEUE_BATCHES) for _ in self.ranges]
+        threads = [
+            threading.Thread(target=self._read, args=(i, out), name=f"particion-{i}", daemon=True)
+            for i, out in enumerate(queues)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            active = list(range(len(queues)))
+            while active:
+                for index in list(active):
+                    event, payload = queues[index].get()
+                    if event == 'batch':
+                        yield payload
+                    elif event == 'done':
+                        active.remove(index)
+                        stats = self.partitions[index]
+                        if stats['rows'] != stats['expected_rows']:
+                            raise PartitionReadError(
+                                f"La partición {stats['low']}..{stats['high']} de {self.column} devolvió "
+                                f"{stats['rows']} filas en lugar de {stats['expected_rows']}"
+                            )
+                    else:
+                        raise payload
+        finally:
+            self.cancelled.set()
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        return {'column': self.column, 'parallelism': len(self.ranges), 'partitions': self.partitions}
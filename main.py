@@ -1,40 +1,84 @@
-import subprocess
-import sys
+import argparse
+import json
 import os
+import sys
+
+REQUIRED_PACKAGES = ('pyodbc', 'msaccessdb')
+
+# Resultado de la última verificación de dependencias, por intérprete, para no repetirla en cada arranque
+DEPENDENCY_CACHE = os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'conversor_cuiles', 'dependencias.json'
+)
 
 def install(package):
+    import subprocess
+
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
-def check_and_install_dependencies():
-    try:
-        import pyodbc
-    except ImportError:
-        print("pyodbc not found. Installing...")
-        install("pyodbc")
+def _dependency_cache_key():
+    return {'python': sys.executable, 'version': sys.version, 'packages': list(REQUIRED_PACKAGES)}
 
+def dependencies_cached():
     try:
-        import msaccessdb
-    except ImportError:
-        print("msaccessdb not found. Installing...")
-        install("msaccessdb")
+        with open(DEPENDENCY_CACHE, encoding='utf-8') as cache_file:
+            return json.load(cache_file) == _dependency_cache_key()
+    except (OSError, ValueError):
+        return False
 
+def save_dependency_cache():
     try:
-        import tkinter
-    except ImportError:
+        os.makedirs(os.path.dirname(DEPENDENCY_CACHE), exist_ok=True)
+        with open(DEPENDENCY_CACHE, 'w', encoding='utf-8') as cache_file:
+            json.dump(_dependency_cache_key(), cache_file)
+    except OSError:
+        # Sin caché sólo se pierde tiempo en el próximo arranque
+        pass
+
+def check_and_install_dependencies(force=False):
+    if not force and dependencies_cached():
+        return
+
+    # find_spec ubica el paquete sin importarlo: pyodbc y msaccessdb se cargan recién al convertir
+    from importlib.util import find_spec
+
+    for package in REQUIRED_PACKAGES:
+        if find_spec(package) is None:
+            print(f"{package} not found. Installing...")
+            install(package)
+
+    if find_spec("tkinter") is None:
         print("tkinter not found. Please install it manually.")
         sys.exit(1)
 
-def main():
-    check_and_install_dependencies()
-    
-    # Get the absolute path to the script's directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Construct the absolute path to conversor_cuiles.py
-    conversor_path = os.path.join(script_dir, "conversor_cuiles.py")
-    
-    # Execute the conversor_cuiles.py script
-    subprocess.call([sys.executable, conversor_path])
+    save_dependency_cache()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Abre el conversor de CUILES y PERIODOS.")
+    parser.add_argument("--verificar-dependencias", action="store_true",
+                        help="Vuelve a verificar (e instalar) las dependencias aunque ya se hayan verificado antes")
+    parser.add_argument("--proceso-separado", action="store_true",
+                        help="Abre la ventana en un segundo intérprete de Python, como las versiones anteriores")
+    args = parser.parse_args(argv)
+
+    check_and_install_dependencies(force=args.verificar_dependencias)
+
+    if args.proceso_separado:
+        import subprocess
+
+        # Get the absolute path to the script's directory
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+
+        # Construct the absolute path to conversor_cuiles.py
+        conversor_path = os.path.join(script_dir, "conversor_cuiles.py")
+
+        # Execute the conversor_cuiles.py script
+        subprocess.call([sys.executable, conversor_path])
+        return
+
+    # En el mismo proceso: no se vuelve a iniciar Python ni a importar todo de nuevo
+    from conversor_cuiles import main as run_conversor
+    run_conversor([])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
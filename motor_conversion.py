@@ -0,0 +1,1028 @@
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from cache_origenes import SourceCache, open_mapped_source, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MB
+from carga_masiva import DEFAULT_BATCH_SIZE
+from destino_dividido import ShardedDestination, DEFAULT_MAX_FILE_MB, SHARD_MODES, remove_previous_shards
+from destinos import create_destination, table_columns, DatabaseEngineError, DESTINATION_TYPES, PERIODOS_STAGING_TABLE
+from duplicados import DuplicateFilter, DEFAULT_MEMORY_MB, FIRST_WINS, LAST_WINS, SUM_AMOUNTS, NOT_SUMMED_REASON
+from exportacion import TableExport, EXPORT_FORMATS, PARTITION_COLUMNS, export_dir, parquet_available
+from historial_cuil import history_path, write_history_index, cli_main as consulta_main
+from incremental import IncrementalLoader, ensure_fingerprint_table
+from instrumentacion import RunInstrumentation, write_report
+from lectura_concurrente import ConcurrentBatchReader
+from lectura_paralela import ParallelSourceReader, find_source_files
+from lectura_particionada import SOURCE_PARTITION_COLUMNS, DEFAULT_PARTITION_BY
+from progreso import PROGRESS_EVERY_ROWS
+from rechazos import RejectWriter
+from reconciliacion import Reconciliation, reconciliation_available, reconciliation_path
+from reanudacion import LoadCheckpoint, ResumeError, skip_loaded_rows
+from transformacion import (
+    CUILES_DEST_COLUMNS, MONTHS, PERIODOS_COLUMNS, PERIODOS_WIDE_COLUMNS,
+    modicuiles_row, periodos_wide_rows, unpivot_periodos,
+)
+from validacion import RowValidator
+
+# Tramo de la barra de progreso que ocupan las lecturas simultáneas
+CONCURRENT_PROGRESS_START = 30
+CONCURRENT_PROGRESS_SPAN = 65
+
+# Rótulo del avance de cada origen, leído de su archivo o por lote; es también su clave en el avance combinado
+PROGRESS_LABELS = {'cuiles': ("registro", "CUILES"), 'periodos': ("período", "PERIODOS")}
+
+# Valores de --duplicados
+DUPLICATE_OPTIONS = {'primera': FIRST_WINS, 'ultima': LAST_WINS, 'sumar': SUM_AMOUNTS}
+
+# Subcomando que consulta el historial de un CUIL en lugar de convertir
+CONSULTA_COMMAND = 'consulta'
+
+
+class ConversionCancelled(Exception):
+    """La conversión se canceló a pedido, entre dos lotes."""
+    pass
+
+
+class ConversionEngine:
+    """Ejecuta la conversión completa sin depender de la interfaz gráfica.
+
+    El avance se informa mediante callbacks: on_status(mensaje) para cada etapa
+    y on_progress(porcentaje, detalle) para la barra de progreso. Si se pasa un
+    cancel_event (threading.Event) y se activa, la conversión se detiene antes
+    del próximo lote con ConversionCancelled: lo no confirmado se descarta y lo
+    confirmado queda en el punto de control para reanudar.
+    """
+
+    def __init__(self, dest_file, source_cuiles_file=None, source_periodos_file=None,
+                 batch_size=DEFAULT_BATCH_SIZE, on_status=None, on_progress=None,
+                 progress_every=PROGRESS_EVERY_ROWS, dest_kind=None, update_mode=False, delete_missing=False,
+                 periodos_staging=False, resume=False, source_batch=None, workers=None, concurrent_reads=False,
+                 deferred_keys=False, duplicates=None, dedup_memory_mb=DEFAULT_MEMORY_MB, validate=False,
+                 export_formats=(), shard_by=None, max_file_mb=DEFAULT_MAX_FILE_MB, reconcile=False,
+                 source_cache=False, source_cache_dir=DEFAULT_CACHE_DIR, source_cache_mb=DEFAULT_CACHE_MB,
+                 read_partitions=1, partition_by=DEFAULT_PARTITION_BY, history_index=False, cancel_event=None):
+        self.dest_file = dest_file
+        self.dest_kind = dest_kind
+        # Modo "actualiza": se conserva el destino y sólo se escriben las filas nuevas o modificadas
+        self.update_mode = update_mode
+        self.delete_missing = delete_missing
+        # PERIODOS por tabla intermedia: se despliegan los doce meses con SQL en lugar de en Python
+        self.periodos_staging = periodos_staging
+        # Reanudar: se conserva lo ya confirmado según el punto de control junto al destino
+        self.resume = resume
+        self.resuming = False
+        self.checkpoint = None
+        self.source_cuiles_file = source_cuiles_file
+        self.source_periodos_file = source_periodos_file
+        # Carga por lote: carpetas o patrones con un archivo por año, leídos en paralelo
+        self.source_batch = source_batch
+        self.workers = workers
+        self.batch_sources = None
+        self.reader = None
+        # Lecturas simultáneas: CUILES y PERIODOS se leen en hilos aparte y se escriben intercalados
+        self.concurrent_reads = concurrent_reads
+        self.combined_progress = None
+        # Claves al final: las tablas se crean sin clave primaria y se indexan una vez cargadas
+        self.deferred_keys = deferred_keys
+        # Filas con la clave repetida: None detiene la carga; si no, la política a aplicar
+        self.duplicates = duplicates
+        self.dedup_memory_mb = dedup_memory_mb
+        # Validación: CUIT/CUIL, importes y fechas se verifican y convierten; las filas inválidas se rechazan
+        self.validate = validate
+        # Exportación a CSV/Parquet particionada, además del destino; exports guarda las que están abiertas
+        self.export_formats = list(export_formats)
+        self.exports = {}
+        self.reject_writers = []
+        # Destino dividido en varios archivos (por año o por tamaño) para no superar el límite de Access
+        self.shard_by = shard_by
+        self.max_file_mb = max_file_mb
+        self.manifest_file = None
+        # Conciliación de cuiles con periodos sobre los mismos lotes que se cargan
+        self.reconcile = reconcile
+        self.reconciliation = None
+        self.reconciliation_summary = None
+        # Caché de orígenes: los archivos ya leídos en otra ejecución no se vuelven a extraer ni a leer
+        self.source_cache = SourceCache(source_cache_dir, source_cache_mb * 2**20) if source_cache else None
+        # Lectura en particiones: cada tabla de origen se lee en rangos de CUIT o ANIO, con una conexión por rango
+        self.read_partitions = read_partitions
+        self.partition_by = partition_by
+        self.source_partitions = {}
+        # Índice del historial por CUIL junto al destino, para consultarlo sin abrir la base
+        self.history_index = history_index
+        self.history_summary = None
+        self.cancel_event = cancel_event
+        self.batch_size = batch_size
+        self.on_status = on_status
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.load_stats = {}
+        self.instrumentation = None
+        self.run_report = None
+        self.report_file = None
+
+    def report_status(self, message):
+        if self.on_status:
+            self.on_status(message)
+
+    def report_progress(self, percent, message=None):
+        if self.on_progress:
+            self.on_progress(percent, message)
+
+    def report_row_progress(self, start, span, done, total, label, progress=None):
+        """Avance dentro de una etapa; sin total conocido, la parte leída del origen según progress(), si lo hay."""
+        fraction = progress() if progress is not None and not total else None
+        if total:
+            self.report_fraction(label, start, span, done / total, f"Procesando {label} {done+1} de {total}...")
+        elif fraction is not None:
+            self.report_fraction(label, start, span, fraction, f"Procesando {label} {done+1} ({fraction:.0%} del origen)...")
+        else:
+            self.report_fraction(label, start, span, 0, f"Procesando {label} {done+1}...")
+
+    def report_fraction(self, key, start, span, fraction, message):
+        if self.combined_progress is not None:
+            # Con lecturas simultáneas la barra muestra el promedio del avance de cada origen
+            self.combined_progress[key] = fraction
+            fraction = sum(self.combined_progress.values()) / len(self.combined_progress)
+            start, span = CONCURRENT_PROGRESS_START, CONCURRENT_PROGRESS_SPAN
+        self.report_progress(start + fraction * span, message)
+
+    @property
+    def periodos_wide_checks(self):
+        """Con validación o control de duplicados, PERIODOS se controla en filas anchas y se despliega después.
+
+        Así cada fila ancha repetida o inválida es un único rechazo, igual que en el origen, y no doce.
+        """
+        return bool(self.validate or self.duplicates)
+
+    def check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ConversionCancelled("Conversión cancelada")
+
+    def stage(self, name, table=None, rows=0):
+        return self.instrumentation.stage(name, table, rows)
+
+    def commit(self, destination, table=None):
+        with self.stage('commit', table):
+            destination.commit()
+
+    def source_stage(self, table):
+        """Función que open_source usa para medir la extracción y la conexión de un origen."""
+        return lambda name: self.stage(name, table)
+
+    def source_timing(self, table):
+        """Función que open_mapped_source usa para sumar los tiempos de lectura y mapeo de cada lote."""
+        return lambda name, seconds, rows: self.instrumentation.add(name, table, seconds, rows)
+
+    @contextmanager
+    def open_source(self, source_file, kind):
+        with open_mapped_source(source_file, kind, self.source_cache, self.report_status,
+                                stage=self.source_stage(kind), timing=self.source_timing(kind),
+                                partitions=self.read_partitions, partition_by=self.partition_by) as source:
+            if source.partitioning is not None:
+                self.source_partitions[kind] = source.partitioning
+            yield source
+
+    def run(self):
+        """Ejecuta la conversión y deja, haya terminado bien o no, un informe JSON junto al destino."""
+        self.instrumentation = RunInstrumentation()
+        error = None
+        try:
+            return self.convert()
+        except ConversionCancelled as e:
+            error = e
+            self.report_status("Conversión cancelada: se descartó el lote en curso; lo ya confirmado se puede reanudar.")
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+            for rejects in self.reject_writers:
+                rejects.close()
+            for export in self.exports.values():
+                export.close()
+            self.exports = {}
+            self.write_run_report(error)
+
+    def write_run_report(self, error=None):
+        report = self.instrumentation.report(
+            status='cancelled' if isinstance(error, ConversionCancelled) else 'error' if error else 'ok',
+            error=f"{type(error).__name__}: {error}" if error else None,
+            destination=self.dest_file,
+            sources=self.batch_sources or {'cuiles': self.source_cuiles_file, 'periodos': self.source_periodos_file},
+            batch_size=self.batch_size,
+            update_mode=self.update_mode,
+            periodos_staging=self.periodos_staging,
+            duplicates=self.duplicates,
+            validate=self.validate,
+            export_formats=self.export_formats,
+            shard_by=self.shard_by,
+            manifest=self.manifest_file,
+            reconciliation=self.reconciliation_summary,
+            read_partitions=self.read_partitions,
+            source_partitions={kind: read.stats() for kind, read in self.source_partitions.items()},
+            history_index=self.history_summary,
+            resumed=self.resuming,
+            tables=self.load_stats,
+        )
+        self.run_report = report
+        if not self.dest_file:
+            return
+        try:
+            self.report_file = write_report(report, self.dest_file)
+            self.report_status(f"Informe de ejecución: {self.report_file}")
+        except OSError as e:
+            # Un informe que no se pudo escribir no debe ocultar el resultado de la conversión
+            self.report_status(f"No se pudo escribir el informe de ejecución: {e}")
+
+    def convert(self):
+        if not self.dest_file:
+            raise ValueError("Por favor, especifique un archivo de destino.")
+
+        if self.source_batch:
+            if self.source_cuiles_file or self.source_periodos_file:
+                raise ValueError("Indique archivos de origen sueltos o un lote de archivos, pero no ambos.")
+            if self.resume:
+                raise ValueError("La carga por lote no usa puntos de control: vuelva a ejecutarla sin la opción de reanudar.")
+            self.batch_sources = find_source_files(self.source_batch)
+            if not self.duplicates:
+                # Los archivos de un lote pueden repetir claves entre sí (p. ej. dos cortes del mismo año):
+                # sin una política elegida se conserva la primera fila cargada, en lugar de cortar a mitad de la carga
+                self.duplicates = FIRST_WINS
+                self.report_status("Carga por lote: las filas de clave repetida entre archivos se anotan como "
+                                   "rechazadas y se conserva la primera (--duplicados elige otra política).")
+        elif not self.source_cuiles_file and not self.source_periodos_file:
+            raise ValueError("Por favor, seleccione al menos un archivo de origen (CUILES o PERIODOS).")
+
+        if self.update_mode and self.periodos_staging:
+            raise ValueError("El despliegue de PERIODOS con tabla intermedia no se puede combinar con el modo incremental.")
+
+        if self.update_mode and self.resume:
+            raise ValueError("El modo incremental no usa puntos de control: vuelva a ejecutarlo sin la opción de reanudar.")
+
+        if self.update_mode and self.deferred_keys:
+            raise ValueError("El modo incremental necesita las claves primarias durante la carga: no se pueden crear al final.")
+
+        if self.update_mode and self.duplicates in (LAST_WINS, SUM_AMOUNTS):
+            raise ValueError("En el modo incremental sólo se puede conservar la primera de las filas duplicadas.")
+
+        if self.update_mode and self.shard_by:
+            raise ValueError("El modo incremental actualiza un único archivo de destino: no se puede dividir.")
+
+        if self.update_mode and self.reconcile:
+            raise ValueError("La conciliación necesita todas las filas de la carga: no se puede combinar con el modo incremental.")
+
+        if self.read_partitions < 1:
+            raise ValueError("La cantidad de lecturas en paralelo debe ser al menos 1.")
+
+        if self.partition_by not in SOURCE_PARTITION_COLUMNS:
+            raise ValueError(f"Columna de partición desconocida: {self.partition_by}")
+
+        if self.shard_by and self.shard_by not in SHARD_MODES:
+            raise ValueError(f"Forma de dividir el destino desconocida: {self.shard_by}")
+
+        for export_format in self.export_formats:
+            if export_format not in EXPORT_FORMATS:
+                raise ValueError(f"Formato de exportación desconocido: {export_format}")
+
+        self.report_progress(0)
+        self.report_status("Iniciando conversión...")
+
+        if 'parquet' in self.export_formats and not parquet_available():
+            self.export_formats.remove('parquet')
+            self.report_status("pyarrow no está instalado: se omite la exportación a Parquet.")
+
+        if self.batch_sources:
+            # Los lectores arrancan ya, mientras se prepara el destino
+            self.reader = ParallelSourceReader(self.batch_sources, self.workers,
+                                               periodos_wide=self.periodos_staging or self.periodos_wide_checks,
+                                               strict=not self.validate, cache=self.source_cache)
+            self.reader.start()
+            files = sum(len(source_files) for source_files in self.batch_sources.values())
+            self.report_status(f"Leyendo {files} archivos de origen con {self.reader.workers} procesos...")
+            if self.read_partitions > 1:
+                self.report_status("En la carga por lote cada archivo se lee en su proceso: no se usan particiones.")
+
+        has_cuiles = bool(self.batch_sources['cuiles'] if self.batch_sources else self.source_cuiles_file)
+        has_periodos = bool(self.batch_sources['periodos'] if self.batch_sources else self.source_periodos_file)
+
+        destination = self.open_destination()
+        if not self.update_mode and not self.batch_sources:
+            self.checkpoint = LoadCheckpoint(
+                self.dest_file, {'cuiles': self.source_cuiles_file, 'periodos': self.source_periodos_file}
+            )
+            if self.resume:
+                self.resuming = self.checkpoint.load()
+                if not self.resuming:
+                    self.report_status("No hay una carga interrumpida para reanudar; se comienza desde cero.")
+                elif not destination.exists():
+                    raise ResumeError("No se encontró el archivo de destino de la carga interrumpida.")
+
+        if self.reconcile:
+            self.start_reconciliation(has_cuiles, has_periodos)
+
+        with self.stage('ddl'):
+            if self.update_mode:
+                destination.open_existing()
+                ensure_fingerprint_table(destination)
+                self.report_progress(20)
+            elif self.resuming:
+                self.report_status("Reanudando la carga interrumpida...")
+                destination.connect()
+                self.report_progress(20)
+            else:
+                # Un destino sin dividir reemplaza también los archivos de una división anterior, si la hubo
+                if not self.shard_by and remove_previous_shards(self.dest_file, self.dest_kind):
+                    self.report_status("Se borraron los archivos del destino dividido anterior.")
+                destination.create()
+                self.report_progress(10)
+                destination.connect()
+                self.report_progress(20)
+                if self.checkpoint is not None:
+                    self.checkpoint.save()
+
+        try:
+            # Cada tabla a cargar queda como un par (carga, lotes); los lotes se leen recién al recorrerlos
+            loads = []
+            if has_cuiles and self.is_loaded('cuiles'):
+                self.report_status("La tabla cuiles ya estaba cargada; se omite.")
+                self.finish_export(destination, 'cuiles')
+                if not self.update_mode and not self.is_loaded('modicuiles'):
+                    self.build_modicuiles(destination)
+                else:
+                    self.finish_export(destination, 'modicuiles')
+            elif has_cuiles:
+                self.report_status("Procesando CUILES...")
+                with self.stage('ddl', 'cuiles'):
+                    destination.create_cuiles_table(if_not_exists=self.update_mode or self.resuming,
+                                                    with_key=not self.deferred_keys)
+                    if self.update_mode:
+                        # En modo incremental modicuiles se actualiza fila a fila junto con cuiles
+                        destination.create_modicuiles_table(if_not_exists=True)
+                self.report_progress(30)
+                load = self.begin_cuiles_load(destination)
+                loads.append((load, self.table_batches('cuiles', self.source_cuiles_file, load.state)))
+
+            if has_periodos and self.is_loaded('periodos'):
+                self.report_status("La tabla periodos ya estaba cargada; se omite.")
+                self.finish_export(destination, 'periodos')
+            elif has_periodos:
+                with self.stage('ddl', 'periodos'):
+                    destination.create_periodos_table(with_key=not self.deferred_keys)
+                load = self.begin_periodos_load(destination)
+                if self.periodos_staging and self.is_loaded(PERIODOS_STAGING_TABLE):
+                    # La tabla intermedia ya estaba completa: sólo falta desplegarla
+                    load.finish()
+                else:
+                    loads.append((load, self.table_batches('periodos', self.source_periodos_file, load.state)))
+
+            if self.concurrent_reads and len(loads) > 1:
+                self.load_concurrently(loads)
+            else:
+                for load, batches in loads:
+                    if load.table != 'cuiles':
+                        self.report_status("Procesando PERIODOS...")
+                        self.report_progress(60)
+                    try:
+                        for rows, position, last_key in batches:
+                            load.write(rows, position, last_key)
+                    finally:
+                        # Si la carga se corta, el origen se cierra ya y en este hilo, no cuando lo recolecte otro
+                        batches.close()
+                    load.finish()
+
+            self.commit(destination)
+            if has_cuiles:
+                self.finish_history_index(destination)
+        finally:
+            destination.close()
+
+        self.finish_reconciliation()
+
+        # La carga terminó: el punto de control ya no hace falta
+        if self.checkpoint is not None:
+            self.checkpoint.remove()
+        if self.manifest_file:
+            self.report_status(f"Destino dividido en {len(destination.shards)} archivos; índice en {self.manifest_file}")
+        self.report_status("Conversión completada con éxito")
+        self.report_progress(100)
+        return self.load_stats
+
+    def start_reconciliation(self, has_cuiles, has_periodos):
+        """Prepara la conciliación, si se pueden sumar en esta carga todas las filas de cuiles y de periodos."""
+        if not reconciliation_available():
+            self.report_status("numpy no está instalado: se omite la conciliación.")
+        elif not (has_cuiles and has_periodos):
+            self.report_status("La conciliación necesita CUILES y PERIODOS: se omite.")
+        elif self.resuming:
+            self.report_status("Al reanudar una carga no se concilia: parte de las filas ya estaba en el destino.")
+        else:
+            self.reconciliation = Reconciliation()
+
+    def finish_reconciliation(self):
+        """Calcula las diferencias entre cuiles y periodos y las escribe junto al destino."""
+        if self.reconciliation is None:
+            return
+        with self.stage('reconcile'):
+            summary = self.reconciliation.write(reconciliation_path(self.dest_file))
+        self.reconciliation_summary = summary
+        self.report_status(
+            f"Conciliación: {summary['discrepancies']} de {summary['months']} meses de CUIT no coinciden "
+            f"entre cuiles y periodos; detalle en {summary['file']}"
+        )
+
+    def finish_history_index(self, destination):
+        """Vuelve a generar el índice del historial con la tabla cuiles ya cargada; sin la opción, borra el anterior."""
+        path = history_path(self.dest_file)
+        if not self.history_index:
+            if os.path.exists(path):
+                # Ya no corresponde a lo que hay en cuiles
+                os.remove(path)
+                self.report_status(f"Se borró el índice del historial anterior: {path}")
+            return
+        self.report_status("Generando el índice del historial por CUIL...")
+        with self.stage('history_index', 'cuiles'):
+            summary = write_history_index(destination, path)
+        self.history_summary = summary
+        self.report_status(f"Índice del historial: {summary['cuils']} CUIL, {summary['rows']} filas en {summary['file']}")
+
+    def open_destination(self):
+        """Destino de la conversión: un único archivo, o varios si se pidió dividirlo."""
+        if not self.shard_by:
+            return create_destination(self.dest_file, self.dest_kind)
+        destination = ShardedDestination(self.dest_file, self.dest_kind, self.shard_by, self.max_file_mb * 2**20,
+                                         on_status=self.report_status)
+        self.manifest_file = destination.manifest_file
+        return destination
+
+    def open_writer(self, destination, table, columns):
+        """Escritor de filas para una tabla: inserción masiva o carga incremental."""
+        if self.update_mode:
+            return IncrementalLoader(destination, table, self.batch_size, self.delete_missing)
+        return destination.bulk_inserter(table, columns, self.batch_size)
+
+    def is_loaded(self, table):
+        return self.resuming and self.checkpoint.is_done(table)
+
+    def loaded_state(self, destination, table):
+        """Avance confirmado de la tabla; al reanudar se contrasta con las filas del destino."""
+        if self.checkpoint is None:
+            return {'position': 0, 'rows': 0, 'last_key': None}
+        if self.resuming and table in self.checkpoint.tables:
+            state = self.checkpoint.reconcile(table, destination.count_rows(table))
+            if state['position']:
+                self.report_status(f"Reanudando {table} desde la fila {state['position'] + 1} del origen...")
+        else:
+            state = self.checkpoint.table(table)
+        # Copia: el punto de control sigue avanzando, pero la carga necesita el punto de partida
+        return dict(state)
+
+    def skip_loaded(self, batches, state, key_of):
+        """Saltea las filas del origen que ya están confirmadas en el destino."""
+        if not state['position']:
+            return batches
+
+        def check_last(row):
+            if state['last_key'] is not None and key_of(row) != state['last_key']:
+                raise ResumeError(
+                    "El origen no coincide con lo ya cargado: la última fila confirmada no está en la misma posición. "
+                    "Ejecute la conversión sin reanudar."
+                )
+
+        return skip_loaded_rows(batches, state['position'], check_last)
+
+    def commit_batch(self, destination, table, position, rows, last_key):
+        """Confirma un lote y deja anotado hasta qué fila del origen quedó cargada la tabla."""
+        self.checkpoint.begin(table, position, rows, last_key)
+        self.commit(destination, table)
+        self.checkpoint.confirm(table)
+
+    def finish_table(self, table):
+        if self.checkpoint is not None:
+            self.checkpoint.mark_done(table)
+
+    def record_writer(self, table, writer):
+        """Guarda las estadísticas del escritor al cerrarlo y suma su tiempo a la etapa de inserción."""
+        stats = writer.close()
+        self.load_stats[table] = stats
+        self.instrumentation.add('insert', table, stats['seconds'], stats['rows'])
+        self.report_status(writer.summary())
+
+    def build_keys(self, destination, table):
+        """Crea, en una sola pasada sobre la tabla ya cargada, la clave primaria y los índices que le falten."""
+        with self.stage('index', table):
+            created = destination.build_keys(table)
+        if created:
+            self.report_status(f"{table}: índices creados ({', '.join(created)})")
+
+    def row_checks(self, destination, table, state, source_table=None):
+        """Validación, control de duplicados, archivo de rechazos y conciliación de una tabla, según las opciones elegidas.
+
+        source_table es la tabla con la forma de las filas que llegan, si no son las de table (filas anchas de periodos).
+        """
+        source_table = source_table or table
+        checks = {'validator': None, 'dedup': None, 'rejects': None, 'reconciliation': self.reconciliation}
+        if self.validate:
+            checks['validator'] = RowValidator(source_table)
+        if self.duplicates:
+            dedup = DuplicateFilter(source_table, self.duplicates, self.dedup_memory_mb * 2**20,
+                                    expanded=source_table != table)
+            if state['rows']:
+                # Al reanudar, las claves ya cargadas también cuentan como vistas
+                with self.stage('dedup', table):
+                    dedup.seed_from(destination)
+            checks['dedup'] = dedup
+        if self.validate or self.duplicates:
+            checks['rejects'] = RejectWriter(self.dest_file, table, table_columns(source_table), append=self.resuming)
+            self.reject_writers.append(checks['rejects'])
+        return checks
+
+    def record_rejects(self, load):
+        """Cierra el archivo de rechazos de una carga y suma sus cantidades a las estadísticas."""
+        load.rejects.close()
+        stats = self.load_stats.setdefault(load.table, {})
+        if load.validator is not None:
+            stats['invalid'] = load.validator.rejected
+            if load.validator.rejected:
+                self.report_status(f"{load.table}: {load.validator.rejected} filas inválidas rechazadas")
+        if load.dedup is not None:
+            stats['duplicates'] = load.dedup.duplicates
+            if load.dedup.duplicates:
+                self.report_status(f"{load.table}: {load.dedup.duplicates} filas duplicadas")
+        if load.rejects.rows:
+            self.report_status(f"{load.table}: detalle de las filas rechazadas en {load.rejects.path}")
+
+    def stream_exports(self, table, state):
+        """Exportaciones que se escriben con los mismos lotes que se cargan en la tabla.
+
+        Sólo si lo cargado es exactamente lo que queda en la tabla: no al
+        reanudarla, ni en el modo incremental, ni si los duplicados reemplazan o
+        suman filas ya escritas. En esos casos la tabla se exporta leyéndola del
+        destino al terminar.
+        """
+        if not self.export_formats or table not in PARTITION_COLUMNS:
+            return []
+        if self.update_mode or self.duplicates in (LAST_WINS, SUM_AMOUNTS) or state['rows']:
+            return []
+        exports = [(table, None)]
+        if table == 'cuiles':
+            # modicuiles se arma en el destino a partir de cuiles, fila por fila igual que modicuiles_row
+            exports.append(('modicuiles', modicuiles_row))
+        for export_table, _ in exports:
+            self.exports[export_table] = TableExport(export_dir(self.dest_file), export_table, self.export_formats)
+        return [(self.exports[export_table], row_map) for export_table, row_map in exports]
+
+    def finish_export(self, destination, table):
+        """Cierra la exportación de una tabla ya cargada; si no se escribió junto con la carga, la lee del destino."""
+        if not self.export_formats or table not in PARTITION_COLUMNS:
+            return
+        with self.stage('export', table):
+            export = self.exports.pop(table, None)
+            if export is None:
+                export = TableExport(export_dir(self.dest_file), table, self.export_formats)
+                rows = destination.iter_column_values(table, table_columns(table))
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    export.write(batch)
+            stats = export.close()
+        self.load_stats.setdefault(table, {})['export'] = stats
+        self.report_status(f"{table}: {stats['rows']} filas exportadas en {stats['directory']}")
+
+    def begin_cuiles_load(self, destination):
+        writer = self.open_writer(destination, 'cuiles', CUILES_DEST_COLUMNS)
+        state = self.loaded_state(destination, 'cuiles')
+        checks = self.row_checks(destination, 'cuiles', state)
+        if self.update_mode:
+            companion = self.open_writer(destination, 'modicuiles', table_columns('modicuiles'))
+            return TableLoad(self, destination, 'cuiles', writer, state, companion, modicuiles_row,
+                             on_finish=lambda load: self.report_cuiles_loaded(), **checks)
+
+        def on_finish(load):
+            self.report_cuiles_loaded()
+            self.build_modicuiles(destination)
+
+        return TableLoad(self, destination, 'cuiles', writer, state, on_finish=on_finish,
+                         exports=self.stream_exports('cuiles', state), **checks)
+
+    def report_cuiles_loaded(self):
+        """Fin de la carga de cuiles: 95 si se carga sola; con lecturas simultáneas, su parte del avance combinado completa."""
+        if self.combined_progress is None:
+            self.report_progress(95)
+        else:
+            self.report_fraction(self.progress_label('cuiles'), 70, 20, 1.0, "CUILES cargado; sigue PERIODOS...")
+
+    def progress_label(self, kind):
+        return PROGRESS_LABELS[kind][self.reader is not None]
+
+    def build_modicuiles(self, destination):
+        """Crea y puebla la tabla modicuiles a partir de cuiles, con SQL."""
+        self.report_status("Creando tabla modicuiles...")
+        with self.stage('ddl', 'modicuiles'):
+            if self.resuming and destination.table_exists('modicuiles'):
+                destination.drop_table('modicuiles')
+            destination.create_modicuiles_table(with_key=not self.deferred_keys)
+        with self.stage('modicuiles', 'modicuiles', self.load_stats.get('cuiles', {}).get('rows', 0)):
+            destination.populate_modicuiles()
+        self.build_keys(destination, 'modicuiles')
+        self.commit(destination, 'modicuiles')
+        self.finish_table('modicuiles')
+        self.finish_export(destination, 'modicuiles')
+
+    def begin_periodos_load(self, destination):
+        if self.periodos_staging:
+            # PERIODOS por tabla intermedia: se cargan las filas anchas y se despliegan con SQL al final
+            state = self.loaded_state(destination, PERIODOS_STAGING_TABLE)
+            if not state['rows']:
+                with self.stage('ddl', PERIODOS_STAGING_TABLE):
+                    destination.create_periodos_staging_table()
+            writer = destination.bulk_inserter(PERIODOS_STAGING_TABLE, PERIODOS_WIDE_COLUMNS, self.batch_size)
+            return TableLoad(self, destination, PERIODOS_STAGING_TABLE, writer, state,
+                             on_finish=lambda load: self.unpivot_periodos_staging(destination, load.loaded_rows()),
+                             **self.row_checks(destination, PERIODOS_STAGING_TABLE, state))
+
+        state = self.loaded_state(destination, 'periodos')
+        if not self.update_mode and not state['rows']:
+            destination.clear_table('periodos')
+        writer = self.open_writer(destination, 'periodos', PERIODOS_COLUMNS)
+        if self.periodos_wide_checks:
+            return TableLoad(self, destination, 'periodos', writer, state, exports=self.stream_exports('periodos', state),
+                             expand=unpivot_periodos, source_table=PERIODOS_STAGING_TABLE,
+                             **self.row_checks(destination, 'periodos', state, PERIODOS_STAGING_TABLE))
+        return TableLoad(self, destination, 'periodos', writer, state, exports=self.stream_exports('periodos', state),
+                         **self.row_checks(destination, 'periodos', state))
+
+    def table_batches(self, kind, source_file, state):
+        """Lotes listos para insertar de un origen: de los procesos lectores o del archivo."""
+        if self.reader is not None:
+            if kind == 'cuiles':
+                return self.iter_parallel_batches('cuiles', 70, 20, self.progress_label('cuiles'))
+            return self.iter_parallel_batches('periodos', 60, 35, self.progress_label('periodos'))
+        if kind == 'cuiles':
+            return self.iter_cuiles_batches(source_file, state)
+        if self.periodos_staging or self.periodos_wide_checks:
+            return self.iter_periodos_wide_batches(source_file, state)
+        return self.iter_periodos_batches(source_file, state)
+
+    def load_concurrently(self, loads):
+        """Lee los orígenes a la vez, cada uno en su hilo, y escribe sus lotes intercalados desde este hilo."""
+        self.report_status("Procesando CUILES y PERIODOS en simultáneo...")
+        # Cada origen cuenta en el promedio desde el principio, aunque todavía no haya informado su avance
+        self.combined_progress = {
+            self.progress_label('cuiles' if load.table == 'cuiles' else 'periodos'): 0 for load, _ in loads
+        }
+        tables = {load.table: load for load, _ in loads}
+        try:
+            with ConcurrentBatchReader({load.table: batches for load, batches in loads}) as reader:
+                for table, batch in reader:
+                    if batch is None:
+                        tables[table].finish()
+                    else:
+                        tables[table].write(*batch)
+        finally:
+            self.combined_progress = None
+
+    def iter_cuiles_batches(self, source_file, state):
+        """Lotes de filas de cuiles, con la posición alcanzada en el origen y la clave de la última fila."""
+        with self.open_source(source_file, 'cuiles') as source:
+            self.report_status("Procesando datos...")
+
+            def key_of(row):
+                return [str(value) for value in row[:3]]
+
+            batches = self.skip_loaded(source.iter_batches(), state, key_of)
+            done = state['position']
+            next_report = 0
+            for rows in batches:
+                # El avance se informa a lo sumo una vez por lote y no antes de progress_every filas
+                if done >= next_report:
+                    self.report_row_progress(70, 20, done, source.total, self.progress_label('cuiles'), source.progress)
+                    next_report = done + self.progress_every
+                done += len(rows)
+                yield rows, done, key_of(rows[-1])
+
+    def iter_periodos_wide_batches(self, source_file, state):
+        """Lotes de filas anchas de PERIODOS con ANIO entero, descartando las que no traen CUIT o ANIO.
+
+        Cada lote se entrega junto con la posición alcanzada en el origen y la
+        clave de su última fila, para el punto de control.
+        """
+        with self.open_source(source_file, 'periodos') as source:
+
+            def key_of(row):
+                return [str(value) for value in row[:2]]
+
+            batches = self.skip_loaded(source.iter_batches(), state, key_of)
+            done = state['position']
+            next_report = 0
+            for batch in batches:
+                if done >= next_report:
+                    self.report_row_progress(60, 35, done, source.total, self.progress_label('periodos'), source.progress)
+                    next_report = done + self.progress_every
+                done += len(batch)
+
+                start = time.perf_counter()
+                wide_rows = periodos_wide_rows(batch, strict=not self.validate)
+                self.instrumentation.add('transform', 'periodos', time.perf_counter() - start, len(wide_rows))
+                yield wide_rows, done, key_of(batch[-1])
+
+    def iter_periodos_batches(self, source_file, state):
+        """Lotes de filas mensuales de periodos, ya desplegadas."""
+        for wide_rows, position, last_key in self.iter_periodos_wide_batches(source_file, state):
+            start = time.perf_counter()
+            rows = [row for wide in wide_rows for row in unpivot_periodos(wide)]
+            self.instrumentation.add('transform', 'periodos', time.perf_counter() - start, 0)
+            yield rows, position, last_key
+
+    def iter_parallel_batches(self, kind, start, span, label):
+        """Lotes ya transformados por los procesos lectores, a medida que llegan de cualquier archivo."""
+        files = self.batch_sources[kind]
+        finished = []
+
+        def file_done(stats):
+            finished.append(stats)
+            name = os.path.basename(stats['file'])
+            # Tiempos medidos dentro de cada proceso lector, en paralelo con el escritor
+            self.instrumentation.add('read', f"{kind}:{name}", stats['read_seconds'], stats['source_rows'])
+            self.instrumentation.add('transform', f"{kind}:{name}", stats['transform_seconds'], stats['rows'])
+            origin = " (desde la caché)" if stats['cached'] else ""
+            self.report_status(f"{name}: {stats['source_rows']} filas leídas{origin}")
+
+        received = 0
+        # 'wait' es el tiempo que el escritor pasa esperando a los lectores
+        for rows in self.instrumentation.timed('wait', kind, self.reader.batches(kind, file_done)):
+            self.report_fraction(
+                label, start, span, len(finished) / len(files),
+                f"Procesando {label}: {received} filas, {len(finished)} de {len(files)} archivos terminados..."
+            )
+            received += len(rows)
+            yield rows, None, None
+
+    def unpivot_periodos_staging(self, destination, staged_rows):
+        """Despliega la tabla intermedia en periodos y la descarta."""
+        # El despliegue parte siempre de periodos vacía, también si una ejecución anterior lo dejó a medias
+        self.report_status("Desplegando meses en la tabla periodos...")
+        rows = staged_rows * len(MONTHS)
+        start = time.perf_counter()
+        with self.stage('unpivot', 'periodos', rows):
+            destination.clear_table('periodos')
+            destination.unpivot_periodos_from_staging()
+        self.build_keys(destination, 'periodos')
+        self.commit(destination, 'periodos')
+        elapsed = time.perf_counter() - start
+        with self.stage('ddl', PERIODOS_STAGING_TABLE):
+            destination.drop_table(PERIODOS_STAGING_TABLE)
+        self.finish_table('periodos')
+        self.finish_export(destination, 'periodos')
+
+        self.load_stats['periodos'] = {
+            'table': 'periodos',
+            'rows': rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        self.report_status(f"periodos: {rows} filas insertadas con SQL ({self.load_stats['periodos']['rows_per_second']:,.0f} filas/s)")
+
+
+class TableLoad:
+    """Carga de una tabla del destino a partir de lotes ya transformados.
+
+    Reúne el escritor, el punto de partida según el punto de control y lo que
+    hay que hacer al terminar, para que un mismo escritor pueda alternar lotes
+    de varias tablas. Cada lote pasa por la validación, si la hay, y por el
+    control de duplicados, que resuelve las claves repetidas según su política;
+    lo descartado se anota en el archivo de rechazos. Las filas confirmadas se
+    escriben también en las exportaciones y se suman a la conciliación, si las hay.
+
+    Con expand, los lotes llegan con la forma de source_table (las filas anchas
+    de PERIODOS) y se controlan así; al escritor van ya desplegadas.
+    """
+
+    def __init__(self, engine, destination, table, writer, state, companion=None, companion_row=None, on_finish=None,
+                 validator=None, dedup=None, rejects=None, exports=(), reconciliation=None, expand=None,
+                 source_table=None):
+        self.engine = engine
+        self.destination = destination
+        self.table = table
+        self.writer = writer
+        self.state = state
+        # Tabla que se escribe fila a fila junto con ésta (modicuiles en el modo incremental)
+        self.companion = companion
+        self.companion_row = companion_row
+        self.on_finish = on_finish
+        self.validator = validator
+        self.dedup = dedup
+        self.rejects = rejects
+        # Pares (exportación, conversión de la fila) que reciben los lotes ya confirmados
+        self.exports = exports
+        self.reconciliation = reconciliation
+        self.expand = expand
+        self.source_table = source_table or table
+
+    def loaded_rows(self):
+        return self.state['rows'] + self.writer.rows
+
+    def write(self, rows, position, last_key):
+        # Un pedido de cancelación se atiende entre lotes: el anterior ya está confirmado y éste no se empieza
+        self.engine.check_cancelled()
+        rejected = []
+        if self.validator is not None:
+            with self.engine.stage('validate', self.table):
+                rows, rejected = self.validator.validate(rows)
+
+        duplicates = None
+        if self.dedup is not None:
+            with self.engine.stage('dedup', self.table):
+                rows, duplicates = self.dedup.split(rows)
+
+        if self.expand is not None:
+            with self.engine.stage('transform', self.table):
+                rows = [expanded for row in rows for expanded in self.expand(row)]
+
+        self.writer.add_many(rows)
+        if self.companion is not None:
+            self.companion.add_many([self.companion_row(row) for row in rows])
+
+        # Cada lote queda confirmado, para poder reanudar desde aquí
+        self.writer.flush()
+        if self.companion is not None:
+            self.companion.flush()
+
+        # Las filas repetidas se resuelven cuando ya están escritas las nuevas, incluidas las de este lote
+        replaced = []
+        if duplicates:
+            with self.engine.stage('dedup', self.table):
+                resolved = self.dedup.resolve(self.destination, duplicates)
+            rejected += resolved
+            if self.dedup.policy == LAST_WINS:
+                replaced = [row for _, row in resolved]
+            elif self.dedup.policy == SUM_AMOUNTS:
+                # Las que no se pudieron sumar no cambiaron la tabla
+                duplicates = [row for reason, row in resolved if reason != NOT_SUMMED_REASON]
+
+        if self.engine.checkpoint is not None:
+            self.engine.commit_batch(self.destination, self.table, position, self.loaded_rows(), last_key)
+        else:
+            self.engine.commit(self.destination, self.table)
+        if rejected:
+            self.rejects.write(rejected)
+        for export, row_map in self.exports:
+            with self.engine.stage('export', export.table):
+                export.write(rows if row_map is None else [row_map(row) for row in rows])
+        if self.reconciliation is not None:
+            with self.engine.stage('reconcile', self.table):
+                self.reconciliation.add(self.table, rows)
+                # Lo que quedó en la tabla: la última repetida en lugar de la anterior, o sus importes sumados
+                if duplicates and self.dedup.policy != FIRST_WINS:
+                    self.reconciliation.add(self.source_table, duplicates)
+                self.reconciliation.add(self.source_table, replaced, sign=-1)
+
+    def finish(self):
+        self.engine.check_cancelled()
+        self.engine.record_writer(self.table, self.writer)
+        if self.companion is not None:
+            self.engine.record_writer(self.companion.table, self.companion)
+        if self.rejects is not None:
+            self.engine.record_rejects(self)
+        self.engine.build_keys(self.destination, self.table)
+        if self.companion is not None:
+            self.engine.build_keys(self.destination, self.companion.table)
+        self.engine.commit(self.destination, self.table)
+        self.engine.finish_table(self.table)
+        self.engine.finish_export(self.destination, self.table)
+        if self.companion is not None:
+            self.engine.finish_export(self.destination, self.companion.table)
+        if self.on_finish is not None:
+            self.on_finish(self)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="conversor_cuiles",
+        description="Convierte archivos de CUILES y PERIODOS (.odb, .accdb) a una base Access (.mdb) sin interfaz gráfica.",
+        epilog=f"Para ver el historial de un CUIL en un destino ya convertido: {CONSULTA_COMMAND} CUIL --out DESTINO "
+               f"(ayuda con {CONSULTA_COMMAND} -h)."
+    )
+    parser.add_argument("--cuiles", help="Archivo CUILES (.odb, .accdb)")
+    parser.add_argument("--periodos", help="Archivo PERIODOS (.odb, .accdb)")
+    parser.add_argument("--lote", nargs='+', metavar="CARPETA_O_PATRON",
+                        help="Carpetas o patrones glob con varios archivos CUILES y PERIODOS (p. ej. uno por año), "
+                             "leídos en paralelo; el tipo se deduce de si el nombre contiene 'cuil' o 'periodo'. "
+                             "Las claves repetidas entre archivos se resuelven como indique --duplicados "
+                             "(por defecto, se conserva la primera fila cargada)")
+    parser.add_argument("--concurrente", action="store_true",
+                        help="Lee CUILES y PERIODOS a la vez, en hilos separados, mientras un único escritor carga el destino")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos lectores de la carga por lote (por defecto, uno por núcleo)")
+    parser.add_argument("--out", required=True, help="Archivo destino (.mdb, o .sqlite/.db para SQLite)")
+    parser.add_argument("--destino", choices=sorted(DESTINATION_TYPES),
+                        help="Tipo de destino; por defecto se deduce de la extensión de --out")
+    parser.add_argument("--actualizar", action="store_true",
+                        help="Modo incremental: conserva el destino e inserta o actualiza sólo las filas que cambiaron")
+    parser.add_argument("--borrar-faltantes", action="store_true",
+                        help="Con --actualizar, borra del destino las filas que ya no están en el origen")
+    parser.add_argument("--periodos-sql", action="store_true",
+                        help="Carga PERIODOS en una tabla intermedia y despliega los doce meses con INSERT ... SELECT")
+    parser.add_argument("--reanudar", "--resume", action="store_true",
+                        help="Retoma una carga interrumpida desde el último lote confirmado en lugar de empezar de nuevo")
+    parser.add_argument("--claves-al-final", action="store_true",
+                        help="Crea las tablas sin clave primaria y agrega claves e índices una vez cargados los datos")
+    parser.add_argument("--duplicados", choices=sorted(DUPLICATE_OPTIONS),
+                        help="Qué hacer con las filas de clave repetida: conservar la primera, la última o sumar sus "
+                             "importes; las descartadas se anotan en un CSV junto al destino. Sin esta opción, "
+                             "una fila repetida detiene la conversión, salvo en la carga por lote (--lote), donde se "
+                             "conserva la primera cargada")
+    parser.add_argument("--validar", action="store_true",
+                        help="Verifica el dígito de CUIT/CUIL y convierte importes, cantidades y fechas; las filas "
+                             "inválidas se anotan en un CSV junto al destino en lugar de detener la conversión")
+    parser.add_argument("--exportar", nargs='+', choices=EXPORT_FORMATS, default=[], metavar="FORMATO",
+                        help="Exporta también cuiles, modicuiles y periodos a CSV y/o Parquet (si está pyarrow), "
+                             "particionados por ANIO o Mes, en una carpeta junto al destino")
+    parser.add_argument("--dividir", choices=SHARD_MODES,
+                        help="Reparte el destino en varios archivos para no superar los 2 GB de Access: uno por ANIO, "
+                             "o uno tras otro a medida que se llenan; un manifiesto junto al destino indica qué "
+                             "archivo tiene cada año")
+    parser.add_argument("--tamano-maximo", type=int, default=DEFAULT_MAX_FILE_MB, metavar="MB",
+                        help=f"Con --dividir, tamaño estimado a partir del cual se abre otro archivo "
+                             f"(por defecto {DEFAULT_MAX_FILE_MB} MB)")
+    parser.add_argument("--conciliar", action="store_true",
+                        help="Compara, por CUIT y mes, las sumas de REMUNERACION y APORTE de cuiles con Remuneracion "
+                             "y Aporte de periodos (requiere numpy) y escribe las diferencias en un CSV junto al destino")
+    parser.add_argument("--cache-origenes", action="store_true",
+                        help="Guarda los orígenes ya leídos y mapeados en una caché en disco; en las próximas "
+                             "conversiones, un archivo que no cambió se toma de ahí sin extraerlo ni leerlo")
+    parser.add_argument("--cache-tamano", type=int, default=DEFAULT_CACHE_MB, metavar="MB",
+                        help=f"Con --cache-origenes, tamaño máximo de la caché; al superarlo se borran los orígenes "
+                             f"usados hace más tiempo (por defecto {DEFAULT_CACHE_MB} MB)")
+    parser.add_argument("--lecturas-paralelas", type=int, default=1, metavar="N",
+                        help="Lee cada tabla de origen (.accdb o .odb con base SQLite) en N rangos a la vez, cada uno "
+                             "con su propia conexión (por defecto 1: de corrido)")
+    parser.add_argument("--particionar-por", choices=sorted(SOURCE_PARTITION_COLUMNS), default=DEFAULT_PARTITION_BY,
+                        help=f"Con --lecturas-paralelas, columna del origen por la que se arman los rangos "
+                             f"(por defecto {DEFAULT_PARTITION_BY})")
+    parser.add_argument("--indice-historial", action="store_true",
+                        help="Al terminar, genera junto al destino un índice de las filas de cuiles por CUIL para "
+                             "consultar su historial con 'consulta' sin abrir la base")
+    parser.add_argument("--memoria-duplicados", type=int, default=DEFAULT_MEMORY_MB, metavar="MB",
+                        help=f"Memoria máxima del control de duplicados por tabla (por defecto {DEFAULT_MEMORY_MB} MB)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Filas por lote en las inserciones masivas (por defecto {DEFAULT_BATCH_SIZE})")
+    return parser
+
+
+def cli_main(argv=None):
+    """Punto de entrada de línea de comandos: ejecuta la conversión sin Tkinter, o la consulta de un CUIL."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == CONSULTA_COMMAND:
+        return consulta_main(argv[1:])
+
+    args = build_arg_parser().parse_args(argv)
+
+    engine = ConversionEngine(
+        os.path.abspath(args.out),
+        source_cuiles_file=args.cuiles and os.path.abspath(args.cuiles),
+        source_periodos_file=args.periodos and os.path.abspath(args.periodos),
+        batch_size=args.batch_size,
+        dest_kind=args.destino,
+        update_mode=args.actualizar,
+        delete_missing=args.borrar_faltantes,
+        periodos_staging=args.periodos_sql,
+        resume=args.reanudar,
+        source_batch=args.lote,
+        workers=args.procesos,
+        concurrent_reads=args.concurrente,
+        deferred_keys=args.claves_al_final,
+        duplicates=DUPLICATE_OPTIONS.get(args.duplicados),
+        dedup_memory_mb=args.memoria_duplicados,
+        validate=args.validar,
+        export_formats=args.exportar,
+        shard_by=args.dividir,
+        max_file_mb=args.tamano_maximo,
+        reconcile=args.conciliar,
+        source_cache=args.cache_origenes,
+        source_cache_mb=args.cache_tamano,
+        read_partitions=args.lecturas_paralelas,
+        partition_by=args.particionar_por,
+        history_index=args.indice_historial,
+        on_status=lambda message: print(message, flush=True),
+    )
+
+    try:
+        engine.run()
+    except DatabaseEngineError:
+        print("Error: falta el 'Microsoft Access Database Engine'. Instale la versión de 64 bits e intente de nuevo.", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(f"Error: se produjo un error durante la conversión: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli_main())
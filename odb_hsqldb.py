@@ -0,0 +1,316 @@
+import datetime
+import io
+import re
+import zlib
+
+# Miembros del archivo .odb que contienen la base HSQLDB embebida
+SCRIPT_MEMBER = "database/script"
+PROPERTIES_MEMBER = "database/properties"
+
+# hsqldb.script_format=3 indica un script comprimido con zlib
+COMPRESSED_SCRIPT_FORMAT = "3"
+
+_CREATE_TABLE_RE = re.compile(r'^CREATE\s+(?:(MEMORY|CACHED|TEXT|TEMP)\s+)?TABLE\s+(.+?)\s*\(', re.IGNORECASE)
+_INSERT_RE = re.compile(r'^INSERT INTO (.+?) VALUES\(')
+_VALUE_RE = re.compile(r"'((?:[^']|'')*)'|([^,]+)")
+_IDENTIFIER_RE = re.compile(r'"((?:[^"]|"")*)"|([^."]+)')
+_UNICODE_ESCAPE_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+
+class HsqldbScriptError(Exception):
+    """El script HSQLDB del archivo .odb no contiene los datos pedidos."""
+    pass
+
+
+class HsqldbTable:
+    """Tabla declarada en el script: nombre, tipo de almacenamiento y columnas."""
+
+    def __init__(self, name, storage, columns, types):
+        self.name = name
+        self.storage = storage
+        self.columns = columns
+        self.types = types
+        self.converters = [_converter_for(column_type) for column_type in types]
+
+
+def _unquote_identifier(identifier):
+    """Devuelve el nombre sin comillas ni esquema (PUBLIC."TABLA" -> TABLA)."""
+    parts = _IDENTIFIER_RE.findall(identifier.strip())
+    quoted, bare = parts[-1]
+    return quoted.replace('""', '"') if quoted else bare.strip().upper()
+
+
+def _split_top_level(text):
+    """Separa por comas que no estén dentro de paréntesis ni comillas."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_create_table(line):
+    match = _CREATE_TABLE_RE.match(line)
+    if not match:
+        return None
+
+    storage = (match.group(1) or 'MEMORY').upper()
+    name = _unquote_identifier(match.group(2))
+    body = line[match.end():line.rindex(')')]
+
+    columns = []
+    types = []
+    for definition in _split_top_level(body):
+        definition = definition.strip()
+        if not definition or definition.split(None, 1)[0].upper() in ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK'):
+            continue
+        if definition.startswith('"'):
+            end = definition.index('"', 1)
+            while definition[end + 1:end + 2] == '"':
+                end = definition.index('"', end + 2)
+            column = definition[1:end].replace('""', '"')
+            rest = definition[end + 1:].strip()
+        else:
+            column, _, rest = definition.partition(' ')
+            column = column.upper()
+        columns.append(column)
+        types.append(rest.split('(', 1)[0].split(None, 1)[0].upper() if rest else 'VARCHAR')
+
+    return HsqldbTable(name, storage, columns, types)
+
+
+def _unescape(text):
+    text = text.replace("''", "'")
+    if '\\u' in text:
+        text = _UNICODE_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), text)
+    return text
+
+
+def _to_int(text):
+    return int(text)
+
+
+def _to_float(text):
+    return float(text)
+
+
+def _to_bool(text):
+    return text.upper() == 'TRUE'
+
+
+def _to_date(text):
+    return datetime.date.fromisoformat(text[:10])
+
+
+def _to_timestamp(text):
+    return datetime.datetime.fromisoformat(text)
+
+
+def _to_time(text):
+    return datetime.time.fromisoformat(text)
+
+
+def _to_str(text):
+    return text
+
+
+_TYPE_CONVERTERS = {
+    'INTEGER': _to_int, 'INT': _to_int, 'BIGINT': _to_int, 'SMALLINT': _to_int, 'TINYINT': _to_int,
+    # Los importes terminan en columnas DOUBLE del destino, por eso DECIMAL/NUMERIC se leen como float
+    'DOUBLE': _to_float, 'FLOAT': _to_float, 'REAL': _to_float, 'DECIMAL': _to_float, 'NUMERIC': _to_float,
+    'BOOLEAN': _to_bool, 'BIT': _to_bool,
+    'DATE': _to_date, 'TIMESTAMP': _to_timestamp, 'TIME': _to_time,
+}
+
+
+def _converter_for(column_type):
+    return _TYPE_CONVERTERS.get(column_type, _to_str)
+
+
+def _parse_values(text, converters):
+    """Convierte el contenido de VALUES(...) en una tupla tipada."""
+    values = []
+    append = values.append
+    for i, match in enumerate(_VALUE_RE.finditer(text)):
+        quoted, literal = match.groups()
+        if quoted is not None:
+            quoted = _unescape(quoted)
+            converter = converters[i]
+            append(quoted if converter is _to_str else converter(quoted))
+        elif literal == 'NULL':
+            append(None)
+        else:
+            append(converters[i](literal))
+    return tuple(values)
+
+
+class _ZlibReader(io.RawIOBase):
+    """Descomprime sobre la marcha un miembro zlib sin cargarlo entero en memoria."""
+
+    def __init__(self, raw, chunk_size=1 << 16):
+        self.raw = raw
+        self.chunk_size = chunk_size
+        self.decompressor = zlib.decompressobj()
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            chunk = self.raw.read(self.chunk_size)
+            if not chunk:
+                self.pending = self.decompressor.flush()
+                break
+            self.pending = self.decompressor.decompress(chunk)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+class _CountingReader(io.RawIOBase):
+    """Lee un miembro del zip llevando la cuenta de los bytes consumidos, para informar el avance."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.raw.readinto(buffer)
+        self.bytes_read += size
+        return size
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def has_hsqldb_script(zip_ref):
+    return SCRIPT_MEMBER in zip_ref.namelist()
+
+
+def _script_is_compressed(zip_ref):
+    if PROPERTIES_MEMBER not in zip_ref.namelist():
+        return False
+    with zip_ref.open(PROPERTIES_MEMBER) as properties:
+        for raw_line in properties:
+            key, _, value = raw_line.decode('latin-1').strip().partition('=')
+            if key.strip() == 'hsqldb.script_format':
+                return value.strip() == COMPRESSED_SCRIPT_FORMAT
+    return False
+
+
+def _open_script_lines(zip_ref):
+    """Líneas del script y el lector que cuenta los bytes leídos del miembro del zip."""
+    member = _CountingReader(zip_ref.open(SCRIPT_MEMBER))
+    raw = io.BufferedReader(member)
+    if _script_is_compressed(zip_ref):
+        raw = io.BufferedReader(_ZlibReader(raw))
+    # HSQLDB escribe el script en ASCII con escapes \uXXXX
+    return io.TextIOWrapper(raw, encoding='latin-1', newline=None), member
+
+
+class HsqldbScriptReader:
+    """Lee en streaming el script HSQLDB de un .odb abierto, sin extraerlo a disco.
+
+    Recorre las sentencias CREATE TABLE hasta encontrar los datos y luego
+    genera tuplas tipadas de las sentencias INSERT INTO de la tabla pedida.
+    """
+
+    def __init__(self, zip_ref, preferred_table=None):
+        self.zip_ref = zip_ref
+        self.lines, self.member = _open_script_lines(zip_ref)
+        # Tamaño del miembro tal como está en el zip descomprimido (el flujo zlib, si el script va comprimido)
+        self.script_size = zip_ref.getinfo(SCRIPT_MEMBER).file_size
+        self.tables = {}
+        self.table = None
+        self._first_data_line = None
+
+        for line in self.lines:
+            line = line.rstrip('\n')
+            if line.startswith('CREATE') and ' TABLE ' in line:
+                table = _parse_create_table(line)
+                if table is not None:
+                    self.tables[table.name] = table
+            elif line.startswith('INSERT INTO '):
+                self._first_data_line = line
+                break
+
+        if not self.tables:
+            raise HsqldbScriptError("No se encontraron tablas en la base de datos ODB")
+
+        self.table = self._choose_table(preferred_table)
+        self.columns = self.table.columns
+
+    def _choose_table(self, preferred_table):
+        if preferred_table in self.tables:
+            table = self.tables[preferred_table]
+        else:
+            # Se prefiere la primera tabla cuyos datos estén en el script
+            in_script = [t for t in self.tables.values() if t.storage != 'CACHED']
+            table = in_script[0] if in_script else next(iter(self.tables.values()))
+
+        if table.storage == 'CACHED':
+            raise HsqldbScriptError(
+                f"La tabla '{table.name}' es de tipo CACHED: sus datos están en el archivo binario "
+                "database/data y no en el script. Conviértala a tabla MEMORY desde LibreOffice Base "
+                "o exporte el origen a .accdb."
+            )
+        return table
+
+    def fraction_read(self):
+        """Parte del script ya leída, de 0 a 1; la cantidad de filas no se conoce hasta terminar."""
+        if not self.script_size:
+            return None
+        return min(self.member.bytes_read / self.script_size, 1.0)
+
+    def iter_batches(self, batch_size):
+        prefix = None
+        converters = self.table.converters
+        batch = []
+
+        lines = self.lines
+        if self._first_data_line is not None:
+            lines = _prepend(self._first_data_line, lines)
+
+        for line in lines:
+            if not line.startswith('INSERT INTO '):
+                continue
+            if prefix is None or not line.startswith(prefix):
+                match = _INSERT_RE.match(line)
+                if not match or _unquote_identifier(match.group(1)) != self.table.name:
+                    continue
+                prefix = match.group(0)
+            batch.append(_parse_values(line[len(prefix):line.rindex(')')], converters))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def close(self):
+        self.lines.close()
+
+
+def _prepend(first, lines):
+    yield first
+    yield from lines
@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+
+# Intervalo mínimo entre dos actualizaciones de progreso publicadas (segundos)
+PROGRESS_INTERVAL = 0.1
+
+# Cada cuántas filas el motor informa su avance
+PROGRESS_EVERY_ROWS = 500
+
+
+class ProgressChannel:
+    """Canal de progreso entre el hilo de conversión y el hilo de Tk.
+
+    El hilo de trabajo publica eventos en una cola y nunca toca los widgets; las
+    actualizaciones de la barra se agrupan para publicar como máximo una cada
+    PROGRESS_INTERVAL segundos. El hilo de Tk vacía la cola con after().
+
+    Una actualización retenida no queda vieja: se publica antes de cada cambio
+    de estado (etapa, cancelación, final) y, si no llega otra, al vaciar la
+    cola una vez pasado el intervalo.
+    """
+
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.queue = queue.Queue()
+        self.interval = interval
+        self._last_publish = 0.0
+        self._pending = None
+        # Publica el hilo de trabajo, pero cancelar y vaciar la cola ocurren en el de Tk
+        self._lock = threading.Lock()
+
+    def status(self, message):
+        # Los cambios de etapa son pocos y se publican siempre, después del último avance de la etapa anterior
+        with self._lock:
+            self._flush()
+            self.queue.put(('status', message))
+
+    def progress(self, percent, message=None):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_publish >= self.interval:
+                self._last_publish = now
+                self._pending = None
+                self.queue.put(('progress', percent, message))
+            else:
+                self._pending = (percent, message)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending is not None:
+            percent, message = self._pending
+            self._pending = None
+            self._last_publish = time.monotonic()
+            self.queue.put(('progress', percent, message))
+
+    def done(self, result=None):
+        with self._lock:
+            self._flush()
+            self.queue.put(('done', result))
+
+    def error(self, exc):
+        with self._lock:
+            self._flush()
+            self.queue.put(('error', exc))
+
+    def drain(self):
+        """Devuelve los eventos pendientes, conservando sólo el último de progreso seguido."""
+        with self._lock:
+            # Una actualización retenida sin otra detrás se publica cuando pasó su intervalo
+            if self._pending is not None and time.monotonic() - self._last_publish >= self.interval:
+                self._flush()
+        events = []
+        while True:
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'progress' and events and events[-1][0] == 'progress':
+                events[-1] = event
+            else:
+                events.append(event)
+        return events
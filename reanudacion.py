@@ -0,0 +1,139 @@
+import json
+import os
+
+# Archivo auxiliar, junto al destino, con el avance confirmado de cada tabla
+CHECKPOINT_SUFFIX = ".reanudacion.json"
+CHECKPOINT_VERSION = 1
+
+
+class ResumeError(Exception):
+    """La carga interrumpida no se puede reanudar sobre este destino u origen."""
+    pass
+
+
+def checkpoint_path(dest_file):
+    return os.path.splitext(dest_file)[0] + CHECKPOINT_SUFFIX
+
+
+def source_signature(source_file):
+    """Identifica un archivo de origen por ruta, tamaño y fecha de modificación."""
+    if not source_file:
+        return None
+    stat = os.stat(source_file)
+    return {'path': os.path.abspath(source_file), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class LoadCheckpoint:
+    """Punto de control de una carga: cuántas filas del origen ya están confirmadas en cada tabla.
+
+    Antes de cada commit se anota el avance como pendiente y después se confirma.
+    Al reanudar, la cantidad de filas de la tabla de destino indica cuál de los
+    dos quedó realmente escrito.
+    """
+
+    def __init__(self, dest_file, sources):
+        self.path = checkpoint_path(dest_file)
+        self.sources = {name: source_signature(path) for name, path in sources.items()}
+        self.tables = {}
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Carga el punto de control guardado; devuelve False si no hay ninguno."""
+        if not self.exists():
+            return False
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            state = json.load(checkpoint_file)
+
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ResumeError("El punto de control fue escrito por otra versión del programa y no se puede usar.")
+        if state['sources'] != self.sources:
+            raise ResumeError(
+                "Los archivos de origen no son los mismos de la carga interrumpida "
+                "(cambiaron de ruta, tamaño o fecha). Ejecute la conversión sin reanudar."
+            )
+        self.tables = state['tables']
+        return True
+
+    def save(self):
+        # Se escribe en un temporal y se reemplaza, para no dejar nunca un archivo a medias
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'version': CHECKPOINT_VERSION, 'sources': self.sources, 'tables': self.tables},
+                      checkpoint_file, ensure_ascii=False, indent=2)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+
+    def table(self, table):
+        return self.tables.setdefault(table, {'position': 0, 'rows': 0, 'last_key': None, 'done': False})
+
+    def is_done(self, table):
+        return table in self.tables and self.tables[table]['done']
+
+    def begin(self, table, position, rows, last_key):
+        """Anota el avance de un lote que está por confirmarse."""
+        self.table(table)['pending'] = {'position': position, 'rows': rows, 'last_key': last_key}
+        self.save()
+
+    def confirm(self, table):
+        state = self.table(table)
+        state.update(state.pop('pending'))
+        self.save()
+
+    def mark_done(self, table):
+        state = self.table(table)
+        state.pop('pending', None)
+        state['done'] = True
+        self.save()
+
+    def reset(self, table):
+        self.tables.pop(table, None)
+        self.save()
+
+    def reconcile(self, table, loaded_rows):
+        """Ajusta el avance de la tabla a las filas que realmente tiene el destino."""
+        state = self.table(table)
+        pending = state.pop('pending', None)
+        if pending is not None and loaded_rows == pending['rows']:
+            # El commit llegó a escribirse pero no su confirmación
+            state.update(pending)
+        elif loaded_rows != state['rows']:
+            raise ResumeError(
+                f"La tabla '{table}' tiene {loaded_rows} filas y el punto de control indica {state['rows']}: "
+                "el destino fue modificado después de la interrupción. Ejecute la conversión sin reanudar."
+            )
+        self.save()
+        return state
+
+
+def skip_loaded_rows(batches, count, check_last=None):
+    """Descarta las primeras count filas de una secuencia de lotes y entrega el resto.
+
+    check_last recibe la última fila descartada, para verificar que el origen
+    coincide con lo que ya se había cargado.
+    """
+    batches = iter(batches)
+    last = None
+    remaining = None
+    while count:
+        batch = next(batches, None)
+        if batch is None:
+            raise ResumeError("El origen tiene menos filas que las que ya se habían cargado.")
+        if len(batch) > count:
+            last, remaining = batch[count - 1], batch[count:]
+            count = 0
+        else:
+            last = batch[-1]
+            count -= len(batch)
+
+    if last is not None and check_last is not None:
+        check_last(last)
+    if remaining:
+        yield remaining
+    yield from batches
@@ -0,0 +1,50 @@
+import csv
+import os
+
+REJECTS_SUFFIX = ".rechazados_{table}.csv"
+
+
+def rejects_path(dest_file, table):
+    return os.path.splitext(dest_file)[0] + REJECTS_SUFFIX.format(table=table)
+
+
+class RejectWriter:
+    """Escribe en un CSV, a medida que aparecen, las filas de una tabla que no se cargaron tal cual.
+
+    Cada fila lleva primero el motivo y después las columnas de la tabla. El
+    archivo se crea recién con el primer rechazo; al reanudar una carga se
+    agrega al final del que ya existía.
+    """
+
+    def __init__(self, dest_file, table, columns, append=False):
+        self.path = rejects_path(dest_file, table)
+        self.columns = list(columns)
+        self.append = append
+        self.file = None
+        self.writer = None
+        self.rows = 0
+        if not append and os.path.exists(self.path):
+            # Los rechazos de una ejecución anterior no corresponden a esta carga
+            os.remove(self.path)
+
+    def _open(self):
+        new_file = not (self.append and os.path.exists(self.path))
+        self.file = open(self.path, 'w' if new_file else 'a', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(['motivo'] + self.columns)
+
+    def write(self, rejected):
+        """Agrega pares (motivo, fila) y los deja escritos en disco."""
+        if not rejected:
+            return
+        if self.file is None:
+            self._open()
+        self.writer.writerows([reason] + list(row) for reason, row in rejected)
+        self.file.flush()
+        self.rows += len(rejected)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,185 @@
+import csv
+import os
+from operator import itemgetter
+
+from destinos import MONTHS, PERIODOS_STAGING_TABLE, table_columns
+
+# Tabla de diferencias, junto al destino
+RECONCILIATION_SUFFIX = ".conciliacion.csv"
+
+# Diferencia a partir de la cual un mes no concilia (los importes se comparan al centavo)
+TOLERANCE = 0.01
+
+INITIAL_GROUPS = 1 << 12
+
+# Planos de los arreglos de sumas: remuneración y aporte de cuiles, y los mismos de periodos
+CUILES_REMUNERACION, CUILES_APORTE, PERIODOS_REMUNERACION, PERIODOS_APORTE = range(4)
+
+DISCREPANCY_COLUMNS = [
+    'motivo', 'CUIT', 'Mes', 'RemuneracionCuiles', 'RemuneracionPeriodos', 'DiferenciaRemuneracion',
+    'AporteCuiles', 'AportePeriodos', 'DiferenciaAporte',
+]
+
+
+def reconciliation_path(dest_file):
+    return os.path.splitext(dest_file)[0] + RECONCILIATION_SUFFIX
+
+
+def reconciliation_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _month_indexes(table, *names):
+    # Posiciones de cada columna mensual, mes por mes, con un bloque de doce por nombre
+    columns = table_columns(table)
+    return [columns.index(name.format(month=month)) for name in names for month in MONTHS]
+
+
+class Reconciliation:
+    """Concilia cuiles con periodos a partir de los mismos lotes que se cargan en el destino.
+
+    Por cada CUIT y año hay una fila en un arreglo de NumPy de 4 x 12: las
+    sumas mensuales de REMUNERACION y APORTE de todos los CUIL en cuiles, y
+    Remuneracion y Aporte de periodos. Cada lote se suma con np.add.at y al
+    final las diferencias se calculan de una vez sobre todo el arreglo, sin
+    volver a leer el destino.
+    """
+
+    def __init__(self):
+        import numpy
+
+        self.np = numpy
+        # (CUIT, año) -> fila de los arreglos
+        self.groups = {}
+        self.sums = numpy.zeros((INITIAL_GROUPS, 4, 12))
+        # Valores no nulos de cada lado por mes: distinguen "sin periodos" de "periodos en cero"
+        self.counts = numpy.zeros((INITIAL_GROUPS, 2, 12), dtype=numpy.int64)
+        self.cuiles_amounts = itemgetter(*_month_indexes('cuiles', 'REMUNERACION{month}', 'APORTE{month}'))
+        self.wide_amounts = itemgetter(*_month_indexes(PERIODOS_STAGING_TABLE, 'Remuneracion_{month}', 'Aporte_{month}'))
+        columns = table_columns('periodos')
+        self.periodos_amounts = itemgetter(columns.index('Remuneracion'), columns.index('Aporte'))
+        self.adders = {
+            'cuiles': self.add_cuiles,
+            'periodos': self.add_periodos,
+            PERIODOS_STAGING_TABLE: self.add_periodos_wide,
+        }
+
+    def add(self, table, rows, sign=1):
+        """Suma (o resta, con sign=-1) un lote de filas de la tabla a los totales."""
+        if rows and table in self.adders:
+            self.adders[table](rows, sign)
+
+    def group_ids(self, keys):
+        groups = self.groups
+        # len(groups) se evalúa antes de agregar la clave: es la próxima fila libre
+        ids = self.np.fromiter((groups.setdefault(key, len(groups)) for key in keys), dtype=self.np.intp)
+        if len(groups) > len(self.sums):
+            self.grow(len(groups))
+        return ids
+
+    def grow(self, needed):
+        np = self.np
+        size = len(self.sums)
+        while size < needed:
+            size *= 2
+        sums = np.zeros((size,) + self.sums.shape[1:])
+        sums[:len(self.sums)] = self.sums
+        counts = np.zeros((size,) + self.counts.shape[1:], dtype=self.counts.dtype)
+        counts[:len(self.counts)] = self.counts
+        self.sums, self.counts = sums, counts
+
+    def amounts(self, rows, getter):
+        values = [getter(row) for row in rows]
+        try:
+            return self.np.array(values, dtype=self.np.float64)
+        except (TypeError, ValueError):
+            # Algún importe no es un número (sin validación): ese valor no se suma
+            return self.np.array([[_number(value) for value in row] for row in values], dtype=self.np.float64)
+
+    def add_months(self, ids, side, amounts, sign):
+        # amounts: (filas, 2, 12) con remuneración y aporte de cada mes
+        np = self.np
+        present = ~np.isnan(amounts).all(axis=1)
+        np.add.at(self.sums[:, 2 * side:2 * side + 2, :], ids, sign * np.nan_to_num(amounts))
+        np.add.at(self.counts[:, side, :], ids, sign * present)
+
+    def add_cuiles(self, rows, sign):
+        ids = self.group_ids((str(row[0]), str(row[1])[:4]) for row in rows)
+        self.add_months(ids, 0, self.amounts(rows, self.cuiles_amounts).reshape(-1, 2, 12), sign)
+
+    def add_periodos_wide(self, rows, sign):
+        ids = self.group_ids((str(row[0]), str(row[1])[:4]) for row in rows)
+        self.add_months(ids, 1, self.amounts(rows, self.wide_amounts).reshape(-1, 2, 12), sign)
+
+    def add_periodos(self, rows, sign):
+        np = self.np
+        ids = self.group_ids((str(row[0]), str(row[1])[:4]) for row in rows)
+        months = np.fromiter((int(str(row[1])[5:7]) - 1 for row in rows), dtype=np.intp, count=len(rows))
+        amounts = self.amounts(rows, self.periodos_amounts)
+        present = ~np.isnan(amounts).all(axis=1)
+        amounts = sign * np.nan_to_num(amounts)
+        np.add.at(self.sums, (ids, PERIODOS_REMUNERACION, months), amounts[:, 0])
+        np.add.at(self.sums, (ids, PERIODOS_APORTE, months), amounts[:, 1])
+        np.add.at(self.counts, (ids, 1, months), sign * present)
+
+    def write(self, path):
+        """Escribe la tabla de diferencias, ordenada por CUIT y mes, y devuelve el resumen."""
+        np = self.np
+        total = len(self.groups)
+        sums = self.sums[:total]
+        counts = self.counts[:total]
+
+        differences = sums[:, 0:2, :] - sums[:, 2:4, :]
+        compared = (counts > 0).any(axis=1)
+        flagged = compared & (np.abs(differences) > TOLERANCE).any(axis=1)
+        group_ids, months = np.nonzero(flagged)
+
+        keys = list(self.groups)
+        rank = np.empty(total, dtype=np.intp)
+        rank[sorted(range(total), key=keys.__getitem__)] = np.arange(total)
+        order = np.lexsort((months, rank[group_ids]))
+        group_ids, months = group_ids[order], months[order]
+
+        reasons = np.where(counts[group_ids, 1, months] == 0, "sin periodos",
+                           np.where(counts[group_ids, 0, months] == 0, "sin cuiles", "diferencia"))
+        columns = [
+            sums[group_ids, CUILES_REMUNERACION, months], sums[group_ids, PERIODOS_REMUNERACION, months],
+            differences[group_ids, 0, months],
+            sums[group_ids, CUILES_APORTE, months], sums[group_ids, PERIODOS_APORTE, months],
+            differences[group_ids, 1, months],
+        ]
+        columns = [column.round(2).tolist() for column in columns]
+
+        rows = (
+            [reason, keys[group][0], f"{keys[group][1]}-{month + 1:02d}"] + values
+            for reason, group, month, *values in zip(reasons.tolist(), group_ids.tolist(), months.tolist(), *columns)
+        )
+        with open(path, 'w', encoding='utf-8', newline='') as discrepancy_file:
+            writer = csv.writer(discrepancy_file)
+            writer.writerow(DISCREPANCY_COLUMNS)
+            writer.writerows(rows)
+
+        return {
+            'file': path,
+            'groups': total,
+            'months': int(compared.sum()),
+            'discrepancies': len(group_ids),
+            'missing_periodos': int((reasons == "sin periodos").sum()),
+            'missing_cuiles': int((reasons == "sin cuiles").sum()),
+            'cuiles_remuneracion': round(float(sums[:, CUILES_REMUNERACION].sum()), 2),
+            'periodos_remuneracion': round(float(sums[:, PERIODOS_REMUNERACION].sum()), 2),
+            'cuiles_aporte': round(float(sums[:, CUILES_APORTE].sum()), 2),
+            'periodos_aporte': round(float(sums[:, PERIODOS_APORTE].sum()), 2),
+            'max_difference': round(float(np.abs(differences).max()), 2) if total else 0.0,
+        }
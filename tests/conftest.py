@@ -0,0 +1,42 @@
+import os
+import sys
+import zipfile
+
+import pytest
+
+# Los módulos del conversor están en la raíz del repositorio, sin paquete
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transformacion import CUILES_FIELD_MAPPING  # noqa: E402
+
+CUILES_SOURCE_TABLE = "VW_DIBENEF_ANNIO_AP_ADIC_DEL - CUILES 2015"
+
+
+def _literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return f"{value!r}E0"
+
+
+@pytest.fixture
+def cuiles_odb(tmp_path):
+    """Arma un .odb con el script HSQLDB de una tabla CUILES: rows filas, una por CUIL, del año anio."""
+    def make(name, rows, anio='2015', first_cuil=0):
+        columns = ['CUIT', 'ANIO', 'CUIL'] + list(CUILES_FIELD_MAPPING)
+        types = ['VARCHAR(11)', 'VARCHAR(4)', 'VARCHAR(11)'] + ['DOUBLE'] * 24 + ['VARCHAR(2)']
+        lines = [
+            'CREATE SCHEMA PUBLIC AUTHORIZATION DBA',
+            f'CREATE MEMORY TABLE "{CUILES_SOURCE_TABLE}"('
+            + ','.join(f'"{column}" {column_type}' for column, column_type in zip(columns, types)) + ')',
+            'SET SCHEMA PUBLIC',
+        ]
+        for i in range(first_cuil, first_cuil + rows):
+            values = [f'30{i % 7:09d}', anio, f'20{i:09d}'] + [float(i + month) for month in range(24)] + ['A']
+            lines.append(f'INSERT INTO "{CUILES_SOURCE_TABLE}" VALUES(' + ','.join(map(_literal, values)) + ')')
+        path = tmp_path / name
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as odb:
+            odb.writestr('database/script', '\n'.join(lines) + '\n')
+        return str(path)
+    return make
@@ -0,0 +1,31 @@
+import csv
+import sqlite3
+
+import pytest
+
+from motor_conversion import ConversionEngine
+from rechazos import REJECTS_SUFFIX
+
+
+def reject_rows(dest_file, table):
+    with open(dest_file[:-len('.sqlite')] + REJECTS_SUFFIX.format(table=table), encoding='utf-8') as rejects:
+        return list(csv.reader(rejects))[1:]
+
+
+@pytest.mark.parametrize('duplicates, expected_rejects', [(None, 500), ('last', 500)])
+def test_lote_con_claves_repetidas_entre_archivos(tmp_path, cuiles_odb, duplicates, expected_rejects):
+    folder = tmp_path / 'lote'
+    folder.mkdir()
+    cuiles_odb('lote/cuiles_500.odb', 500)
+    cuiles_odb('lote/cuiles_2000.odb', 2000)
+    dest_file = str(tmp_path / 'out.sqlite')
+    messages = []
+
+    ConversionEngine(dest_file, source_batch=[str(folder)], workers=2, duplicates=duplicates,
+                     on_status=messages.append).run()
+
+    with sqlite3.connect(dest_file) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cuiles").fetchone() == (2000,)
+        assert conn.execute("SELECT COUNT(*) FROM modicuiles").fetchone() == (2000,)
+    assert len(reject_rows(dest_file, 'cuiles')) == expected_rejects
+    assert any('Carga por lote' in message for message in messages) == (duplicates is None)
@@ -0,0 +1,37 @@
+import glob
+import os
+import sqlite3
+
+from destino_dividido import SHARD_BY_SIZE, SHARD_BY_YEAR, manifest_path
+from motor_conversion import ConversionEngine
+
+
+def convert(dest_file, source_file, **options):
+    ConversionEngine(dest_file, source_cuiles_file=source_file, on_status=lambda message: None, **options).run()
+
+
+def shard_files(tmp_path):
+    return sorted(os.path.basename(path) for path in glob.glob(str(tmp_path / 'out_*.sqlite')))
+
+
+def test_por_anio_un_archivo_por_anio(tmp_path, cuiles_odb):
+    dest_file = str(tmp_path / 'out.sqlite')
+    source_2014 = cuiles_odb('c2014.odb', 30, anio='2014')
+
+    convert(dest_file, source_2014, shard_by=SHARD_BY_YEAR)
+
+    assert shard_files(tmp_path) == ['out_2014.sqlite']
+    assert os.path.exists(manifest_path(dest_file))
+
+
+def test_sin_dividir_borra_la_division_anterior(tmp_path, cuiles_odb):
+    dest_file = str(tmp_path / 'out.sqlite')
+    convert(dest_file, cuiles_odb('grande.odb', 200), shard_by=SHARD_BY_SIZE)
+    assert shard_files(tmp_path) and os.path.exists(manifest_path(dest_file))
+
+    convert(dest_file, cuiles_odb('chico.odb', 50))
+
+    assert shard_files(tmp_path) == []
+    assert not os.path.exists(manifest_path(dest_file))
+    with sqlite3.connect(dest_file) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cuiles").fetchone() == (50,)
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+
+from destinos import AccessDestination, TABLE_SCHEMAS, create_destination, primary_key_name
+
+
+@pytest.fixture
+def sqlite_destination(tmp_path):
+    destination = create_destination(str(tmp_path / 'destino.sqlite'))
+    destination.create()
+    destination.connect()
+    yield destination
+    destination.close()
+
+
+def unnamed_key_ddl(table):
+    # Como los destinos de versiones anteriores: la clave primaria sin nombre
+    columns, key = TABLE_SCHEMAS[table]
+    definitions = [f"{name} {column_type}" for name, column_type in columns]
+    return f"CREATE TABLE {table} ({', '.join(definitions)}, PRIMARY KEY ({', '.join(key)}))"
+
+
+def test_build_keys_reconoce_una_clave_sin_nombre(sqlite_destination):
+    sqlite_destination.execute(unnamed_key_ddl('cuiles'))
+
+    assert sqlite_destination.has_primary_key('cuiles')
+    assert sqlite_destination.build_keys('cuiles') == ['idx_cuiles_cuil']
+    assert sqlite_destination.build_keys('cuiles') == []
+
+
+def test_build_keys_agrega_la_clave_que_falta(sqlite_destination):
+    sqlite_destination.create_table('cuiles', with_key=False)
+    # Un índice único que no cubre exactamente la clave no la reemplaza
+    sqlite_destination.execute("CREATE UNIQUE INDEX otra ON cuiles (CUIT, ANIO, CUIL, tipo)")
+
+    assert not sqlite_destination.has_primary_key('cuiles')
+    assert sqlite_destination.build_keys('cuiles') == [primary_key_name('cuiles'), 'idx_cuiles_cuil']
+    assert sqlite_destination.has_primary_key('cuiles')
+
+
+class AccessCursor:
+    """Cursor con lo que pyodbc informa de los índices de una tabla de Access."""
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+        self.executed = []
+
+    def statistics(self, table, unique=False):
+        # La primera fila describe la tabla, sin índice
+        rows = [SimpleNamespace(index_name=None, non_unique=None, ordinal_position=None, column_name=None)]
+        for name, (is_unique, columns) in self.indexes.items():
+            if unique and not is_unique:
+                continue
+            rows += [SimpleNamespace(index_name=name, non_unique=not is_unique, ordinal_position=position,
+                                     column_name=column)
+                     for position, column in reversed(list(enumerate(columns, 1)))]
+        return rows
+
+    def execute(self, sql, params=()):
+        self.executed.append(sql)
+
+
+def access_destination(indexes):
+    destination = AccessDestination('destino.mdb')
+    destination.cursor = AccessCursor(indexes)
+    return destination
+
+
+def test_access_clave_sin_nombre_no_se_vuelve_a_agregar():
+    # Access llama PrimaryKey a la clave declarada sin nombre
+    destination = access_destination({
+        'PrimaryKey': (True, ['CUIT', 'ANIO', 'CUIL']),
+        'idx_cuiles_cuil': (False, ['CUIL']),
+    })
+
+    assert destination.build_keys('cuiles') == []
+    assert destination.cursor.executed == []
+
+
+def test_access_sin_clave():
+    destination = access_destination({'idx_cuiles_cuil': (False, ['CUIL']), 'otro': (True, ['CUIL'])})
+
+    assert destination.build_keys('cuiles') == [primary_key_name('cuiles')]
+    assert destination.cursor.executed == [
+        f"ALTER TABLE cuiles ADD CONSTRAINT {primary_key_name('cuiles')} PRIMARY KEY (CUIT, ANIO, CUIL)"
+    ]
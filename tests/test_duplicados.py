@@ -0,0 +1,186 @@
+import pytest
+
+from destinos import PERIODOS_STAGING_TABLE, create_destination
+from duplicados import (
+    INITIAL_SLOTS, NOT_SUMMED_REASON, REJECT_REASONS, DuplicateBudgetError, DuplicateFilter, PackedKeySet,
+    FIRST_WINS, LAST_WINS, SUM_AMOUNTS,
+)
+from transformacion import unpivot_periodos
+
+
+def cuiles_row(cuil, first_amount, cuit='30712345671', anio='2015'):
+    return (cuit, anio, cuil, first_amount) + (None,) * 23 + ('A',)
+
+
+def periodos_wide_row(cuit, anio, aporte):
+    row = [cuit, anio]
+    for month in range(1, 13):
+        # Aporte, Contribucion, Depo1, FeDepo1, Retencion, Afiliados, Remuneracion
+        row += [aporte * month, 1.0, 2.0, None, 0.5, 3, 100.0 * month]
+    return tuple(row)
+
+
+@pytest.fixture
+def destination(tmp_path):
+    destination = create_destination(str(tmp_path / 'destino.sqlite'))
+    destination.create()
+    destination.connect()
+    for table in ('cuiles', 'periodos'):
+        destination.create_table(table)
+    yield destination
+    destination.close()
+
+
+def insert(destination, table, rows):
+    placeholders = ', '.join('?' * len(rows[0]))
+    destination.cursor.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+    destination.commit()
+
+
+def load(destination, duplicates, table, rows):
+    """Como la carga: se insertan las filas nuevas del lote y después se resuelven las repetidas."""
+    new_rows, repeated = duplicates.split(rows)
+    if new_rows:
+        insert(destination, table, new_rows)
+    rejected = duplicates.resolve(destination, repeated)
+    destination.commit()
+    return new_rows, rejected
+
+
+def test_packed_key_set_crece_y_reconoce_claves():
+    keys = PackedKeySet(False, 64 * 2**20)
+    count = INITIAL_SLOTS
+    assert all(keys.add(key) for key in range(0, 3 * count, 3))
+    assert keys.slots > INITIAL_SLOTS
+    assert not any(keys.add(key) for key in range(0, 3 * count, 3))
+    assert keys.add(1) and keys.add(2)
+    assert keys.count == count + 2
+
+
+def test_packed_key_set_ancho():
+    keys = PackedKeySet(True, 64 * 2**20)
+    wide = 10 ** 26 + 5
+    assert keys.add(wide)
+    assert keys.add(wide - 2**64)
+    assert not keys.add(wide)
+    assert keys.nbytes == INITIAL_SLOTS * 12
+
+
+def test_packed_key_set_respeta_el_presupuesto():
+    # Al crecer conviven la tabla anterior y la nueva, del doble: 3 veces la actual no entra en 2
+    keys = PackedKeySet(False, INITIAL_SLOTS * 8 * 2)
+    with pytest.raises(DuplicateBudgetError):
+        for key in range(INITIAL_SLOTS):
+            keys.add(key)
+
+
+def test_claves_no_empaquetables_cuentan_para_el_presupuesto():
+    duplicates = DuplicateFilter('cuiles', FIRST_WINS, max_bytes=INITIAL_SLOTS * 12 + 64 * 1024)
+    with pytest.raises(DuplicateBudgetError, match='sin la forma esperada'):
+        duplicates.split([cuiles_row(f'X-{i}', 1.0) for i in range(10_000)])
+
+
+def test_claves_no_empaquetables_achican_lo_que_puede_crecer_la_tabla():
+    # Sin las no empaquetables, la tabla llegaría justo a crecer una vez
+    table_bytes = DuplicateFilter('cuiles', FIRST_WINS).keys.nbytes
+    duplicates = DuplicateFilter('cuiles', FIRST_WINS, max_bytes=table_bytes * 3 + 8 * 1024)
+    duplicates.split([cuiles_row(f'X-{i}', 1.0) for i in range(500)])
+    with pytest.raises(DuplicateBudgetError):
+        duplicates.split([cuiles_row(f'20{i:09d}', 1.0) for i in range(INITIAL_SLOTS)])
+
+
+def test_split_separa_repetidas_incluso_con_claves_no_numericas():
+    duplicates = DuplicateFilter('cuiles', FIRST_WINS)
+    rows = [cuiles_row('20123456786', 1.0), cuiles_row('X-1', 2.0), cuiles_row('20123456786', 3.0),
+            cuiles_row('X-1', 4.0), cuiles_row('20123456786', 5.0, anio='2016')]
+
+    new_rows, repeated = duplicates.split(rows)
+
+    assert new_rows == [rows[0], rows[1], rows[4]]
+    assert repeated == [rows[2], rows[3]]
+    assert duplicates.duplicates == 2
+
+
+def test_politica_desconocida():
+    with pytest.raises(ValueError):
+        DuplicateFilter('cuiles', 'ninguna')
+
+
+def stored(destination, cuil):
+    return destination.select_by_key('cuiles', ['CUIT', 'ANIO', 'CUIL'], ('30712345671', '2015', cuil))
+
+
+def test_primera_conserva_la_fila_cargada(destination):
+    duplicates = DuplicateFilter('cuiles', FIRST_WINS)
+    first, second = cuiles_row('20123456786', 1.0), cuiles_row('20123456786', 9.0)
+
+    _, rejected = load(destination, duplicates, 'cuiles', [first, second])
+
+    assert rejected == [(REJECT_REASONS[FIRST_WINS], second)]
+    assert stored(destination, '20123456786') == first
+
+
+def test_ultima_reemplaza_y_rechaza_la_anterior(destination):
+    duplicates = DuplicateFilter('cuiles', LAST_WINS)
+    first, second = cuiles_row('20123456786', 1.0), cuiles_row('20123456786', 9.0)
+    load(destination, duplicates, 'cuiles', [first])
+
+    _, rejected = load(destination, duplicates, 'cuiles', [second])
+
+    assert rejected == [(REJECT_REASONS[LAST_WINS], first)]
+    assert stored(destination, '20123456786') == second
+
+
+def test_suma_importes_aunque_lleguen_como_texto(destination):
+    duplicates = DuplicateFilter('cuiles', SUM_AMOUNTS)
+    first, second, third = (cuiles_row('20123456786', value) for value in (4.0, '1.001,5', None))
+
+    _, rejected = load(destination, duplicates, 'cuiles', [first, second, third])
+
+    assert [reason for reason, _ in rejected] == [REJECT_REASONS[SUM_AMOUNTS]] * 2
+    assert stored(destination, '20123456786')[3] == 1005.5
+
+
+def test_suma_rechaza_importes_no_numericos_sin_tocar_la_fila(destination):
+    duplicates = DuplicateFilter('cuiles', SUM_AMOUNTS)
+    first, second = cuiles_row('20123456786', 4.0), cuiles_row('20123456786', 'mil')
+
+    _, rejected = load(destination, duplicates, 'cuiles', [first, second])
+
+    assert rejected == [(NOT_SUMMED_REASON, second)]
+    assert stored(destination, '20123456786') == first
+
+
+def test_seed_from_reconoce_lo_ya_cargado(destination):
+    insert(destination, 'cuiles', [cuiles_row('20123456786', 1.0)])
+    duplicates = DuplicateFilter('cuiles', FIRST_WINS)
+    duplicates.seed_from(destination)
+
+    new_rows, repeated = duplicates.split([cuiles_row('20123456786', 2.0), cuiles_row('27000000006', 3.0)])
+
+    assert [row[2] for row in new_rows] == ['27000000006']
+    assert len(repeated) == 1
+
+
+def monthly(destination, cuit):
+    destination.cursor.execute("SELECT Mes, Aporte FROM periodos WHERE CUIT = ? ORDER BY Mes", (cuit,))
+    return destination.cursor.fetchall()
+
+
+@pytest.mark.parametrize('policy, aporte', [(FIRST_WINS, 1.0), (LAST_WINS, 5.0), (SUM_AMOUNTS, 6.0)])
+def test_filas_anchas_de_periodos_se_resuelven_sobre_los_doce_meses(destination, policy, aporte):
+    duplicates = DuplicateFilter(PERIODOS_STAGING_TABLE, policy, expanded=True)
+    first, second = periodos_wide_row('30712345671', 2015, 1.0), periodos_wide_row('30712345671', 2015, 5.0)
+    new_rows, repeated = duplicates.split([first, second])
+    insert(destination, 'periodos', [row for wide in new_rows for row in unpivot_periodos(wide)])
+
+    rejected = duplicates.resolve(destination, repeated)
+
+    # Una fila ancha repetida es un solo rechazo, no doce
+    assert len(rejected) == 1
+    assert rejected[0][0] == REJECT_REASONS[policy]
+    if policy == LAST_WINS:
+        assert rejected[0][1][:3] == ('30712345671', 2015, 1.0)
+    else:
+        assert rejected[0][1] == second
+    assert monthly(destination, '30712345671') == [(f"2015-{month:02d}", aporte * month) for month in range(1, 13)]
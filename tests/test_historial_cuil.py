@@ -0,0 +1,127 @@
+import glob
+import os
+import shutil
+
+import pytest
+
+from destino_dividido import SHARD_BY_SIZE, manifest_path
+from destinos import create_destination
+from historial_cuil import (
+    CuilHistory, HistoryIndexError, HistoryIndexWriter, history_path, rebuild_history_index, write_history_index,
+)
+from motor_conversion import ConversionEngine
+
+
+def cuiles_row(cuit, anio, cuil, amounts, tipo='A'):
+    return (cuit, anio, cuil) + tuple(amounts) + (tipo,)
+
+
+def amounts(seed):
+    # Remuneración y aporte de cada mes; los meses pares sin datos
+    values = []
+    for month in range(1, 13):
+        values += [None, None] if month % 2 == 0 else [seed * 100.0 + month, seed + month / 100]
+    return values
+
+
+ROWS = [
+    cuiles_row('30712345671', '2016', '20123456786', amounts(1)),
+    cuiles_row('30500000000', '2015', '27000000006', amounts(2), tipo=None),
+    cuiles_row('30712345671', '2015', '20123456786', amounts(3)),
+    cuiles_row('30500000000', '2015', '20123456786', amounts(4), tipo='Ñ'),
+    cuiles_row('30500000000', '2015', None, amounts(5)),
+]
+
+
+def test_ida_y_vuelta_con_filas_desordenadas(tmp_path):
+    path = str(tmp_path / 'destino.historial_cuil')
+    writer = HistoryIndexWriter(path)
+    for row in ROWS:
+        writer.add(row)
+    summary = writer.close()
+
+    assert summary['cuils'] == 2 and summary['rows'] == 4 and summary['skipped'] == 1
+    with CuilHistory(path) as history:
+        assert history.total_rows == 4
+        # Por año y CUIT, aunque el CUIL haya quedado en varios tramos
+        assert history.rows('20123456786') == [ROWS[3], ROWS[2], ROWS[0]]
+        assert history.rows('27000000006') == [ROWS[1]]
+        assert history.rows('20999999999') == []
+        assert history.rows('') == []
+
+        timeline = history.timeline('27000000006')
+        assert [entry['Mes'] for entry in timeline] == [f"2015-{month:02d}" for month in range(1, 13, 2)]
+        assert timeline[0] == {'Mes': '2015-01', 'CUIT': '30500000000', 'Remuneracion': 201.0,
+                               'Aporte': 2.01, 'tipo': None}
+
+
+def test_desde_el_destino(tmp_path):
+    destination = create_destination(str(tmp_path / 'destino.sqlite'))
+    destination.create()
+    destination.connect()
+    try:
+        destination.create_table('cuiles')
+        destination.cursor.executemany(f"INSERT INTO cuiles VALUES ({', '.join('?' * 28)})", ROWS[:4])
+        destination.commit()
+        path = str(tmp_path / 'destino.historial_cuil')
+        summary = write_history_index(destination, path, fetch_size=2)
+    finally:
+        destination.close()
+
+    assert summary['rows'] == 4
+    with CuilHistory(path) as history:
+        assert history.cuils == 2
+        assert history.rows('20123456786') == [ROWS[3], ROWS[2], ROWS[0]]
+
+
+def test_indice_inexistente_o_de_otro_formato(tmp_path):
+    with pytest.raises(HistoryIndexError):
+        CuilHistory(str(tmp_path / 'no.historial_cuil'))
+    other = tmp_path / 'otro.historial_cuil'
+    other.write_bytes(b'NOHISTOR' + bytes(40))
+    with pytest.raises(HistoryIndexError):
+        CuilHistory(str(other))
+
+
+def test_abort_no_deja_indice(tmp_path):
+    path = tmp_path / 'destino.historial_cuil'
+    writer = HistoryIndexWriter(str(path))
+    writer.add(ROWS[0])
+    writer.abort()
+    assert not path.exists()
+
+
+def convert(dest_file, source_file, **options):
+    ConversionEngine(dest_file, source_cuiles_file=source_file, on_status=lambda message: None, **options).run()
+
+
+def test_reconstruir_desde_un_destino_dividido(tmp_path, cuiles_odb):
+    dest_file = str(tmp_path / 'out.sqlite')
+    convert(dest_file, cuiles_odb('c.odb', 40), shard_by=SHARD_BY_SIZE)
+
+    summary = rebuild_history_index(dest_file)
+
+    assert summary['cuils'] == 40 and summary['rows'] == 40
+
+
+def test_reconstruir_no_usa_una_division_que_quedo_de_antes(tmp_path, cuiles_odb):
+    dest_file = str(tmp_path / 'out.sqlite')
+    convert(dest_file, cuiles_odb('grande.odb', 200), shard_by=SHARD_BY_SIZE)
+    # Archivos de la división como los dejaba una versión anterior, que no los borraba
+    leftovers = tmp_path / 'anterior'
+    leftovers.mkdir()
+    for path in glob.glob(str(tmp_path / 'out_*.sqlite')) + [manifest_path(dest_file)]:
+        shutil.copy(path, leftovers)
+    convert(dest_file, cuiles_odb('chico.odb', 50))
+    for path in leftovers.iterdir():
+        shutil.copy(path, tmp_path)
+    manifest = open(manifest_path(dest_file), 'rb').read()
+
+    summary = rebuild_history_index(dest_file)
+
+    assert summary['cuils'] == 50 and summary['rows'] == 50
+    with CuilHistory(history_path(dest_file)) as history:
+        assert history.rows('20000000049') and not history.rows('20000000050')
+    # La consulta no toca los archivos que encontró
+    assert open(manifest_path(dest_file), 'rb').read() == manifest
+    assert os.path.exists(tmp_path / 'out_1.sqlite')
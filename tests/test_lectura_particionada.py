@@ -0,0 +1,36 @@
+from lectura_particionada import partition_ranges
+
+
+def test_rangos_contiguos_con_filas_parejas():
+    counts = [(f'30{i:09d}', 10) for i in range(100)]
+
+    ranges = partition_ranges(counts, 4)
+
+    assert [rows for _, _, rows in ranges] == [250, 250, 250, 250]
+    assert ranges[0][0] == counts[0][0] and ranges[-1][1] == counts[-1][0]
+    # Cada rango empieza justo después del anterior
+    values = [value for value, _ in counts]
+    for (_, high, _), (low, _, _) in zip(ranges, ranges[1:]):
+        assert values.index(low) == values.index(high) + 1
+
+
+def test_ordena_los_valores_y_no_parte_un_valor():
+    counts = [('b', 1), (2, 5), ('a', 100), (1, 1)]
+
+    ranges = partition_ranges(counts, 3)
+
+    # Números antes que texto, como en SQLite; un valor con muchas filas queda entero en un rango
+    assert ranges == [(1, 'a', 106), ('b', 'b', 1)]
+    assert sum(rows for _, _, rows in ranges) == 107
+
+
+def test_mas_particiones_que_valores():
+    assert partition_ranges([('x', 3), ('y', 4)], 8) == [('x', 'x', 3), ('y', 'y', 4)]
+
+
+def test_sin_valores():
+    assert partition_ranges([], 4) == []
+
+
+def test_una_particion():
+    assert partition_ranges([(3, 1), (1, 2), (2, 3)], 1) == [(1, 3, 6)]
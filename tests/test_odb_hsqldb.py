@@ -0,0 +1,77 @@
+import datetime
+import zipfile
+import zlib
+
+import pytest
+
+from odb_hsqldb import HsqldbScriptError, HsqldbScriptReader
+
+
+def make_odb(path, lines, compressed=False):
+    script = ('\n'.join(lines) + '\n').encode('latin-1')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as odb:
+        odb.writestr('mimetype', 'application/vnd.oasis.opendocument.base')
+        odb.writestr('database/script', zlib.compress(script) if compressed else script)
+        odb.writestr('database/properties', f"version=1.8.0\nhsqldb.script_format={3 if compressed else 0}\n")
+    return path
+
+
+SCRIPT = [
+    'SET DATABASE COLLATION "Spanish"',
+    'CREATE SCHEMA PUBLIC AUTHORIZATION DBA',
+    'CREATE CACHED TABLE "Otra"("ID" INTEGER NOT NULL PRIMARY KEY)',
+    'CREATE MEMORY TABLE PUBLIC."Datos ""2015"""("Nombre" VARCHAR(50),"Importe" DOUBLE,"Cantidad" INTEGER,'
+    '"Fecha" DATE,"Activo" BOOLEAN,CONSTRAINT SYS_PK PRIMARY KEY("Nombre"))',
+    'CREATE USER SA PASSWORD ""',
+    'SET SCHEMA PUBLIC',
+    'INSERT INTO "Otra" VALUES(1)',
+    'INSERT INTO "Datos ""2015""" VALUES(\'O\'\'Brien, Juan\',1234.5E0,3,\'2015-03-10\',TRUE)',
+    'INSERT INTO "Datos ""2015""" VALUES(\'Jos\\u00e9 (hijo)\',NULL,NULL,NULL,FALSE)',
+    'INSERT INTO "Datos ""2015""" VALUES(\'\',-0.25E0,0,\'2016-12-31\',NULL)',
+]
+
+
+def read_all(path, preferred_table=None, batch_size=2):
+    with zipfile.ZipFile(path) as odb:
+        reader = HsqldbScriptReader(odb, preferred_table)
+        try:
+            batches = list(reader.iter_batches(batch_size))
+            return reader, batches
+        finally:
+            reader.close()
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_lee_valores_con_comillas_escapes_y_nulos(tmp_path, compressed):
+    reader, batches = read_all(make_odb(tmp_path / 'datos.odb', SCRIPT, compressed))
+
+    assert reader.table.name == 'Datos "2015"'
+    assert reader.columns == ['Nombre', 'Importe', 'Cantidad', 'Fecha', 'Activo']
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert [row for batch in batches for row in batch] == [
+        ("O'Brien, Juan", 1234.5, 3, datetime.date(2015, 3, 10), True),
+        ('José (hijo)', None, None, None, False),
+        ('', -0.25, 0, datetime.date(2016, 12, 31), None),
+    ]
+    assert reader.fraction_read() == 1.0
+
+
+def test_tabla_cached_pedida_es_un_error(tmp_path):
+    path = make_odb(tmp_path / 'datos.odb', SCRIPT)
+    with zipfile.ZipFile(path) as odb:
+        with pytest.raises(HsqldbScriptError, match='CACHED'):
+            HsqldbScriptReader(odb, 'Otra')
+
+
+def test_solo_tablas_cached_es_un_error(tmp_path):
+    path = make_odb(tmp_path / 'datos.odb', SCRIPT[:3] + ['INSERT INTO "Otra" VALUES(1)'])
+    with zipfile.ZipFile(path) as odb:
+        with pytest.raises(HsqldbScriptError, match='CACHED'):
+            HsqldbScriptReader(odb)
+
+
+def test_script_sin_tablas(tmp_path):
+    path = make_odb(tmp_path / 'vacio.odb', ['SET SCHEMA PUBLIC'])
+    with zipfile.ZipFile(path) as odb:
+        with pytest.raises(HsqldbScriptError):
+            HsqldbScriptReader(odb)
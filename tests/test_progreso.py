@@ -0,0 +1,70 @@
+import threading
+import time
+
+from cola_trabajos import JOB_CANCELLED, JobQueue
+from progreso import ProgressChannel
+
+
+def test_publica_como_maximo_una_actualizacion_por_intervalo():
+    channel = ProgressChannel(interval=60)
+    for percent in range(10):
+        channel.progress(percent)
+
+    assert channel.drain() == [('progress', 0, None)]
+
+
+def test_el_avance_retenido_se_publica_antes_de_cambiar_de_etapa():
+    channel = ProgressChannel(interval=60)
+    channel.progress(10, "Procesando registro 1...")
+    channel.progress(40, "Procesando registro 3000...")
+    channel.status("Creando modicuiles...")
+
+    # drain deja sólo el último de los avances seguidos
+    assert channel.drain() == [('progress', 40, "Procesando registro 3000..."), ('status', "Creando modicuiles...")]
+
+
+def test_el_avance_retenido_se_publica_al_terminar_o_fallar():
+    for finish, event in ((lambda channel: channel.done({}), ('done', {})),
+                          (lambda channel: channel.error(None), ('error', None))):
+        channel = ProgressChannel(interval=60)
+        channel.progress(10)
+        channel.progress(55)
+        finish(channel)
+
+        assert channel.drain()[-2:] == [('progress', 55, None), event]
+
+
+def test_el_avance_retenido_no_queda_viejo_sin_otro_detras():
+    channel = ProgressChannel(interval=0.05)
+    channel.progress(10)
+    channel.progress(70)
+    assert channel.drain() == [('progress', 10, None)]
+
+    time.sleep(0.06)
+
+    assert channel.drain() == [('progress', 70, None)]
+    assert channel.drain() == []
+
+
+def test_cancelar_publica_el_avance_retenido():
+    started = threading.Event()
+    release = threading.Event()
+
+    def run_job(job):
+        job.channel.progress(10)
+        job.channel.progress(35)
+        started.set()
+        release.wait(5)
+        raise RuntimeError("cancelada")
+
+    jobs = JobQueue(run_job)
+    job = jobs.submit('destino.sqlite', {})
+    job.channel.interval = 60
+    started.wait(5)
+    jobs.cancel(job)
+
+    assert job.channel.drain()[-1] == ('progress', 35, None)
+    release.set()
+    while not job.is_finished:
+        time.sleep(0.01)
+    assert job.state == JOB_CANCELLED
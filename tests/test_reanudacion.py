@@ -0,0 +1,33 @@
+import pytest
+
+from reanudacion import ResumeError, skip_loaded_rows
+
+
+def batches(total, size):
+    rows = list(range(total))
+    return [rows[start:start + size] for start in range(0, total, size)]
+
+
+@pytest.mark.parametrize('count', [0, 1, 3, 4, 5, 9, 10])
+def test_descarta_las_filas_ya_cargadas(count):
+    checked = []
+
+    remaining = list(skip_loaded_rows(batches(10, 4), count, checked.append))
+
+    assert [row for batch in remaining for row in batch] == list(range(count, 10))
+    assert all(remaining)
+    # Se verifica la última fila descartada, si hubo alguna
+    assert checked == ([count - 1] if count else [])
+
+
+def test_origen_mas_corto_que_lo_cargado():
+    with pytest.raises(ResumeError):
+        list(skip_loaded_rows(batches(10, 4), 11))
+
+
+def test_la_verificacion_puede_detener_la_reanudacion():
+    def check_last(row):
+        raise ResumeError(f"el origen cambió: {row}")
+
+    with pytest.raises(ResumeError, match='cambió: 5'):
+        list(skip_loaded_rows(batches(10, 4), 6, check_last))
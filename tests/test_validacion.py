@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+
+from validacion import RowValidator, cuit_check_digit, to_amount, to_count, to_cuit, to_date, to_mes, to_year
+
+
+def test_digito_verificador_del_cuit():
+    assert cuit_check_digit('2012345678') == 6
+    assert cuit_check_digit('3071234567') == 1
+    # Resto 10: no hay dígito válido para esos diez dígitos
+    assert cuit_check_digit('2099999999') is None
+
+
+@pytest.mark.parametrize('value', ['20123456786', '20-12345678-6', ' 20 12345678 6 ', 20123456786, 20123456786.0])
+def test_to_cuit_normaliza(value):
+    assert to_cuit(value) == '20123456786'
+
+
+@pytest.mark.parametrize('value', [None, '', '2012345678', '201234567860', '20123456785', '2O123456786',
+                                   '２0123456786'])
+def test_to_cuit_rechaza(value):
+    with pytest.raises(ValueError):
+        to_cuit(value)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, None), ('', None), (12, 12.0), (1.5, 1.5), ('1234.5', 1234.5), ('1.234,56', 1234.56),
+    ('1,234.56', 1234.56), ('12,5', 12.5), (' -3 ', -3.0),
+])
+def test_to_amount(value, expected):
+    assert to_amount(value) == expected
+
+
+@pytest.mark.parametrize('value', ['abc', True, 'nan', float('inf')])
+def test_to_amount_rechaza(value):
+    with pytest.raises(ValueError):
+        to_amount(value)
+
+
+def test_to_count():
+    assert to_count(3.0) == 3
+    assert to_count(' 7 ') == 7
+    assert to_count('') is None
+    with pytest.raises(ValueError):
+        to_count(2.5)
+
+
+def test_to_date():
+    assert to_date('2015-03-10 00:00:00') == datetime.date(2015, 3, 10)
+    assert to_date('10/03/2015') == datetime.date(2015, 3, 10)
+    assert to_date('') is None
+    with pytest.raises(ValueError):
+        to_date('marzo')
+
+
+def test_to_year_y_to_mes():
+    assert to_year('2015') == 2015
+    assert to_year(2015.0) == 2015
+    assert to_mes('2015-12') == '2015-12'
+    for value in ('15', '1800', 'abcd'):
+        with pytest.raises(ValueError):
+            to_year(value)
+    for value in ('2015-13', '2015-1', 201501):
+        with pytest.raises(ValueError):
+            to_mes(value)
+
+
+def test_validator_convierte_y_rechaza_filas():
+    validator = RowValidator('cuiles')
+    amounts = (None,) * 24
+    good = ('20-12345678-6', 2015, '20123456786') + ('1.234,5',) + amounts[1:] + ('A',)
+    bad = ('20123456785', '2015', '20123456786') + amounts + ('A',)
+
+    valid, rejected = validator.validate([good, bad])
+
+    assert valid == [('20123456786', '2015', '20123456786', 1234.5) + amounts[1:] + ('A',)]
+    assert len(rejected) == 1
+    reason, row = rejected[0]
+    assert row == bad and 'CUIT' in reason
+    assert validator.rejected == 1
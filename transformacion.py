@@ -0,0 +1,170 @@
+from operator import itemgetter
+
+# Columnas de clave que se copian tal cual del origen
+CUILES_KEY_FIELDS = ['CUIT', 'ANIO', 'CUIL']
+
+# Mapeo de campos
+CUILES_FIELD_MAPPING = {
+    'REMUNERACION_ENERO': 'REMUNERACION1',
+    'APORTE_ENERO': 'APORTE1',
+    'REMUNERACION_FEBRERO': 'REMUNERACION2',
+    'APORTE_FEBRERO': 'APORTE2',
+    'REMUNERACION_MARZO': 'REMUNERACION3',
+    'APORTE_MARZO': 'APORTE3',
+    'REMUNERACION_ABRIL': 'REMUNERACION4',
+    'APORTE_ABRIL': 'APORTE4',
+    'REMUNERACION_MAYO': 'REMUNERACION5',
+    'APORTE_MAYO': 'APORTE5',
+    'REMUNERACION_JUNIO': 'REMUNERACION6',
+    'APORTE_JUNIO': 'APORTE6',
+    'REMUNERACION_JULIO': 'REMUNERACION7',
+    'APORTE_JULIO': 'APORTE7',
+    'REMUNERACION_AGOSTO': 'REMUNERACION8',
+    'APORTE_AGOSTO': 'APORTE8',
+    'REMUNERACION_SEPTIEMBRE': 'REMUNERACION9',
+    'APORTE_SEPTIEMBRE': 'APORTE9',
+    'REMUNERACION_OCTUBRE': 'REMUNERACION10',
+    'APORTE_OCTUBRE': 'APORTE10',
+    'REMUNERACION_NOVIEMBRE': 'REMUNERACION11',
+    'APORTE_NOVIEMBRE': 'APORTE11',
+    'REMUNERACION_DICIEMBRE': 'REMUNERACION12',
+    'APORTE_DICIEMBRE': 'APORTE12',
+    'TIPO_BENEFICIARIO': 'tipo'
+}
+
+# Columnas de la tabla cuiles en el orden fijo del INSERT
+CUILES_DEST_COLUMNS = CUILES_KEY_FIELDS + list(CUILES_FIELD_MAPPING.values())
+
+# Índices de las doce REMUNERACION dentro de una fila de cuiles
+CUILES_REMUNERACION_SLICE = slice(3, 27, 2)
+
+
+def _source_defaults():
+    """Valor por defecto de cada columna de destino cuando el origen no la trae."""
+    return [None] * len(CUILES_KEY_FIELDS) + [0] * len(CUILES_FIELD_MAPPING)
+
+
+def compile_cuiles_transformer(source_columns):
+    """Compila el mapeo de CUILES para un esquema de origen.
+
+    Devuelve una función que convierte una fila del origen (por posición, según
+    cursor.description) en la tupla de CUILES_DEST_COLUMNS. Las columnas que el
+    origen no trae se reemplazan por su valor constante por defecto.
+    """
+    positions = {name: i for i, name in enumerate(source_columns)}
+    source_fields = CUILES_KEY_FIELDS + list(CUILES_FIELD_MAPPING)
+    defaults = _source_defaults()
+
+    indexes = []
+    constants = []
+    for field, default in zip(source_fields, defaults):
+        if field in positions:
+            indexes.append(positions[field])
+        else:
+            # Las constantes se agregan al final de la fila y se toman por índice como las demás
+            indexes.append(len(source_columns) + len(constants))
+            constants.append(default)
+
+    getter = itemgetter(*indexes)
+    if not constants:
+        return getter
+
+    constants = tuple(constants)
+
+    def transform(row):
+        return getter(tuple(row) + constants)
+
+    return transform
+
+
+def modicuiles_row(cuiles_row):
+    """CUIT, ANIO, CUIL y las doce REMUNERACION como RemuMinima."""
+    return cuiles_row[:3] + cuiles_row[CUILES_REMUNERACION_SLICE]
+
+
+MONTHS = range(1, 13)
+
+# Campos mensuales de PERIODOS: columna de destino y columna de origen ({month} = 1..12)
+PERIODOS_MONTH_FIELDS = [
+    ('Aporte', 'APORTE_381_{month}'),
+    ('Contribucion', 'CONTRIB_401_{month}'),
+    ('Depo1', 'APORTE_Y_CONTR_{month}'),
+    ('FeDepo1', 'FECHAPAGO_PAG_{month}'),
+    ('Retencion', 'RETENCION_471_{month}'),
+    ('Afiliados', 'BENEF_CANTPER_{month}'),
+    ('Remuneracion', 'BENEF_NR_IMPREM_{month}'),
+]
+
+PERIODOS_COLUMNS = ['CUIT', 'Mes', 'Afiliados', 'Remuneracion', 'Aporte', 'Contribucion', 'Depo1', 'FeDepo1', 'Retencion', 'CantMenor', 'RemuMenor', 'CantMayor', 'RemuMayor', 'intepago']
+
+# Fila "ancha" de PERIODOS: CUIT, ANIO y los campos mensuales de los doce meses
+PERIODOS_WIDE_COLUMNS = ['CUIT', 'ANIO'] + [f'{dest}_{month}' for month in MONTHS for dest, _ in PERIODOS_MONTH_FIELDS]
+
+
+def compile_periodos_wide_transformer(source_columns):
+    """Compila la lectura de PERIODOS: fila del origen -> tupla de PERIODOS_WIDE_COLUMNS (None si falta)."""
+    positions = {name: i for i, name in enumerate(source_columns)}
+    source_fields = ['CUIT', 'ANIO'] + [source.format(month=month) for month in MONTHS for _, source in PERIODOS_MONTH_FIELDS]
+
+    missing = len(source_columns)
+    getter = itemgetter(*[positions.get(field, missing) for field in source_fields])
+    if all(field in positions for field in source_fields):
+        return getter
+
+    def transform(row):
+        return getter(tuple(row) + (None,))
+
+    return transform
+
+
+def periodos_wide_rows(batch, transform=None, strict=True):
+    """Filas anchas de un lote con ANIO entero, descartando las que no traen CUIT o ANIO.
+
+    Sin transform, las filas del lote ya están en PERIODOS_WIDE_COLUMNS. Con strict=False, un ANIO que no es un número queda tal cual en lugar de
+    detener la carga, para que la validación rechace la fila.
+    """
+    wide_rows = []
+    for source_row in batch:
+        wide = transform(source_row) if transform else source_row
+        cuit = wide[0]
+        anio_raw = wide[1]
+        if not cuit or not anio_raw:
+            continue
+        try:
+            anio = int(anio_raw)
+        except (ValueError, TypeError):
+            if strict:
+                raise
+            anio = anio_raw
+        wide_rows.append((cuit, anio) + wide[2:])
+    return wide_rows
+
+
+def unpivot_periodos(wide_row):
+    """Convierte una fila ancha (con ANIO entero) en las doce filas mensuales de periodos."""
+    cuit = wide_row[0]
+    anio = wide_row[1]
+    width = len(PERIODOS_MONTH_FIELDS)
+    rows = []
+    for month in MONTHS:
+        base = 2 + (month - 1) * width
+        aporte, contribucion, depo1, fedepo1, retencion, afiliados, remuneracion = wide_row[base:base + width]
+        # Se inserta siempre, incluso si no hay datos para el mes
+        rows.append((cuit, f"{anio}-{month:02d}", afiliados, remuneracion, aporte, contribucion, depo1,
+                     fedepo1, retencion, 0, 0.00, afiliados, remuneracion, 0.00))
+    return rows
+
+
+def pivot_periodos(cuit, anio, monthly_rows):
+    """Arma la fila ancha de un CUIT y año con sus doce filas mensuales de periodos (None si falta un mes).
+
+    Es la inversa de unpivot_periodos, para informar una fila ancha a partir de lo que quedó en el destino.
+    """
+    positions = [PERIODOS_COLUMNS.index(dest) for dest, _ in PERIODOS_MONTH_FIELDS]
+    wide = [cuit, anio]
+    for row in monthly_rows:
+        if row is None:
+            wide.extend([None] * len(positions))
+        else:
+            wide.extend(row[i] for i in positions)
+    return tuple(wide)
@@ -0,0 +1,204 @@
+import datetime
+import math
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+from destinos import TABLE_SCHEMAS, table_columns
+
+# Pesos del dígito verificador (módulo 11) de CUIT y CUIL
+CUIT_WEIGHTS = (5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+
+# Años aceptados en ANIO y Mes
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d')
+
+_MES_PATTERN = re.compile(r'\d{4}-\d{2}')
+_NONE = type(None)
+
+
+def cuit_check_digit(digits):
+    """Dígito verificador de los primeros diez dígitos de un CUIT/CUIL (None si no hay uno válido)."""
+    remainder = 11 - sum(int(digit) * weight for digit, weight in zip(digits, CUIT_WEIGHTS)) % 11
+    if remainder == 11:
+        return 0
+    if remainder == 10:
+        return None
+    return remainder
+
+
+@lru_cache(maxsize=65536)
+def to_cuit(value):
+    """CUIT/CUIL como texto de 11 dígitos, sin guiones ni espacios; ValueError si el verificador no coincide."""
+    if value is None:
+        raise ValueError("vacío")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip().replace('-', '').replace(' ', '')
+    if len(text) != 11 or not text.isascii() or not text.isdigit():
+        raise ValueError(f"no tiene 11 dígitos: {value!r}")
+    if cuit_check_digit(text[:10]) != int(text[10]):
+        raise ValueError(f"dígito verificador incorrecto: {value!r}")
+    return text
+
+
+def to_amount(value):
+    """Importe como número; acepta texto con coma o punto decimal y separador de miles ('1.234,56')."""
+    if value is None or isinstance(value, float) and math.isfinite(value):
+        return value
+    if isinstance(value, bool):
+        raise ValueError(f"no es un importe: {value!r}")
+    if isinstance(value, (int, Decimal)):
+        return float(value)
+    text = str(value).strip().replace(' ', '')
+    if not text:
+        return None
+    if ',' in text:
+        # El último separador es el decimal; el otro, si aparece, es el de miles
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    number = float(text)
+    if not math.isfinite(number):
+        raise ValueError(f"no es un importe: {value!r}")
+    return number
+
+
+def to_count(value):
+    """Cantidad entera; acepta floats sin decimales y texto con dígitos."""
+    if value is None or type(value) is int:
+        return value
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"no es una cantidad entera: {value!r}")
+        return int(value)
+    text = str(value).strip()
+    return int(text) if text else None
+
+
+def to_date(value):
+    """Fecha de pago: date/datetime tal cual, o texto ISO o dd/mm/aaaa."""
+    if value is None or isinstance(value, datetime.date):
+        return value
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return datetime.date.fromisoformat(text[:10])
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text[:10], date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"no es una fecha: {value!r}")
+
+
+def to_year(value):
+    if isinstance(value, float) and value.is_integer():
+        year = int(value)
+    elif type(value) is int:
+        year = value
+    else:
+        text = str(value).strip()
+        if len(text) != 4 or not text.isascii() or not text.isdigit():
+            raise ValueError(f"no es un año: {value!r}")
+        year = int(text)
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f"año fuera de rango: {value!r}")
+    return year
+
+
+@lru_cache(maxsize=1024)
+def to_year_text(value):
+    # ANIO es TEXT en cuiles: se guarda siempre como '2015', venga como número o como texto
+    return str(to_year(value))
+
+
+@lru_cache(maxsize=4096)
+def to_mes(value):
+    if not isinstance(value, str) or not _MES_PATTERN.fullmatch(value) or not 1 <= int(value[5:]) <= 12:
+        raise ValueError(f"no es un mes AAAA-MM: {value!r}")
+    to_year(value[:4])
+    return value
+
+
+# Conversión de cada columna según su nombre o su tipo en el destino, y los tipos que ya no necesitan conversión
+_NAMED_CONVERTERS = {
+    'CUIT': (to_cuit, None),
+    'CUIL': (to_cuit, None),
+    'Mes': (to_mes, None),
+}
+_TYPE_CONVERTERS = {
+    'DOUBLE': (to_amount, {float, int, _NONE}),
+    'LONG': (to_count, {int, _NONE}),
+    'DATETIME': (to_date, {datetime.date, datetime.datetime, _NONE}),
+}
+
+
+def _column_converter(name, column_type):
+    if name in _NAMED_CONVERTERS:
+        return _NAMED_CONVERTERS[name]
+    if name == 'ANIO':
+        return (to_year_text, None) if column_type.startswith('TEXT') else (to_year, {int})
+    return _TYPE_CONVERTERS.get(column_type)
+
+
+class RowValidator:
+    """Valida y convierte lotes de filas de una tabla del destino, columna por columna.
+
+    Los conversores de cada columna se eligen una sola vez a partir del
+    esquema. Cada lote se recorre por columnas: si todos los valores de una
+    columna ya tienen un tipo aceptable, la columna no se toca; si no, se
+    convierte entera con map y sólo ante un error se revisa valor por valor
+    para saber qué filas rechazar.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.columns = table_columns(table)
+        self.checks = []
+        for i, (name, column_type) in enumerate(TABLE_SCHEMAS[table][0]):
+            converter = _column_converter(name, column_type)
+            if converter is not None:
+                self.checks.append((i, name) + converter)
+        self.rejected = 0
+
+    def validate(self, rows):
+        """Devuelve las filas válidas, ya convertidas, y los pares (motivo, fila original) de las inválidas."""
+        if not rows:
+            return rows, []
+
+        columns = list(zip(*rows))
+        invalid = {}
+        changed = False
+        for i, name, convert, accepted_types in self.checks:
+            column = columns[i]
+            if accepted_types is not None and set(map(type, column)) <= accepted_types:
+                continue
+            changed = True
+            try:
+                columns[i] = list(map(convert, column))
+            except (ValueError, TypeError, ArithmeticError):
+                columns[i] = self._convert_each(name, convert, column, invalid)
+
+        valid = list(zip(*columns)) if changed else rows
+        if not invalid:
+            return valid, []
+        self.rejected += len(invalid)
+        return ([row for r, row in enumerate(valid) if r not in invalid],
+                [(invalid[r], rows[r]) for r in sorted(invalid)])
+
+    def _convert_each(self, name, convert, column, invalid):
+        values = []
+        for r, value in enumerate(column):
+            try:
+                values.append(convert(value))
+            except (ValueError, TypeError, ArithmeticError) as e:
+                values.append(value)
+                invalid.setdefault(r, f"{name} inválido: {e}")
+        return values
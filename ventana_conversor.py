@@ -0,0 +1,419 @@
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+import platform
+
+from carga_masiva import DEFAULT_BATCH_SIZE
+from cola_trabajos import JobQueue, JOB_CANCELLED, JOB_DONE, JOB_FAILED
+from destino_dividido import SHARD_BY_YEAR
+from duplicados import FIRST_WINS, LAST_WINS, SUM_AMOUNTS
+from exportacion import EXPORT_FORMATS
+from lectura_particionada import DEFAULT_READ_PARTITIONS
+
+# Cada cuántos milisegundos la ventana consulta el canal de progreso
+POLL_INTERVAL_MS = 100
+
+# Columnas de la cola de conversiones: identificador, título y ancho
+JOB_COLUMNS = [
+    ('numero', "#", 30),
+    ('destino', "Destino", 220),
+    ('estado', "Estado", 100),
+    ('tiempo', "Tiempo", 70),
+    ('velocidad', "Filas/s", 90),
+]
+JOB_ROWS = 5
+
+# Opciones ante filas de clave repetida, en el orden del desplegable
+DUPLICATE_CHOICES = {
+    "Detener la conversión": None,
+    "Conservar la primera": FIRST_WINS,
+    "Conservar la última": LAST_WINS,
+    "Sumar los importes": SUM_AMOUNTS,
+}
+
+class ConversorCuiles:
+    def __init__(self, root, batch_size=DEFAULT_BATCH_SIZE):
+        self.root = root
+        self.batch_size = batch_size
+        self.load_stats = {}
+        # Las conversiones se encolan y se ejecutan de a una en el hilo de trabajo de la cola
+        self.job_queue = JobQueue(self.run_job)
+        self.polling = False
+        self.closing = False
+        # Trabajos ya incluidos en un resumen de fin de cola
+        self.summarized_jobs = 0
+        self.root.title("Conversor de CUILES y Periodos")
+        self.root.geometry("600x880")
+        
+        # Comprobar y mostrar la arquitectura de Python
+        py_arch = platform.architecture()[0]
+        self.root.title(f"Conversor de CUILES y Periodos (Python {py_arch})")
+
+        # Establecer nombre predeterminado para el archivo de destino en una ruta simple
+        temp_db_dir = "C:\\temp_db"
+        if not os.path.exists(temp_db_dir):
+            os.makedirs(temp_db_dir)
+        self.default_output_path = os.path.join(temp_db_dir, "cordobaAux.mdb")
+        
+        # Configuración de la interfaz
+        self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.close_window)
+    
+    def setup_ui(self):
+        # Frame principal
+        main_frame = tk.Frame(self.root, padx=20, pady=20)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Título
+        title_label = tk.Label(main_frame, text="Conversor de CUILES", font=("Arial", 16, "bold"))
+        title_label.pack(pady=(0, 20))
+        
+        # Selección de archivo origen (CUILES)
+        source_cuiles_frame = tk.Frame(main_frame)
+        source_cuiles_frame.pack(fill=tk.X, pady=5)
+        
+        source_cuiles_label = tk.Label(source_cuiles_frame, text="Archivo CUILES (.odb, .accdb):", width=25, anchor="w")
+        source_cuiles_label.pack(side=tk.LEFT)
+        
+        self.source_cuiles_entry = tk.Entry(source_cuiles_frame)
+        self.source_cuiles_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        
+        source_cuiles_button = tk.Button(source_cuiles_frame, text="Buscar", command=lambda: self.select_source_file('cuiles'))
+        source_cuiles_button.pack(side=tk.RIGHT)
+
+        # Selección de archivo origen (PERIODOS)
+        source_periodos_frame = tk.Frame(main_frame)
+        source_periodos_frame.pack(fill=tk.X, pady=5)
+        
+        source_periodos_label = tk.Label(source_periodos_frame, text="Archivo PERIODOS (.odb, .accdb):", width=25, anchor="w")
+        source_periodos_label.pack(side=tk.LEFT)
+        
+        self.source_periodos_entry = tk.Entry(source_periodos_frame)
+        self.source_periodos_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        
+        source_periodos_button = tk.Button(source_periodos_frame, text="Buscar", command=lambda: self.select_source_file('periodos'))
+        source_periodos_button.pack(side=tk.RIGHT)
+        
+        # Selección de archivo destino
+        dest_frame = tk.Frame(main_frame)
+        dest_frame.pack(fill=tk.X, pady=5)
+        
+        dest_label = tk.Label(dest_frame, text="Archivo destino (.mdb):", width=20, anchor="w")
+        dest_label.pack(side=tk.LEFT)
+        
+        self.dest_entry = tk.Entry(dest_frame)
+        self.dest_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        self.dest_entry.insert(0, self.default_output_path)  # Establecer valor predeterminado
+        
+        dest_button = tk.Button(dest_frame, text="Buscar", command=self.select_dest_file)
+        dest_button.pack(side=tk.RIGHT)
+
+        # Modo incremental: actualizar el destino existente en lugar de recrearlo
+        self.update_mode_var = tk.BooleanVar(value=False)
+        update_mode_check = tk.Checkbutton(main_frame, text="Actualizar destino existente (sólo filas nuevas o modificadas)", variable=self.update_mode_var, anchor="w")
+        update_mode_check.pack(fill=tk.X)
+
+        # Reanudar una carga que se interrumpió, desde el último lote confirmado
+        self.resume_var = tk.BooleanVar(value=False)
+        resume_check = tk.Checkbutton(main_frame, text="Reanudar carga interrumpida", variable=self.resume_var, anchor="w")
+        resume_check.pack(fill=tk.X)
+
+        # Leer ambos orígenes a la vez mientras se escribe el destino
+        self.concurrent_var = tk.BooleanVar(value=False)
+        concurrent_check = tk.Checkbutton(main_frame, text="Leer CUILES y PERIODOS en simultáneo", variable=self.concurrent_var, anchor="w")
+        concurrent_check.pack(fill=tk.X)
+
+        # Crear claves primarias e índices después de la carga masiva
+        self.deferred_keys_var = tk.BooleanVar(value=False)
+        deferred_keys_check = tk.Checkbutton(main_frame, text="Crear claves e índices al final de la carga", variable=self.deferred_keys_var, anchor="w")
+        deferred_keys_check.pack(fill=tk.X)
+
+        # Validar y convertir los datos del origen; las filas inválidas van a un CSV junto al destino
+        self.validate_var = tk.BooleanVar(value=False)
+        validate_check = tk.Checkbutton(main_frame, text="Validar CUIT/CUIL, importes y fechas (rechazar filas inválidas)", variable=self.validate_var, anchor="w")
+        validate_check.pack(fill=tk.X)
+
+        # Copia de las tablas en CSV y Parquet, particionadas por ANIO o Mes, para los análisis
+        self.export_var = tk.BooleanVar(value=False)
+        export_check = tk.Checkbutton(main_frame, text="Exportar también a CSV y Parquet (carpeta junto al destino)", variable=self.export_var, anchor="w")
+        export_check.pack(fill=tk.X)
+
+        # Un archivo por año, para que ningún .mdb llegue al límite de 2 GB de Access
+        self.shard_var = tk.BooleanVar(value=False)
+        shard_check = tk.Checkbutton(main_frame, text="Dividir el destino en un archivo por año (límite de 2 GB de Access)", variable=self.shard_var, anchor="w")
+        shard_check.pack(fill=tk.X)
+
+        # Sumas de cuiles contra periodos por CUIT y mes, calculadas mientras se carga
+        self.reconcile_var = tk.BooleanVar(value=False)
+        reconcile_check = tk.Checkbutton(main_frame, text="Conciliar CUILES con PERIODOS (diferencias en un CSV junto al destino)", variable=self.reconcile_var, anchor="w")
+        reconcile_check.pack(fill=tk.X)
+
+        # Los orígenes ya leídos se guardan mapeados en disco; repetir la conversión no vuelve a extraerlos
+        self.source_cache_var = tk.BooleanVar(value=False)
+        source_cache_check = tk.Checkbutton(main_frame, text="Guardar los orígenes leídos en caché para las próximas conversiones", variable=self.source_cache_var, anchor="w")
+        source_cache_check.pack(fill=tk.X)
+
+        # Cada tabla de origen se lee en varios rangos de CUIT a la vez, con una conexión por rango
+        self.partitioned_var = tk.BooleanVar(value=False)
+        partitioned_check = tk.Checkbutton(main_frame, text=f"Leer cada origen en {DEFAULT_READ_PARTITIONS} partes simultáneas (.accdb)", variable=self.partitioned_var, anchor="w")
+        partitioned_check.pack(fill=tk.X)
+
+        # Índice por CUIL junto al destino: el historial de un CUIL se consulta sin abrir la base
+        self.history_index_var = tk.BooleanVar(value=False)
+        history_index_check = tk.Checkbutton(main_frame, text="Generar índice del historial por CUIL (consultas rápidas)", variable=self.history_index_var, anchor="w")
+        history_index_check.pack(fill=tk.X)
+
+        # Política ante filas con la clave repetida; las descartadas van a un CSV junto al destino
+        duplicates_frame = tk.Frame(main_frame)
+        duplicates_frame.pack(fill=tk.X, pady=5)
+
+        duplicates_label = tk.Label(duplicates_frame, text="Filas duplicadas:", width=20, anchor="w")
+        duplicates_label.pack(side=tk.LEFT)
+
+        self.duplicates_var = tk.StringVar(value=next(iter(DUPLICATE_CHOICES)))
+        duplicates_combo = ttk.Combobox(duplicates_frame, textvariable=self.duplicates_var, values=list(DUPLICATE_CHOICES), state="readonly")
+        duplicates_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Barra de progreso
+        progress_frame = tk.Frame(main_frame)
+        progress_frame.pack(fill=tk.X, pady=10)
+        
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.pack(fill=tk.X)
+        
+        # Botones: Convertir agrega la conversión a la cola; Cancelar detiene la elegida (o la que está en curso)
+        buttons_frame = tk.Frame(main_frame)
+        buttons_frame.pack(pady=10)
+
+        self.convert_button = tk.Button(buttons_frame, text="Convertir", command=self.enqueue_conversion, bg="#4CAF50", fg="white", font=("Arial", 12, "bold"), padx=20, pady=10)
+        self.convert_button.pack(side=tk.LEFT, padx=5)
+
+        self.cancel_button = tk.Button(buttons_frame, text="Cancelar", command=self.cancel_selected_job, font=("Arial", 12), padx=20, pady=10, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        # Cola de conversiones: se ejecutan una tras otra, con su tiempo y su velocidad
+        queue_frame = tk.Frame(main_frame)
+        queue_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+
+        self.jobs_tree = ttk.Treeview(queue_frame, columns=[name for name, _, _ in JOB_COLUMNS], show="headings", height=JOB_ROWS, selectmode="browse")
+        for name, title, width in JOB_COLUMNS:
+            self.jobs_tree.heading(name, text=title)
+            self.jobs_tree.column(name, width=width, stretch=(name == 'destino'))
+        self.jobs_tree.bind("<<TreeviewSelect>>", lambda event: self.show_selected_job())
+        self.jobs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        jobs_scroll = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.jobs_tree.yview)
+        jobs_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.jobs_tree.configure(yscrollcommand=jobs_scroll.set)
+        
+        # Barra de estado
+        self.status_var = tk.StringVar()
+        self.status_var.set("Listo para convertir")
+        status_label = tk.Label(main_frame, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W)
+        status_label.pack(side=tk.BOTTOM, fill=tk.X)
+    
+    def select_source_file(self, file_type):
+        file_path = filedialog.askopenfilename(
+            title=f"Seleccionar archivo {file_type.upper()}",
+            filetypes=[("Bases de datos", "*.odb;*.accdb"), ("LibreOffice Base", "*.odb"), ("Microsoft Access", "*.accdb")]
+        )
+        if file_path:
+            if file_type == 'cuiles':
+                self.source_cuiles_entry.delete(0, tk.END)
+                self.source_cuiles_entry.insert(0, file_path)
+            elif file_type == 'periodos':
+                self.source_periodos_entry.delete(0, tk.END)
+                self.source_periodos_entry.insert(0, file_path)
+    
+    def select_dest_file(self):
+        initial_dir = os.path.dirname(self.default_output_path)
+        initial_file = os.path.basename(self.default_output_path)
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Guardar archivo destino",
+            filetypes=[("Microsoft Access 2003", "*.mdb"), ("SQLite", "*.sqlite;*.db")],
+            defaultextension=".mdb",
+            initialdir=initial_dir,
+            initialfile=initial_file
+        )
+        if file_path:
+            self.dest_entry.delete(0, tk.END)
+            self.dest_entry.insert(0, file_path)
+    
+    def job_options(self, source_cuiles_file, source_periodos_file):
+        """Opciones del motor según la ventana, tomadas al encolar: el hilo de trabajo no lee los widgets."""
+        return dict(
+            source_cuiles_file=source_cuiles_file,
+            source_periodos_file=source_periodos_file,
+            batch_size=self.batch_size,
+            update_mode=self.update_mode_var.get(),
+            resume=self.resume_var.get(),
+            concurrent_reads=self.concurrent_var.get(),
+            deferred_keys=self.deferred_keys_var.get(),
+            duplicates=DUPLICATE_CHOICES[self.duplicates_var.get()],
+            validate=self.validate_var.get(),
+            export_formats=EXPORT_FORMATS if self.export_var.get() else (),
+            shard_by=SHARD_BY_YEAR if self.shard_var.get() else None,
+            reconcile=self.reconcile_var.get(),
+            source_cache=self.source_cache_var.get(),
+            read_partitions=DEFAULT_READ_PARTITIONS if self.partitioned_var.get() else 1,
+            history_index=self.history_index_var.get(),
+        )
+
+    def enqueue_conversion(self):
+        source_cuiles_file = self.source_cuiles_entry.get()
+        source_periodos_file = self.source_periodos_entry.get()
+        dest_file = self.dest_entry.get()
+
+        if not dest_file:
+            messagebox.showerror("Error", "Por favor, especifique un archivo de destino.")
+            return
+
+        if not source_cuiles_file and not source_periodos_file:
+            messagebox.showerror("Error", "Por favor, seleccione al menos un archivo de origen (CUILES o PERIODOS).")
+            return
+
+        if any(not job.is_finished and job.dest_file == dest_file for job in self.job_queue.jobs):
+            messagebox.showerror("Error", "Ya hay una conversión en la cola con ese archivo de destino.")
+            return
+
+        job = self.job_queue.submit(dest_file, self.job_options(source_cuiles_file, source_periodos_file))
+        self.jobs_tree.insert("", tk.END, iid=str(job.number), values=self.job_values(job))
+        self.cancel_button.config(state=tk.NORMAL)
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_INTERVAL_MS, self.poll_progress)
+
+    def run_job(self, job):
+        # Se ejecuta en el hilo de la cola. El motor (pyodbc, sqlite3, zipfile, procesos lectores) se importa
+        # recién al convertir, no al abrir la ventana
+        from motor_conversion import ConversionEngine
+
+        engine = ConversionEngine(
+            job.dest_file,
+            on_status=job.channel.status,
+            on_progress=job.channel.progress,
+            cancel_event=job.cancel_event,
+            **job.options
+        )
+        return engine.run()
+
+    def job_values(self, job):
+        minutes, seconds = divmod(int(job.elapsed), 60)
+        speed = job.rows_per_second
+        return (
+            job.number,
+            os.path.basename(job.dest_file),
+            job.state,
+            f"{minutes}:{seconds:02d}" if job.started is not None else "",
+            f"{speed:,.0f}".replace(",", ".") if speed else "",
+        )
+
+    def selected_job(self):
+        selection = self.jobs_tree.selection()
+        if not selection:
+            return None
+        return next((job for job in self.job_queue.jobs if str(job.number) == selection[0]), None)
+
+    def show_selected_job(self):
+        job = self.selected_job()
+        if job is not None and job.state == JOB_FAILED:
+            self.status_var.set(f"Conversión {job.number}: error: {job.error}")
+
+    def cancel_selected_job(self):
+        job = self.selected_job()
+        if job is None or job.is_finished:
+            job = self.job_queue.running
+        if job is None:
+            return
+        self.job_queue.cancel(job)
+        self.jobs_tree.item(str(job.number), values=self.job_values(job))
+        self.status_var.set(f"Cancelando la conversión {job.number}...")
+
+    def poll_progress(self):
+        running = self.job_queue.running
+        for job in self.job_queue.jobs:
+            for event in job.channel.drain():
+                kind = event[0]
+                if kind == 'status' and job is running:
+                    self.status_var.set(event[1])
+                elif kind == 'progress' and job is running:
+                    self.progress_var.set(event[1])
+                    if event[2]:
+                        self.status_var.set(event[2])
+                elif kind == 'done':
+                    self.conversion_succeeded(job)
+                elif kind == 'error':
+                    self.conversion_failed(job)
+            if self.jobs_tree.exists(str(job.number)):
+                self.jobs_tree.item(str(job.number), values=self.job_values(job))
+
+        if self.job_queue.busy:
+            self.root.after(POLL_INTERVAL_MS, self.poll_progress)
+            return
+
+        self.polling = False
+        self.cancel_button.config(state=tk.DISABLED)
+        if self.closing:
+            self.root.destroy()
+            return
+        self.queue_finished()
+
+    def queue_finished(self):
+        """Resumen al vaciarse la cola; durante la cola no se abren ventanas que esperen al operador."""
+        finished = self.job_queue.jobs[self.summarized_jobs:]
+        self.summarized_jobs = len(self.job_queue.jobs)
+        done = sum(job.state == JOB_DONE for job in finished)
+        failed = [job for job in finished if job.state == JOB_FAILED]
+        cancelled = sum(job.state == JOB_CANCELLED for job in finished)
+        if len(finished) > 1:
+            messagebox.showinfo(
+                "Cola terminada",
+                f"Conversiones completadas: {done}\nCon error: {len(failed)}\nCanceladas: {cancelled}"
+            )
+        elif done:
+            messagebox.showinfo("Éxito", "La conversión se ha completado correctamente")
+        elif failed:
+            messagebox.showerror("Error", f"Se produjo un error durante la conversión: {failed[0].error}")
+
+    def conversion_succeeded(self, job):
+        self.load_stats = job.result
+        self.progress_var.set(100)
+        self.status_var.set(f"Conversión {job.number} completada: {os.path.basename(job.dest_file)}")
+
+    def conversion_failed(self, job):
+        from destinos import DatabaseEngineError
+        from fuentes import SourceConnectionError
+
+        e = job.error
+        self.progress_var.set(0)
+        if job.state == JOB_CANCELLED:
+            self.status_var.set(f"Conversión {job.number} cancelada")
+        elif isinstance(e, DatabaseEngineError):
+            # Sin el motor de Access no puede funcionar ninguna de las conversiones de la cola
+            self.job_queue.cancel_all()
+            self.status_var.set("Error: Falta el motor de base de datos.")
+            messagebox.showerror(
+                "Error Crítico: Falta el Motor de Base de Datos de Access",
+                "El programa no puede crear la base de datos porque falta el 'Microsoft Access Database Engine'.\n\n"
+                "Este es un componente gratuito de Microsoft y es necesario para que este programa funcione.\n\n"
+                "Por favor, instale la versión de 64 bits desde el sitio web de Microsoft e intente de nuevo."
+            )
+            self.root.quit()
+        elif isinstance(e, SourceConnectionError):
+            self.status_var.set(f"Conversión {job.number}: no se pudo conectar al origen (¿está instalado el controlador ODBC de Access?): {e}")
+        else:
+            self.status_var.set(f"Conversión {job.number}: error: {e}")
+
+    def close_window(self):
+        if not self.job_queue.busy:
+            self.root.destroy()
+            return
+        if not messagebox.askyesno("Conversiones en curso", "Hay conversiones en la cola. ¿Cancelarlas y salir?"):
+            return
+        # Se espera a que la conversión en curso descarte su lote y cierre el destino
+        self.closing = True
+        self.job_queue.cancel_all()
+        self.status_var.set("Cancelando las conversiones antes de salir...")